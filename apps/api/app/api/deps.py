@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import hmac
+from typing import Callable, Optional
+
+from fastapi import Depends, Header, HTTPException
+
+from app.core.auth import AuthContext
+from app.core.settings import settings
+from app.services.workspace_service import workspace_service
+
+
+def get_auth_context(
+    workspace_id: int,
+    actor_email: Optional[str] = None,
+    authorization: Optional[str] = Header(default=None),
+) -> AuthContext:
+    # FastAPI caches this per request, so every `require(...)` on a route shares one lookup.
+    # A valid `Authorization: Bearer <access token>` skips the lookup entirely.
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        auth = workspace_service.auth_from_token(token.strip(), workspace_id)
+        if auth and actor_email in (None, auth.actor_email):
+            return auth
+    if not actor_email:
+        raise HTTPException(status_code=401, detail="actor_email 또는 유효한 access token이 필요합니다.")
+    return workspace_service.auth_context(workspace_id, actor_email)
+
+
+def require(permission: str) -> Callable[[AuthContext], AuthContext]:
+    def dependency(auth: AuthContext = Depends(get_auth_context)) -> AuthContext:
+        try:
+            return auth.require(permission)
+        except ValueError as exc:
+            raise HTTPException(status_code=403, detail=str(exc)) from exc
+
+    return dependency
+
+
+def require_platform_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    # Operator-only endpoints stay hidden unless DB_STATS_ADMIN_TOKEN is configured.
+    if not settings.db_stats_admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.db_stats_admin_token):
+        raise HTTPException(status_code=401, detail="관리자 토큰이 필요합니다.")
@@ -1,8 +1,12 @@
 import json
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 
+from app.api.deps import require
+from app.core.auth import AuthContext
+from app.db.records import parse_fields
 from app.schemas.agent import AgentCommandRequest, AgentCommandResponse, AgentStreamRequest
 from app.services.approval_service import approval_service
 from app.services.deepagents_runtime import orchestrator
@@ -12,7 +16,7 @@ from app.services.workspace_service import workspace_service
 router = APIRouter(prefix="/agent", tags=["agent"])
 
 
-def _run_agent(payload: AgentCommandRequest) -> dict:
+def _run_agent(payload: AgentCommandRequest, auth: AuthContext) -> dict:
     log_id = execution_log_service.create_pending(
         workspace_id=payload.workspace_id,
         user_email=payload.user_email,
@@ -21,28 +25,28 @@ def _run_agent(payload: AgentCommandRequest) -> dict:
     )
     try:
         result = orchestrator.execute(
-            workspace_id=payload.workspace_id,
-            actor_email=payload.actor_email,
+            auth=auth,
             user_email=payload.user_email,
             instruction=payload.instruction,
             context=payload.context,
         )
-        execution_log_service.complete(log_id=log_id, steps=result["steps"], outputs=result["outputs"])
+        execution_log_service.complete(
+            workspace_id=payload.workspace_id,
+            log_id=log_id,
+            steps=result["steps"],
+            outputs=result["outputs"],
+        )
         result["execution_log_id"] = log_id
         return result
     except Exception as exc:
-        execution_log_service.fail(log_id=log_id, error_message=str(exc))
+        execution_log_service.fail(workspace_id=payload.workspace_id, log_id=log_id, error_message=str(exc))
         raise
 
 
 @router.post("/execute", response_model=AgentCommandResponse)
 def execute(payload: AgentCommandRequest) -> dict:
     try:
-        workspace_service.require_permission(
-            workspace_id=payload.workspace_id,
-            actor_email=payload.actor_email,
-            permission="agent.execute",
-        )
+        auth = workspace_service.auth_context(payload.workspace_id, payload.actor_email).require("agent.execute")
 
         request_type = "agent_execute"
         if payload.approval_request_id <= 0:
@@ -76,7 +80,7 @@ def execute(payload: AgentCommandRequest) -> dict:
         if approved_payload.get("instruction") != payload.instruction:
             raise ValueError("승인된 instruction과 실행 instruction이 다릅니다.")
 
-        return _run_agent(payload)
+        return _run_agent(payload, auth)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
@@ -84,11 +88,7 @@ def execute(payload: AgentCommandRequest) -> dict:
 @router.post("/execute/stream")
 def execute_stream(payload: AgentStreamRequest) -> StreamingResponse:
     try:
-        workspace_service.require_permission(
-            workspace_id=payload.workspace_id,
-            actor_email=payload.actor_email,
-            permission="agent.execute",
-        )
+        auth = workspace_service.auth_context(payload.workspace_id, payload.actor_email).require("agent.execute")
 
         approval_service.ensure_approved(
             request_id=(payload.approval_request_id if payload.approval_request_id > 0 else None),
@@ -109,8 +109,7 @@ def execute_stream(payload: AgentStreamRequest) -> StreamingResponse:
             yield f"event: log\ndata: {json.dumps({'log_id': log_id}, ensure_ascii=False)}\n\n"
             final_data = None
             for event in orchestrator.stream(
-                workspace_id=payload.workspace_id,
-                actor_email=payload.actor_email,
+                auth=auth,
                 user_email=payload.user_email,
                 instruction=payload.instruction,
                 context=payload.context,
@@ -121,23 +120,33 @@ def execute_stream(payload: AgentStreamRequest) -> StreamingResponse:
                 yield f"event: {event['event']}\ndata: {json.dumps(event['data'], ensure_ascii=False)}\n\n"
 
             if final_data:
-                execution_log_service.complete(log_id=log_id, steps=final_data.get("steps", []), outputs=final_data.get("outputs", {}))
+                execution_log_service.complete(
+                    workspace_id=payload.workspace_id,
+                    log_id=log_id,
+                    steps=final_data.get("steps", []),
+                    outputs=final_data.get("outputs", {}),
+                )
         except Exception as exc:
-            execution_log_service.fail(log_id=log_id, error_message=str(exc))
+            execution_log_service.fail(workspace_id=payload.workspace_id, log_id=log_id, error_message=str(exc))
             yield f"event: error\ndata: {json.dumps({'message': str(exc)}, ensure_ascii=False)}\n\n"
 
     return StreamingResponse(event_gen(), media_type="text/event-stream")
 
 
 @router.get("/logs")
-def list_logs(workspace_id: int, actor_email: str, limit: int = 100) -> dict:
+def list_logs(
+    limit: int = 100,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    auth: AuthContext = Depends(require("workspace.read")),
+) -> dict:
     try:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="workspace.read",
+        page = execution_log_service.list_logs(
+            workspace_id=auth.workspace_id,
+            limit=limit,
+            fields=parse_fields(fields),
+            cursor=cursor,
         )
     except ValueError as exc:
-        raise HTTPException(status_code=403, detail=str(exc)) from exc
-
-    return {"logs": execution_log_service.list_logs(workspace_id=workspace_id, limit=limit)}
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"logs": [dict(item) for item in page.items], "next_cursor": page.next_cursor}
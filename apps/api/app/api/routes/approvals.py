@@ -1,7 +1,10 @@
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
+from app.api.deps import require
+from app.core.auth import AuthContext
+from app.db.records import parse_fields
 from app.schemas.approvals import ApprovalCreateRequest, ApprovalDecisionRequest
 from app.services.approval_service import approval_service
 from app.services.workspace_service import workspace_service
@@ -29,32 +32,30 @@ def create_request(payload: ApprovalCreateRequest) -> dict:
 
 
 @router.get("/inbox")
-def inbox(workspace_id: int, actor_email: str, status: Optional[str] = None, limit: int = 100) -> dict:
+def inbox(
+    status: Optional[str] = None,
+    limit: int = 100,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    auth: AuthContext = Depends(require("workspace.read")),
+) -> dict:
     try:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="workspace.read",
+        page = approval_service.list_requests(
+            workspace_id=auth.workspace_id,
+            status=status,
+            limit=limit,
+            fields=parse_fields(fields),
+            cursor=cursor,
         )
     except ValueError as exc:
-        raise HTTPException(status_code=403, detail=str(exc)) from exc
-
-    return {"requests": approval_service.list_requests(workspace_id=workspace_id, status=status, limit=limit)}
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"requests": [dict(item) for item in page.items], "next_cursor": page.next_cursor}
 
 
 @router.get("/requests/{request_id}")
-def get_request(request_id: int, workspace_id: int, actor_email: str) -> dict:
-    try:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="workspace.read",
-        )
-    except ValueError as exc:
-        raise HTTPException(status_code=403, detail=str(exc)) from exc
-
-    req = approval_service.get_request(request_id)
-    if not req or req["workspace_id"] != workspace_id:
+def get_request(request_id: int, auth: AuthContext = Depends(require("workspace.read"))) -> dict:
+    req = approval_service.get_request(auth.workspace_id, request_id)
+    if not req or req["workspace_id"] != auth.workspace_id:
         raise HTTPException(status_code=404, detail="승인 요청을 찾을 수 없습니다.")
     return req
 
@@ -67,7 +68,12 @@ def approve_request(request_id: int, payload: ApprovalDecisionRequest) -> dict:
             actor_email=payload.actor_email,
             permission="approval.decide",
         )
-        req = approval_service.approve(request_id=request_id, decided_by=payload.actor_email, note=payload.note)
+        req = approval_service.approve(
+            workspace_id=payload.workspace_id,
+            request_id=request_id,
+            decided_by=payload.actor_email,
+            note=payload.note,
+        )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
@@ -84,7 +90,12 @@ def reject_request(request_id: int, payload: ApprovalDecisionRequest) -> dict:
             actor_email=payload.actor_email,
             permission="approval.decide",
         )
-        req = approval_service.reject(request_id=request_id, decided_by=payload.actor_email, note=payload.note)
+        req = approval_service.reject(
+            workspace_id=payload.workspace_id,
+            request_id=request_id,
+            decided_by=payload.actor_email,
+            note=payload.note,
+        )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
@@ -1,5 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
 
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.api.deps import require
+from app.core.auth import AuthContext
 from app.schemas.billing import InvoiceCreateRequest, InvoiceIssueRequest
 from app.services.approval_service import approval_service
 from app.services.billing_service import billing_service
@@ -79,14 +83,13 @@ def issue_invoice(invoice_id: int, payload: InvoiceIssueRequest) -> dict:
 
 
 @router.get("/invoices")
-def list_invoices(workspace_id: int, actor_email: str, limit: int = 100) -> dict:
+def list_invoices(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    auth: AuthContext = Depends(require("workspace.read")),
+) -> dict:
     try:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="workspace.read",
-        )
+        page = billing_service.list_invoices(workspace_id=auth.workspace_id, limit=limit, cursor=cursor)
     except ValueError as exc:
-        raise HTTPException(status_code=403, detail=str(exc)) from exc
-
-    return {"invoices": billing_service.list_invoices(workspace_id=workspace_id, limit=limit)}
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"invoices": page.items, "next_cursor": page.next_cursor}
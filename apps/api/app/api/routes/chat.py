@@ -1,5 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
 
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.api.deps import require
+from app.core.auth import AuthContext
 from app.schemas.chat import ChannelCreateRequest, MessageCreateRequest
 from app.services.chat_service import chat_service
 from app.services.workspace_service import workspace_service
@@ -26,17 +30,8 @@ def create_channel(payload: ChannelCreateRequest) -> dict:
 
 
 @router.get("/channels")
-def list_channels(workspace_id: int, actor_email: str) -> dict:
-    try:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="workspace.read",
-        )
-    except ValueError as exc:
-        raise HTTPException(status_code=403, detail=str(exc)) from exc
-
-    return {"channels": chat_service.list_channels(workspace_id)}
+def list_channels(auth: AuthContext = Depends(require("workspace.read"))) -> dict:
+    return {"channels": chat_service.list_channels(auth.workspace_id)}
 
 
 @router.post("/channels/{channel_id}/messages")
@@ -58,14 +53,14 @@ def post_message(channel_id: int, payload: MessageCreateRequest) -> dict:
 
 
 @router.get("/channels/{channel_id}/messages")
-def list_messages(channel_id: int, workspace_id: int, actor_email: str, limit: int = 100) -> dict:
+def list_messages(
+    channel_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    auth: AuthContext = Depends(require("workspace.read")),
+) -> dict:
     try:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="workspace.read",
-        )
+        page = chat_service.list_messages(workspace_id=auth.workspace_id, channel_id=channel_id, limit=limit, cursor=cursor)
     except ValueError as exc:
-        raise HTTPException(status_code=403, detail=str(exc)) from exc
-
-    return {"messages": chat_service.list_messages(workspace_id=workspace_id, channel_id=channel_id, limit=limit)}
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"messages": page.items, "next_cursor": page.next_cursor}
@@ -1,7 +1,10 @@
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
+from app.api.deps import require
+from app.core.auth import AuthContext
+from app.db.records import parse_fields
 from app.schemas.docs import DocCreateRequest, DocUpdateRequest
 from app.services.docs_service import docs_service
 from app.services.workspace_service import workspace_service
@@ -30,45 +33,34 @@ def create_doc(payload: DocCreateRequest) -> dict:
 
 
 @router.get("")
-def list_docs(workspace_id: int, actor_email: str, space: Optional[str] = None, limit: int = 100) -> dict:
+def list_docs(
+    space: Optional[str] = None,
+    limit: int = 100,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    auth: AuthContext = Depends(require("workspace.read")),
+) -> dict:
     try:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="workspace.read",
+        page = docs_service.list(
+            workspace_id=auth.workspace_id,
+            space=space,
+            limit=limit,
+            fields=parse_fields(fields),
+            cursor=cursor,
         )
     except ValueError as exc:
-        raise HTTPException(status_code=403, detail=str(exc)) from exc
-
-    return {"docs": docs_service.list(workspace_id=workspace_id, space=space, limit=limit)}
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"docs": [dict(item) for item in page.items], "next_cursor": page.next_cursor}
 
 
 @router.get("/search/query")
-def search_docs(workspace_id: int, actor_email: str, q: str, limit: int = 50) -> dict:
-    try:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="workspace.read",
-        )
-    except ValueError as exc:
-        raise HTTPException(status_code=403, detail=str(exc)) from exc
-
-    return {"docs": docs_service.search(workspace_id=workspace_id, query=q, limit=limit)}
+def search_docs(q: str, limit: int = 50, auth: AuthContext = Depends(require("workspace.read"))) -> dict:
+    return {"docs": docs_service.search(workspace_id=auth.workspace_id, query=q, limit=limit)}
 
 
 @router.get("/{doc_id}")
-def get_doc(doc_id: int, workspace_id: int, actor_email: str) -> dict:
-    try:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="workspace.read",
-        )
-    except ValueError as exc:
-        raise HTTPException(status_code=403, detail=str(exc)) from exc
-
-    doc = docs_service.get(workspace_id, doc_id)
+def get_doc(doc_id: int, auth: AuthContext = Depends(require("workspace.read"))) -> dict:
+    doc = docs_service.get(auth.workspace_id, doc_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     return doc
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+import asyncio
 import json
 from typing import Optional
 
-from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
+from app.api.deps import require, require_platform_admin
+from app.core.auth import AuthContext
+from app.core.settings import settings
+from app.db.async_database import async_db
+from app.db.records import parse_fields
 from app.schemas.github import GithubInstallCallbackRequest, GithubInstallUrlRequest, GithubRepoLinkRequest
+from app.services.github_import_service import ImportProgress, NdjsonReader, github_import_service
 from app.services.github_integration_service import github_integration_service
-from app.services.github_service import github_service
+from app.services.github_service import github_event_broker, github_service
+from app.services.webhook_queue import DUPLICATE, FULL, github_webhook_queue
 from app.services.workspace_service import workspace_service
 
 router = APIRouter(prefix="/github", tags=["github"])
@@ -16,7 +25,8 @@ router = APIRouter(prefix="/github", tags=["github"])
 @router.post("/app/install-url")
 def app_install_url(payload: GithubInstallUrlRequest) -> dict:
     try:
-        return github_integration_service.install_url(workspace_id=payload.workspace_id, actor_email=payload.actor_email)
+        auth = workspace_service.auth_context(payload.workspace_id, payload.actor_email)
+        return github_integration_service.install_url(auth)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
@@ -59,22 +69,15 @@ def app_callback_from_redirect(
 
 
 @router.get("/app/installations")
-def list_installations(workspace_id: int, actor_email: str) -> dict:
-    try:
-        data = github_integration_service.list_installations(workspace_id=workspace_id, actor_email=actor_email)
-    except ValueError as exc:
-        raise HTTPException(status_code=403, detail=str(exc)) from exc
-    return {"installations": data}
+def list_installations(auth: AuthContext = Depends(require("workspace.read"))) -> dict:
+    return {"installations": github_integration_service.list_installations(auth)}
 
 
 @router.get("/app/installations/{installation_id}/repos")
 def list_installation_repos(workspace_id: int, actor_email: str, installation_id: int) -> dict:
     try:
-        data = github_integration_service.list_installation_repos(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            installation_id=installation_id,
-        )
+        auth = workspace_service.auth_context(workspace_id, actor_email)
+        data = github_integration_service.list_installation_repos(auth, installation_id=installation_id)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     return data
@@ -84,8 +87,7 @@ def list_installation_repos(workspace_id: int, actor_email: str, installation_id
 def link_repo(payload: GithubRepoLinkRequest) -> dict:
     try:
         return github_integration_service.link_repo(
-            workspace_id=payload.workspace_id,
-            actor_email=payload.actor_email,
+            workspace_service.auth_context(payload.workspace_id, payload.actor_email),
             installation_id=payload.installation_id,
             repo_full_name=payload.repo_full_name,
         )
@@ -94,38 +96,128 @@ def link_repo(payload: GithubRepoLinkRequest) -> dict:
 
 
 @router.get("/repos")
-def list_linked_repos(workspace_id: int, actor_email: str) -> dict:
-    try:
-        repos = github_integration_service.list_linked_repos(workspace_id=workspace_id, actor_email=actor_email)
-    except ValueError as exc:
-        raise HTTPException(status_code=403, detail=str(exc)) from exc
-    return {"repos": repos}
+def list_linked_repos(auth: AuthContext = Depends(require("workspace.read"))) -> dict:
+    return {"repos": github_integration_service.list_linked_repos(auth)}
 
 
-@router.post("/webhook")
+@router.post("/webhook", status_code=202)
 async def webhook(
     request: Request,
     x_github_event: str = Header(default="unknown"),
     x_hub_signature_256: Optional[str] = Header(default=None),
+    x_github_delivery: Optional[str] = Header(default=None),
 ) -> dict:
     body = await request.body()
 
     if not github_service.verify_signature(body, x_hub_signature_256):
         raise HTTPException(status_code=401, detail="Invalid GitHub signature")
 
-    payload = json.loads(body.decode("utf-8") or "{}")
-    return github_service.ingest_event(event_type=x_github_event, payload=payload)
+    status = github_webhook_queue.enqueue(x_github_event, body, x_github_delivery)
+    if status == DUPLICATE:
+        return {"queued": False, "duplicate": True}
+    if status == FULL:
+        raise HTTPException(
+            status_code=503,
+            detail="webhook 큐가 가득 찼습니다. 잠시 후 다시 시도하세요.",
+            headers={"Retry-After": str(settings.github_webhook_retry_after_seconds)},
+        )
+    return {"queued": True, "queue_depth": github_webhook_queue.depth()}
+
+
+@router.get("/webhook/queue", dependencies=[Depends(require_platform_admin)])
+def webhook_queue_stats() -> dict:
+    return github_webhook_queue.stats()
+
+
+@router.post("/events/import")
+async def import_events(request: Request, auth: AuthContext = Depends(require("github.link"))) -> dict:
+    """Stream an NDJSON (optionally gzip) archive of deliveries into this workspace."""
+    reader = NdjsonReader()
+    progress = ImportProgress()
+    batch: list[bytes] = []
+    async for chunk in request.stream():
+        batch.extend(reader.feed(chunk))
+        while len(batch) >= github_import_service.batch_size:
+            lines, batch = batch[: github_import_service.batch_size], batch[github_import_service.batch_size :]
+            await async_db.run(github_import_service.store_batch, lines, progress, workspace_id=auth.workspace_id)
+    batch.extend(reader.finish())
+    for start in range(0, len(batch), github_import_service.batch_size):
+        lines = batch[start : start + github_import_service.batch_size]
+        await async_db.run(github_import_service.store_batch, lines, progress, workspace_id=auth.workspace_id)
+    return progress.as_dict()
+
+
+def _sse_event(event: dict) -> str:
+    return f"id: {event['id']}\nevent: github_event\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+@router.get("/events/stream")
+async def stream_events(
+    request: Request,
+    last_event_id: Optional[int] = Header(default=None),
+    auth: AuthContext = Depends(require("workspace.read")),
+) -> StreamingResponse:
+    """New events for the workspace as Server-Sent Events; `Last-Event-ID` resumes from the table."""
+    workspace_id = auth.workspace_id
+    latest_id = await async_db.run(github_service.latest_event_id, workspace_id)
+    subscription = github_event_broker.subscribe(workspace_id, latest_id)
+
+    async def catch_up(after_id: int):
+        while True:
+            rows = await async_db.run(github_service.events_after, workspace_id, after_id, github_event_broker.queue_size)
+            for row in rows:
+                yield row
+            if len(rows) < github_event_broker.queue_size:
+                return
+            after_id = rows[-1]["id"]
+
+    async def event_gen():
+        sent_id = latest_id if last_event_id is None else last_event_id
+        try:
+            yield ": connected\n\n"
+            # Rows stored before we subscribed, or since the client's Last-Event-ID, come from the table.
+            async for row in catch_up(sent_id):
+                sent_id = row["id"]
+                yield _sse_event(row)
+            while not await request.is_disconnected():
+                if subscription.lagged:
+                    subscription.lagged = False
+                    async for row in catch_up(sent_id):
+                        sent_id = row["id"]
+                        yield _sse_event(row)
+                try:
+                    row = await asyncio.wait_for(subscription.queue.get(), timeout=settings.event_stream_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if row["id"] > sent_id:
+                    sent_id = row["id"]
+                    yield _sse_event(row)
+        finally:
+            github_event_broker.unsubscribe(subscription)
+
+    return StreamingResponse(event_gen(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
 
 @router.get("/events")
-def list_events(workspace_id: int, actor_email: str, limit: int = 100) -> dict:
+def list_events(
+    limit: int = 100,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    event_type: Optional[str] = None,
+    action: Optional[str] = None,
+    branch: Optional[str] = None,
+    pr_number: Optional[int] = None,
+    auth: AuthContext = Depends(require("workspace.read")),
+) -> dict:
     try:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="workspace.read",
+        page = github_service.list_events(
+            workspace_id=auth.workspace_id,
+            limit=limit,
+            fields=parse_fields(fields),
+            cursor=cursor,
+            filters={"event_type": event_type, "action": action, "branch": branch, "pr_number": pr_number},
         )
     except ValueError as exc:
-        raise HTTPException(status_code=403, detail=str(exc)) from exc
-
-    return {"events": github_service.list_events(workspace_id=workspace_id, limit=limit)}
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"events": [dict(item) for item in page.items], "next_cursor": page.next_cursor}
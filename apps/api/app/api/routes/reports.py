@@ -1,7 +1,9 @@
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
+from app.api.deps import require
+from app.core.auth import AuthContext
 from app.schemas.reports import ReportGenerateRequest
 from app.services.report_service import report_service
 from app.services.workspace_service import workspace_service
@@ -48,14 +50,14 @@ def generate_weekly(payload: ReportGenerateRequest) -> dict:
 
 
 @router.get("")
-def list_reports(workspace_id: int, actor_email: str, report_type: Optional[str] = None, limit: int = 100) -> dict:
+def list_reports(
+    report_type: Optional[str] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    auth: AuthContext = Depends(require("workspace.read")),
+) -> dict:
     try:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="workspace.read",
-        )
+        page = report_service.list_reports(workspace_id=auth.workspace_id, report_type=report_type, limit=limit, cursor=cursor)
     except ValueError as exc:
-        raise HTTPException(status_code=403, detail=str(exc)) from exc
-
-    return {"reports": report_service.list_reports(workspace_id=workspace_id, report_type=report_type, limit=limit)}
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"reports": page.items, "next_cursor": page.next_cursor}
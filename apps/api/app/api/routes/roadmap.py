@@ -1,5 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
 
+from app.api.deps import require_platform_admin
+from app.db.instrumentation import query_stats
 from app.services.deepagents_runtime import runtime_status
 
 router = APIRouter(prefix="/platform", tags=["platform"])
@@ -28,3 +30,23 @@ def modules() -> dict:
             "deepagent-orchestrator-streaming",
         ]
     }
+
+
+@router.get("/db/stats", dependencies=[Depends(require_platform_admin)])
+def db_stats(limit: int = 20, order_by: str = "total_ms") -> dict:
+    try:
+        statements = query_stats.top(limit=limit, order_by=order_by)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {
+        "enabled": query_stats.enabled,
+        "slow_query_ms": query_stats.slow_query_ms,
+        "statements": statements,
+        "slow_queries": query_stats.slow_queries(),
+    }
+
+
+@router.delete("/db/stats", dependencies=[Depends(require_platform_admin)])
+def reset_db_stats() -> dict:
+    query_stats.reset()
+    return {"reset": True}
@@ -1,5 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
 
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.api.deps import require
+from app.core.auth import AuthContext
 from app.schemas.workspace import (
     MemberAddRequest,
     MemberRoleUpdateRequest,
@@ -21,16 +25,18 @@ def create_workspace(payload: WorkspaceCreateRequest) -> dict:
 
 
 @router.get("")
-def list_workspaces(user_email: str) -> dict:
-    return {"workspaces": workspace_service.list_workspaces(user_email)}
+def list_workspaces(user_email: str, permission: Optional[str] = None) -> dict:
+    """`permission` is a comma-separated list; only workspaces granting all of them are returned."""
+    permissions = [part.strip() for part in permission.split(",") if part.strip()] if permission else None
+    try:
+        return {"workspaces": workspace_service.list_workspaces(user_email, permissions=permissions)}
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @router.get("/{workspace_id}")
-def get_workspace(workspace_id: int, actor_email: str) -> dict:
-    try:
-        ws = workspace_service.get_workspace(workspace_id, actor_email)
-    except ValueError as exc:
-        raise HTTPException(status_code=403, detail=str(exc)) from exc
+def get_workspace(auth: AuthContext = Depends(require("workspace.read"))) -> dict:
+    ws = workspace_service.get_workspace(auth)
 
     if not ws:
         raise HTTPException(status_code=404, detail="workspace를 찾을 수 없습니다.")
@@ -38,11 +44,8 @@ def get_workspace(workspace_id: int, actor_email: str) -> dict:
 
 
 @router.get("/{workspace_id}/members")
-def list_members(workspace_id: int, actor_email: str) -> dict:
-    try:
-        return {"members": workspace_service.list_members(workspace_id=workspace_id, actor_email=actor_email)}
-    except ValueError as exc:
-        raise HTTPException(status_code=403, detail=str(exc)) from exc
+def list_members(auth: AuthContext = Depends(require("workspace.read"))) -> dict:
+    return {"members": workspace_service.list_members(auth)}
 
 
 @router.post("/{workspace_id}/members")
@@ -91,21 +94,21 @@ def remove_member(workspace_id: int, target_email: str, actor_email: str) -> dic
     return {"deleted": True}
 
 
+@router.post("/{workspace_id}/access-token")
+def issue_access_token(workspace_id: int, actor_email: str) -> dict:
+    try:
+        return workspace_service.issue_access_token(workspace_service.auth_context(workspace_id, actor_email))
+    except ValueError as exc:
+        raise HTTPException(status_code=403, detail=str(exc)) from exc
+
+
 @router.get("/{workspace_id}/permissions/me")
 def permissions_me(workspace_id: int, user_email: str) -> dict:
     return workspace_service.permissions_me(workspace_id=workspace_id, user_email=user_email)
 
 
 @router.get("/{workspace_id}/services")
-def services(workspace_id: int, actor_email: str) -> dict:
-    try:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="workspace.read",
-        )
-    except ValueError as exc:
-        raise HTTPException(status_code=403, detail=str(exc)) from exc
+def services(auth: AuthContext = Depends(require("workspace.read"))) -> dict:
     return {"services": workspace_service.supported_services}
 
 
@@ -116,8 +119,7 @@ def execute_action(workspace_id: int, payload: WorkspaceActionRequest) -> dict:
 
     try:
         result = workspace_service.execute(
-            workspace_id=payload.workspace_id,
-            actor_email=payload.actor_email,
+            auth=workspace_service.auth_context(payload.workspace_id, payload.actor_email),
             user_email=payload.user_email or payload.actor_email,
             service=payload.service,
             action=payload.action,
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from app.core.rbac import PERMISSION_BITS, permission_map, permission_mask, required_mask
+from app.core.security import sign_state, verify_state
+
+
+@dataclass(frozen=True)
+class AuthContext:
+    """Actor's role in one workspace, resolved once per request and passed down to services."""
+
+    workspace_id: int
+    actor_email: str
+    role: Optional[str]
+    permissions: int
+
+    @classmethod
+    def for_role(cls, *, workspace_id: int, actor_email: str, role: Optional[str]) -> "AuthContext":
+        return cls(workspace_id=workspace_id, actor_email=actor_email, role=role, permissions=permission_mask(role))
+
+    def can(self, permission: str) -> bool:
+        bit = PERMISSION_BITS.get(permission, 0)
+        return bool(bit) and self.permissions & bit == bit
+
+    def can_all(self, permissions: Iterable[str]) -> bool:
+        mask = required_mask(permissions)
+        return self.permissions & mask == mask
+
+    def permission_map(self) -> dict[str, bool]:
+        return permission_map(self.permissions)
+
+    def require(self, permission: str) -> "AuthContext":
+        if not self.can(permission):
+            raise ValueError(f"권한이 없습니다. permission={permission}, actor={self.actor_email}, role={self.role}")
+        return self
+
+
+ACCESS_TOKEN_TYPE = "workspace_access"
+
+
+def encode_access_token(auth: AuthContext, *, version: int, expires_in_sec: int) -> str:
+    """Signed token carrying the resolved role; `version` is the workspace's membership version at issue time."""
+    return sign_state(
+        {
+            "typ": ACCESS_TOKEN_TYPE,
+            "workspace_id": auth.workspace_id,
+            "user_email": auth.actor_email,
+            "role": auth.role,
+            "ver": version,
+        },
+        expires_in_sec=expires_in_sec,
+    )
+
+
+def decode_access_token(token: str) -> Optional[dict]:
+    try:
+        payload = verify_state(token)
+    except ValueError:
+        return None
+    # OAuth/GitHub states share the signing key; only accept payloads minted as access tokens.
+    if not payload or payload.get("typ") != ACCESS_TOKEN_TYPE:
+        return None
+    return payload
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import logging
+
+from app.core.settings import settings
+from app.db.instrumentation import RequestQueryStats, current_request_stats
+
+logger = logging.getLogger("app.db")
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware binding a RequestQueryStats to each HTTP request.
+
+    Adds `x-db-queries` / `x-db-time-ms` / `x-db-wait-ms` response headers and logs requests
+    whose statement count exceeds DB_REQUEST_QUERY_WARN (typical N+1 pattern).
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not settings.db_instrumentation:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = current_request_stats.set(stats)
+
+        async def send_with_stats(message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.total_ms:.2f}".encode()))
+                headers.append((b"x-db-wait-ms", f"{stats.wait_ms:.2f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            current_request_stats.reset(token)
+            if stats.count > settings.db_request_query_warn:
+                logger.warning(
+                    "%s %s issued %d queries (%.1fms); repeated: %s",
+                    scope.get("method"),
+                    scope.get("path"),
+                    stats.count,
+                    stats.total_ms,
+                    stats.repeated()[:5],
+                )
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Iterable, Optional
 
 ROLE_RANK = {
     "viewer": 1,
@@ -30,10 +30,41 @@ def normalize_role(role: str) -> str:
     return role_name
 
 
+# Bit position of every permission, in declaration order. Persisted nowhere, so reordering is safe.
+PERMISSION_BITS = {permission: 1 << index for index, permission in enumerate(PERMISSIONS)}
+
+# Compiled once at import: role -> bitmask of every permission the role grants.
+ROLE_MASKS = {
+    role: sum(bit for permission, bit in PERMISSION_BITS.items() if rank >= ROLE_RANK[PERMISSIONS[permission]])
+    for role, rank in ROLE_RANK.items()
+}
+
+
+def permission_mask(role: Optional[str]) -> int:
+    return ROLE_MASKS.get(role or "", 0)
+
+
 def has_permission(role: Optional[str], permission: str) -> bool:
-    if not role:
-        return False
-    required = PERMISSIONS.get(permission)
-    if not required:
-        return False
-    return ROLE_RANK.get(role, 0) >= ROLE_RANK[required]
+    bit = PERMISSION_BITS.get(permission, 0)
+    return bool(bit) and ROLE_MASKS.get(role or "", 0) & bit == bit
+
+
+def required_mask(permissions: Iterable[str]) -> int:
+    mask = 0
+    for permission in permissions:
+        bit = PERMISSION_BITS.get(permission)
+        if bit is None:
+            raise ValueError(f"지원하지 않는 권한입니다: {permission}")
+        mask |= bit
+    return mask
+
+
+def roles_with(permissions: Iterable[str]) -> tuple[str, ...]:
+    """Roles granting every permission in `permissions`, for `role IN (...)` filters in SQL."""
+    mask = required_mask(permissions)
+    return tuple(role for role, granted in ROLE_MASKS.items() if granted & mask == mask)
+
+
+def permission_map(mask: int) -> dict[str, bool]:
+    """Every permission in PERMISSIONS -> whether `mask` grants it."""
+    return {permission: mask & bit == bit for permission, bit in PERMISSION_BITS.items()}
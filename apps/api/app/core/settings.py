@@ -17,6 +17,26 @@ class Settings:
     app_port: int
     app_secret: str
     db_path: str
+    db_pool_size: int
+    db_busy_timeout_ms: int
+    db_journal_mode: str
+    db_synchronous: str
+    db_write_mode: str
+    db_write_batch_size: int
+    db_write_queue_size: int
+    db_async_workers: int
+    db_instrumentation: bool
+    db_slow_query_ms: float
+    db_request_query_warn: int
+    db_stats_admin_token: str
+    db_shard_dir: str
+    db_shard_max_open: int
+    db_shard_pool_size: int
+    db_payload_compress_min_bytes: int
+    membership_cache_size: int
+    membership_cache_ttl_seconds: float
+    membership_cache_sync_ms: int
+    access_token_ttl_seconds: int
 
     deepagent_model: str
 
@@ -34,6 +54,19 @@ class Settings:
     github_api_url: str
     github_app_private_key: str
     github_app_token: str
+    github_webhook_queue_size: int
+    github_webhook_batch_size: int
+    github_webhook_retry_after_seconds: int
+    github_delivery_cache_size: int
+    github_delivery_cache_ttl_seconds: float
+    github_installation_cache_ttl_seconds: float
+    github_installation_negative_ttl_seconds: float
+    github_import_batch_size: int
+    event_stream_queue_size: int
+    event_stream_heartbeat_seconds: float
+    report_scheduler_workers: int
+    report_schedule_interval_seconds: float
+    report_job_lease_seconds: float
 
     barobill_member_id: str
     barobill_api_key: str
@@ -45,6 +78,26 @@ settings = Settings(
     app_port=int(os.getenv("APP_PORT", "8090")),
     app_secret=os.getenv("APP_SECRET", "change-me-in-production"),
     db_path=os.getenv("DB_PATH", "apps/api/data/app.db"),
+    db_pool_size=int(os.getenv("DB_POOL_SIZE", "8")),
+    db_busy_timeout_ms=int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000")),
+    db_journal_mode=os.getenv("DB_JOURNAL_MODE", "WAL"),
+    db_synchronous=os.getenv("DB_SYNCHRONOUS", "NORMAL"),
+    db_write_mode=os.getenv("DB_WRITE_MODE", "lock"),
+    db_write_batch_size=int(os.getenv("DB_WRITE_BATCH_SIZE", "64")),
+    db_write_queue_size=int(os.getenv("DB_WRITE_QUEUE_SIZE", "10000")),
+    db_async_workers=int(os.getenv("DB_ASYNC_WORKERS", "4")),
+    db_instrumentation=_as_bool(os.getenv("DB_INSTRUMENTATION", "true"), default=True),
+    db_slow_query_ms=float(os.getenv("DB_SLOW_QUERY_MS", "200")),
+    db_request_query_warn=int(os.getenv("DB_REQUEST_QUERY_WARN", "50")),
+    db_stats_admin_token=os.getenv("DB_STATS_ADMIN_TOKEN", ""),
+    db_shard_dir=os.getenv("DB_SHARD_DIR", ""),
+    db_shard_max_open=int(os.getenv("DB_SHARD_MAX_OPEN", "64")),
+    db_shard_pool_size=int(os.getenv("DB_SHARD_POOL_SIZE", "2")),
+    db_payload_compress_min_bytes=int(os.getenv("DB_PAYLOAD_COMPRESS_MIN_BYTES", "512")),
+    membership_cache_size=int(os.getenv("MEMBERSHIP_CACHE_SIZE", "10000")),
+    membership_cache_ttl_seconds=float(os.getenv("MEMBERSHIP_CACHE_TTL_SECONDS", "60")),
+    membership_cache_sync_ms=int(os.getenv("MEMBERSHIP_CACHE_SYNC_MS", "1000")),
+    access_token_ttl_seconds=int(os.getenv("ACCESS_TOKEN_TTL_SECONDS", "300")),
     deepagent_model=os.getenv("DEEPAGENT_MODEL", "openai:gpt-4.1"),
     google_client_id=os.getenv("GOOGLE_CLIENT_ID", ""),
     google_client_secret=os.getenv("GOOGLE_CLIENT_SECRET", ""),
@@ -59,6 +112,19 @@ settings = Settings(
     github_api_url=os.getenv("GITHUB_API_URL", "https://api.github.com"),
     github_app_private_key=os.getenv("GITHUB_APP_PRIVATE_KEY", ""),
     github_app_token=os.getenv("GITHUB_APP_TOKEN", ""),
+    github_webhook_queue_size=int(os.getenv("GITHUB_WEBHOOK_QUEUE_SIZE", "10000")),
+    github_webhook_batch_size=int(os.getenv("GITHUB_WEBHOOK_BATCH_SIZE", "200")),
+    github_webhook_retry_after_seconds=int(os.getenv("GITHUB_WEBHOOK_RETRY_AFTER_SECONDS", "5")),
+    github_delivery_cache_size=int(os.getenv("GITHUB_DELIVERY_CACHE_SIZE", "50000")),
+    github_delivery_cache_ttl_seconds=float(os.getenv("GITHUB_DELIVERY_CACHE_TTL_SECONDS", "86400")),
+    github_installation_cache_ttl_seconds=float(os.getenv("GITHUB_INSTALLATION_CACHE_TTL_SECONDS", "300")),
+    github_installation_negative_ttl_seconds=float(os.getenv("GITHUB_INSTALLATION_NEGATIVE_TTL_SECONDS", "60")),
+    github_import_batch_size=int(os.getenv("GITHUB_IMPORT_BATCH_SIZE", "1000")),
+    event_stream_queue_size=int(os.getenv("EVENT_STREAM_QUEUE_SIZE", "500")),
+    event_stream_heartbeat_seconds=float(os.getenv("EVENT_STREAM_HEARTBEAT_SECONDS", "15")),
+    report_scheduler_workers=int(os.getenv("REPORT_SCHEDULER_WORKERS", "2")),
+    report_schedule_interval_seconds=float(os.getenv("REPORT_SCHEDULE_INTERVAL_SECONDS", "0")),
+    report_job_lease_seconds=float(os.getenv("REPORT_JOB_LEASE_SECONDS", "600")),
     barobill_member_id=os.getenv("BAROBILL_MEMBER_ID", ""),
     barobill_api_key=os.getenv("BAROBILL_API_KEY", ""),
 )
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+from app.core.settings import settings
+from app.db.database import AppDatabase, db
+
+T = TypeVar("T")
+
+
+class AsyncAppDatabase:
+    """Awaitable facade over AppDatabase for `async def` routes.
+
+    Blocking sqlite calls run on a dedicated executor so they never occupy the event loop
+    or Starlette's shared threadpool. In queue write mode, writes are enqueued from an executor
+    thread (the write queue is bounded, so enqueueing can block) and then await the writer
+    thread's Future without holding an executor thread.
+    """
+
+    def __init__(
+        self,
+        database: AppDatabase,
+        *,
+        max_workers: int = settings.db_async_workers,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ) -> None:
+        self.database = database
+        self._executor = executor or ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="db-async")
+
+    def for_workspace(self, workspace_id: Optional[int]) -> "AsyncAppDatabase":
+        target = self.database.for_workspace(workspace_id)
+        if target is self.database:
+            return self
+        return AsyncAppDatabase(target, executor=self._executor)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        # Carry contextvars (per-request query stats) into the executor thread.
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, partial(context.run, fn, *args, **kwargs))
+
+    async def execute(self, query: str, params: tuple[Any, ...] = ()) -> None:
+        if self.database.write_mode == "queue":
+            future = await self.run(self.database.submit, query, params)
+            await asyncio.wrap_future(future)
+            return
+        await self.run(self.database.execute, query, params)
+
+    async def executemany(self, query: str, params: list[tuple[Any, ...]]) -> int:
+        return await self.run(self.database.executemany, query, params)
+
+    async def insert_returning(self, query: str, params: tuple[Any, ...] = ()) -> dict[str, Any]:
+        return await self.run(self.database.insert_returning, query, params)
+
+    async def fetchone(self, query: str, params: tuple[Any, ...] = ()) -> Optional[dict[str, Any]]:
+        return await self.run(self.database.fetchone, query, params)
+
+    async def fetchall(self, query: str, params: tuple[Any, ...] = ()) -> list[dict[str, Any]]:
+        return await self.run(self.database.fetchall, query, params)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+async_db = AsyncAppDatabase(db)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any
+
+from app.core.settings import settings
+
+# Large JSON columns (currently github_events.payload_json) are stored either as plain JSON text
+# (legacy rows and small payloads) or as a BLOB whose first byte is the codec version:
+#
+#   0x01  zlib (level 6) primed with `_ZDICT_V1`
+#
+# A version is never reused or changed once rows exist; a new dictionary gets a new version and
+# the old one stays here so previously written rows remain readable.
+CODEC_ZLIB_DICT_V1 = 1
+
+_ZDICT_V1 = "".join(
+    [
+        '"url":"https://api.github.com/repos/","html_url":"https://github.com/","avatar_url":"https://avatars.githubusercontent.com/u/',
+        '"gravatar_id":"","type":"User","user_view_type":"public","site_admin":false,"node_id":"',
+        '"followers_url","following_url","gists_url{/gist_id}","starred_url{/owner}{/repo}","subscriptions_url",',
+        '"organizations_url","repos_url","events_url{/privacy}","received_events_url",',
+        '"forks_url","keys_url{/key_id}","collaborators_url{/collaborator}","teams_url","hooks_url",',
+        '"issue_events_url{/number}","assignees_url{/user}","branches_url{/branch}","tags_url","blobs_url{/sha}",',
+        '"git_tags_url","git_refs_url","trees_url","statuses_url{sha}","languages_url","stargazers_url",',
+        '"contributors_url","subscribers_url","subscription_url","commits_url","git_commits_url",',
+        '"comments_url{/number}","issue_comment_url","contents_url{+path}","compare_url{base}...{head}",',
+        '"merges_url","archive_url{archive_format}{/ref}","downloads_url","issues_url","pulls_url",',
+        '"milestones_url","notifications_url{?since,all,participating}","labels_url{/name}","releases_url{/id}",',
+        '"deployments_url","created_at":"","updated_at":"","pushed_at":"","git_url":"git://github.com/",',
+        '"ssh_url":"git@github.com:","clone_url":"","svn_url":"","homepage":null,"size":0,"stargazers_count":0,',
+        '"watchers_count":0,"language":null,"has_issues":true,"has_projects":true,"has_downloads":true,',
+        '"has_wiki":true,"has_pages":false,"has_discussions":false,"forks_count":0,"mirror_url":null,',
+        '"archived":false,"disabled":false,"open_issues_count":0,"license":null,"allow_forking":true,',
+        '"is_template":false,"web_commit_signoff_required":false,"topics":[],"visibility":"private",',
+        '"forks":0,"open_issues":0,"watchers":0,"default_branch":"main","master_branch":"main",',
+        '"private":true,"fork":false,"description":null,"full_name":"","owner":{"name":"","email":"","login":"","id":',
+        '"ref":"refs/heads/main","before":"","after":"","base_ref":null,"created":false,"deleted":false,',
+        '"forced":false,"compare":"","commits":[{"id":"","tree_id":"","distinct":true,"message":"","timestamp":"",',
+        '"author":{"name":"","email":"","username":""},"committer":{"name":"GitHub","email":"noreply@github.com",',
+        '"username":"web-flow"},"added":[],"removed":[],"modified":[]}],"head_commit":',
+        '"pusher":{"name":"","email":""},"sender":{"login":"","id":0,"installation":{"id":0,"node_id":""}',
+        '"action":"opened","number":0,"pull_request":{"id":0,"state":"open","locked":false,"title":"","user":',
+        '"body":null,"closed_at":null,"merged_at":null,"merge_commit_sha":null,"assignee":null,"assignees":[],',
+        '"requested_reviewers":[],"requested_teams":[],"labels":[],"milestone":null,"draft":false,',
+        '"head":{"label":"","ref":"","sha":"","user":{},"repo":{}},"base":{"label":"","ref":"main","sha":"",',
+        '"_links":{"self":{"href":""},"html":{"href":""},"issue":{"href":""},"comments":{"href":""},',
+        '"review_comments":{"href":""},"review_comment":{"href":""},"commits":{"href":""},"statuses":{"href":""}},',
+        '"author_association":"OWNER","auto_merge":null,"active_lock_reason":null,"merged":false,"mergeable":null,',
+        '"rebaseable":null,"mergeable_state":"unknown","merged_by":null,"comments":0,"review_comments":0,',
+        '"maintainer_can_modify":false,"additions":0,"deletions":0,"changed_files":0},"repository":{"id":',
+    ]
+).encode("utf-8")
+
+_DICTIONARIES: dict[int, bytes] = {CODEC_ZLIB_DICT_V1: _ZDICT_V1}
+
+
+def encode_json(value: Any, *, min_bytes: int = settings.db_payload_compress_min_bytes) -> str | bytes:
+    text = json.dumps(value, ensure_ascii=False)
+    raw = text.encode("utf-8")
+    if min_bytes <= 0 or len(raw) < min_bytes:
+        return text
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS, 8, zlib.Z_DEFAULT_STRATEGY, _ZDICT_V1)
+    packed = bytes([CODEC_ZLIB_DICT_V1]) + compressor.compress(raw) + compressor.flush()
+    # Incompressible payloads are kept as text so they stay greppable in the sqlite shell.
+    return packed if len(packed) < len(raw) else text
+
+
+def decode_json(stored: str | bytes) -> Any:
+    if isinstance(stored, str):
+        return json.loads(stored)
+
+    version = stored[0]
+    zdict = _DICTIONARIES.get(version)
+    if zdict is None:
+        raise ValueError(f"지원하지 않는 payload 인코딩 버전입니다: {version}")
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS, zdict)
+    raw = decompressor.decompress(stored[1:]) + decompressor.flush()
+    return json.loads(raw)
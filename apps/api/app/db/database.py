@@ -1,255 +1,490 @@
 from __future__ import annotations
 
+import contextvars
 import json
+import re
 import sqlite3
+from collections.abc import Mapping
+from concurrent.futures import Future
 from contextlib import contextmanager
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from threading import Lock
-from typing import Any, Iterable, Optional
+from queue import Empty, LifoQueue, Queue
+from threading import Lock, Thread, local
+from time import perf_counter
+from typing import Any, Callable, Iterable, Optional
 
 from app.core.settings import settings
+from app.db.instrumentation import QueryStats, query_stats
+from app.db.migrations import apply_migrations
+from app.db.sharding import ShardManager
+
+
+WriteOp = Callable[[sqlite3.Connection], Any]
+_STOP = object()
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _json_default(value: Any) -> Any:
+    # LazyRecord and other read-only mappings returned by list queries.
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
 
 
 class AppDatabase:
-    def __init__(self, db_path: str) -> None:
+    """SQLite access with a pooled set of connections.
+
+    write_mode="lock": every pooled connection may write; writers are serialized on `_lock`.
+    write_mode="queue": pooled connections are read-only and a single writer thread drains
+    a bounded queue of writes, group-committing up to `write_batch_size` statements per
+    transaction. If the writer thread dies, queued and later writes fail instead of waiting.
+
+    With `shard_dir` set this instance is the catalog DB and `for_workspace()` returns a
+    per-workspace shard (lock write mode, so each shard has its own writer lock).
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        pool_size: int = settings.db_pool_size,
+        busy_timeout_ms: int = settings.db_busy_timeout_ms,
+        journal_mode: str = settings.db_journal_mode,
+        synchronous: str = settings.db_synchronous,
+        write_mode: str = settings.db_write_mode,
+        write_batch_size: int = settings.db_write_batch_size,
+        write_queue_size: int = settings.db_write_queue_size,
+        stats: Optional[QueryStats] = None,
+        shard_dir: str = settings.db_shard_dir,
+        shard_max_open: int = settings.db_shard_max_open,
+    ) -> None:
         self.db_path = db_path
+        self.pool_size = max(1, pool_size)
+        self.busy_timeout_ms = busy_timeout_ms
+        self.journal_mode = journal_mode.upper()
+        self.synchronous = synchronous.upper()
+        self.write_mode = write_mode.lower()
+        if self.write_mode not in {"lock", "queue"}:
+            raise ValueError(f"지원하지 않는 DB write mode입니다: {write_mode}")
+        self.write_batch_size = max(1, write_batch_size)
+        self.stats = stats if stats is not None else query_stats
+        # SQLite allows a single writer at a time; serialize writers here instead of
+        # letting them spin on SQLITE_BUSY. Readers never take this lock.
         self._lock = Lock()
+        self._pool: LifoQueue[sqlite3.Connection] = LifoQueue()
+        self._pool_guard = Lock()
+        self._opened = 0
+        # Set by close(); connections still checked out are closed on release instead of pooled.
+        self._closed = False
+        self._write_queue: Queue[Any] = Queue(maxsize=max(1, write_queue_size))
+        self._writer: Optional[Thread] = None
+        self._writer_error: Optional[BaseException] = None
+        self._tx_conn: Optional[sqlite3.Connection] = None
+        self._local = local()
         self._ensure_parent()
         self._init_schema()
+        if self.write_mode == "queue":
+            self._start_writer()
+        self.shards: Optional[ShardManager] = None
+        if shard_dir:
+            self.shards = ShardManager(shard_dir, max_open=shard_max_open, factory=self._open_shard)
+
+    def _open_shard(self, path: str) -> "AppDatabase":
+        return AppDatabase(
+            path,
+            pool_size=settings.db_shard_pool_size,
+            busy_timeout_ms=self.busy_timeout_ms,
+            journal_mode=self.journal_mode,
+            synchronous=self.synchronous,
+            write_mode="lock",
+            stats=self.stats,
+            shard_dir="",
+        )
+
+    def for_workspace(self, workspace_id: Optional[int]) -> "AppDatabase":
+        """Database holding workspace-scoped tables (see sharding.WORKSPACE_TABLES) for a workspace."""
+        if self.shards is None or workspace_id is None:
+            return self
+        return self.shards.get(int(workspace_id))
 
     def _ensure_parent(self) -> None:
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
 
+    def _open(self, *, readonly: bool = False, autocommit: bool = False) -> sqlite3.Connection:
+        if readonly:
+            target = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+        else:
+            target = self.db_path
+        conn = sqlite3.connect(
+            target,
+            check_same_thread=False,
+            timeout=self.busy_timeout_ms / 1000,
+            uri=readonly,
+            isolation_level=None if autocommit else "",
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        if readonly:
+            conn.execute("PRAGMA query_only=1")
+        else:
+            conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-16000")
+        conn.execute("PRAGMA mmap_size=268435456")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._pool.get_nowait()
+        except Empty:
+            pass
+
+        with self._pool_guard:
+            can_open = self._opened < self.pool_size
+            if can_open:
+                self._opened += 1
+        if not can_open:
+            return self._pool.get()
+
+        try:
+            return self._open(readonly=self.write_mode == "queue")
+        except Exception:
+            with self._pool_guard:
+                self._opened -= 1
+            raise
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        with self._pool_guard:
+            if self._closed:
+                conn.close()
+                self._opened -= 1
+                return
+        self._pool.put(conn)
+
     @contextmanager
     def _connect(self) -> Iterable[sqlite3.Connection]:
-        conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        conn.row_factory = sqlite3.Row
+        tx_conn = self._current_transaction()
+        if tx_conn is not None:
+            # Inside db.transaction(): read and write on the transaction's connection so the
+            # caller sees its own uncommitted rows; commit happens when the outermost block exits.
+            yield tx_conn
+            return
+
+        conn = self._acquire()
         try:
             yield conn
             conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._release(conn)
+
+    def _start_writer(self) -> None:
+        self._writer = Thread(target=self._writer_loop, name=f"db-writer:{Path(self.db_path).name}", daemon=True)
+        self._writer.start()
+
+    def _writer_loop(self) -> None:
+        batch: list[tuple[WriteOp, Future]] = []
+        try:
+            conn = self._open(autocommit=True)
+        except BaseException as exc:
+            self._writer_failed(exc, batch)
+            return
+        try:
+            while True:
+                item = self._write_queue.get()
+                if item is _STOP:
+                    return
+                batch = [item]
+                stop = False
+                while len(batch) < self.write_batch_size:
+                    try:
+                        item = self._write_queue.get_nowait()
+                    except Empty:
+                        break
+                    if item is _STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+                with self._lock:
+                    self._commit_batch(conn, batch)
+                batch = []
+                if stop:
+                    return
+        except BaseException as exc:
+            self._writer_failed(exc, batch)
         finally:
             conn.close()
 
+    def _writer_failed(self, exc: BaseException, batch: list[tuple[WriteOp, Future]]) -> None:
+        self._writer_error = exc
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(exc)
+        self._fail_pending_writes()
+
+    def _fail_pending_writes(self) -> None:
+        error = RuntimeError("DB writer 스레드가 중단되었습니다.")
+        error.__cause__ = self._writer_error
+        while True:
+            try:
+                item = self._write_queue.get_nowait()
+            except Empty:
+                return
+            if item is not _STOP and not item[1].done():
+                item[1].set_exception(error)
+
     @staticmethod
-    def _column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
-        rows = conn.execute(f"PRAGMA table_info({table})").fetchall()
-        return any(row[1] == column for row in rows)
+    def _commit_batch(conn: sqlite3.Connection, batch: list[tuple[WriteOp, Future]]) -> None:
+        outcomes: list[tuple[Future, Any, Optional[BaseException]]] = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for op, future in batch:
+                # A savepoint per op so one failing statement does not abort the group commit.
+                conn.execute("SAVEPOINT write_op")
+                try:
+                    result = op(conn)
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO write_op")
+                    conn.execute("RELEASE write_op")
+                    outcomes.append((future, None, exc))
+                else:
+                    conn.execute("RELEASE write_op")
+                    outcomes.append((future, result, None))
+            conn.execute("COMMIT")
+        except Exception as exc:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _submit(self, op: WriteOp) -> Future:
+        future: Future = Future()
+        tx_conn = self._current_transaction()
+        if tx_conn is not None:
+            try:
+                future.set_result(op(tx_conn))
+            except Exception as exc:
+                future.set_exception(exc)
+            return future
+
+        if self.write_mode == "queue":
+            if self._writer_error is not None:
+                raise RuntimeError("DB writer 스레드가 중단되었습니다.") from self._writer_error
+            self._write_queue.put((op, future))
+            if self._writer_error is not None:
+                # The writer died while this write was being queued; nobody will drain it.
+                self._fail_pending_writes()
+            return future
 
-    def _add_column_if_missing(self, conn: sqlite3.Connection, table: str, column: str, sql_type: str) -> None:
-        if not self._column_exists(conn, table, column):
-            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {sql_type}")
+        try:
+            with self._lock:
+                with self._connect() as conn:
+                    future.set_result(op(conn))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
 
-    def _init_schema(self) -> None:
-        with self._lock:
+    def _write(self, query: str, params: Any, op: WriteOp, *, explainable: bool = True) -> Any:
+        started = perf_counter()
+        began: list[float] = []
+
+        def timed(conn: sqlite3.Connection) -> Any:
+            began.append(perf_counter())
+            return op(conn)
+
+        try:
+            return self._submit(timed).result()
+        finally:
+            self._observe(query, params, started, began[0] if began else started, explainable=explainable)
+
+    def _read(self, query: str, params: tuple[Any, ...], fetch: Callable[[sqlite3.Cursor], Any]) -> Any:
+        started = perf_counter()
+        acquired = started
+        try:
             with self._connect() as conn:
-                conn.executescript(
-                    """
-                    CREATE TABLE IF NOT EXISTS users (
-                        email TEXT PRIMARY KEY,
-                        display_name TEXT,
-                        created_at TEXT NOT NULL,
-                        updated_at TEXT NOT NULL
-                    );
-
-                    CREATE TABLE IF NOT EXISTS workspaces (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT NOT NULL,
-                        owner_email TEXT NOT NULL,
-                        created_at TEXT NOT NULL,
-                        updated_at TEXT NOT NULL,
-                        FOREIGN KEY(owner_email) REFERENCES users(email)
-                    );
-
-                    CREATE TABLE IF NOT EXISTS workspace_members (
-                        workspace_id INTEGER NOT NULL,
-                        user_email TEXT NOT NULL,
-                        role TEXT NOT NULL,
-                        created_at TEXT NOT NULL,
-                        updated_at TEXT NOT NULL,
-                        PRIMARY KEY(workspace_id, user_email),
-                        FOREIGN KEY(workspace_id) REFERENCES workspaces(id),
-                        FOREIGN KEY(user_email) REFERENCES users(email)
-                    );
-
-                    CREATE TABLE IF NOT EXISTS oauth_accounts (
-                        provider TEXT NOT NULL,
-                        user_email TEXT NOT NULL,
-                        access_token TEXT,
-                        refresh_token TEXT,
-                        scope TEXT,
-                        token_type TEXT,
-                        expires_at TEXT,
-                        created_at TEXT NOT NULL,
-                        updated_at TEXT NOT NULL,
-                        PRIMARY KEY (provider, user_email)
-                    );
-
-                    CREATE TABLE IF NOT EXISTS github_events (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        workspace_id INTEGER,
-                        event_type TEXT NOT NULL,
-                        repo TEXT,
-                        actor TEXT,
-                        payload_json TEXT NOT NULL,
-                        created_at TEXT NOT NULL
-                    );
-
-                    CREATE TABLE IF NOT EXISTS github_installations (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        workspace_id INTEGER NOT NULL,
-                        installation_id INTEGER NOT NULL,
-                        account_login TEXT,
-                        created_at TEXT NOT NULL,
-                        updated_at TEXT NOT NULL,
-                        UNIQUE(workspace_id, installation_id)
-                    );
-
-                    CREATE TABLE IF NOT EXISTS github_repos (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        workspace_id INTEGER NOT NULL,
-                        installation_id INTEGER,
-                        repo_id INTEGER,
-                        full_name TEXT NOT NULL,
-                        default_branch TEXT,
-                        is_private INTEGER NOT NULL DEFAULT 0,
-                        linked_by TEXT,
-                        created_at TEXT NOT NULL,
-                        updated_at TEXT NOT NULL
-                    );
-
-                    CREATE TABLE IF NOT EXISTS docs (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        workspace_id INTEGER,
-                        space TEXT NOT NULL,
-                        title TEXT NOT NULL,
-                        content TEXT NOT NULL,
-                        tags_json TEXT NOT NULL,
-                        created_by TEXT,
-                        created_at TEXT NOT NULL,
-                        updated_at TEXT NOT NULL
-                    );
-
-                    CREATE TABLE IF NOT EXISTS chat_channels (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        workspace_id INTEGER,
-                        name TEXT NOT NULL,
-                        description TEXT,
-                        created_by TEXT,
-                        created_at TEXT NOT NULL,
-                        UNIQUE(workspace_id, name)
-                    );
-
-                    CREATE TABLE IF NOT EXISTS chat_messages (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        channel_id INTEGER NOT NULL,
-                        sender TEXT NOT NULL,
-                        content TEXT NOT NULL,
-                        created_at TEXT NOT NULL,
-                        FOREIGN KEY(channel_id) REFERENCES chat_channels(id)
-                    );
-
-                    CREATE TABLE IF NOT EXISTS reports (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        workspace_id INTEGER,
-                        report_type TEXT NOT NULL,
-                        period_start TEXT NOT NULL,
-                        period_end TEXT NOT NULL,
-                        title TEXT NOT NULL,
-                        content TEXT NOT NULL,
-                        created_by TEXT,
-                        created_at TEXT NOT NULL
-                    );
-
-                    CREATE TABLE IF NOT EXISTS billing_invoices (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        workspace_id INTEGER,
-                        customer TEXT NOT NULL,
-                        business_no TEXT,
-                        amount REAL NOT NULL,
-                        tax_amount REAL NOT NULL,
-                        status TEXT NOT NULL,
-                        metadata_json TEXT NOT NULL,
-                        created_by TEXT,
-                        created_at TEXT NOT NULL,
-                        updated_at TEXT NOT NULL
-                    );
-
-                    CREATE TABLE IF NOT EXISTS approvals (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        workspace_id INTEGER NOT NULL,
-                        request_type TEXT NOT NULL,
-                        payload_json TEXT NOT NULL,
-                        reason TEXT,
-                        status TEXT NOT NULL,
-                        requested_by TEXT NOT NULL,
-                        requested_at TEXT NOT NULL,
-                        decided_by TEXT,
-                        decided_at TEXT,
-                        decision_note TEXT
-                    );
-
-                    CREATE TABLE IF NOT EXISTS agent_execution_logs (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        workspace_id INTEGER NOT NULL,
-                        user_email TEXT NOT NULL,
-                        instruction TEXT NOT NULL,
-                        context_json TEXT NOT NULL,
-                        steps_json TEXT,
-                        outputs_json TEXT,
-                        status TEXT NOT NULL,
-                        error_message TEXT,
-                        created_at TEXT NOT NULL,
-                        updated_at TEXT NOT NULL
-                    );
-                    """
-                )
-
-                # Backward-compat migrations for older local DBs
-                self._add_column_if_missing(conn, "oauth_accounts", "token_type", "TEXT")
-                self._add_column_if_missing(conn, "oauth_accounts", "expires_at", "TEXT")
-                self._add_column_if_missing(conn, "docs", "workspace_id", "INTEGER")
-                self._add_column_if_missing(conn, "docs", "created_by", "TEXT")
-                self._add_column_if_missing(conn, "chat_channels", "workspace_id", "INTEGER")
-                self._add_column_if_missing(conn, "chat_channels", "created_by", "TEXT")
-                self._add_column_if_missing(conn, "reports", "workspace_id", "INTEGER")
-                self._add_column_if_missing(conn, "reports", "created_by", "TEXT")
-                self._add_column_if_missing(conn, "billing_invoices", "workspace_id", "INTEGER")
-                self._add_column_if_missing(conn, "billing_invoices", "created_by", "TEXT")
-                self._add_column_if_missing(conn, "github_events", "workspace_id", "INTEGER")
+                acquired = perf_counter()
+                return fetch(conn.execute(query, params))
+        finally:
+            self._observe(query, params, started, acquired)
+
+    def _observe(self, query: str, params: Any, started: float, began: float, *, explainable: bool = True) -> None:
+        """Record statement time; `began - started` is time spent waiting for the lock, queue or pool."""
+        if not self.stats.enabled:
+            return
+        now = perf_counter()
+        self.stats.record(
+            query,
+            elapsed_ms=(now - started) * 1000,
+            wait_ms=(began - started) * 1000,
+            explain=(lambda: self.explain(query, params)) if explainable and isinstance(params, tuple) else None,
+        )
+
+    def explain(self, query: str, params: tuple[Any, ...] = ()) -> list[str]:
+        with self._connect() as conn:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+        return [row["detail"] for row in rows]
+
+    def submit(self, query: str, params: tuple[Any, ...] = ()) -> Future:
+        """Queue a write without waiting; `.result()` blocks until it is committed."""
+        started = perf_counter()
+        context = contextvars.copy_context()
+        future = self._submit(lambda conn: conn.execute(query, params).rowcount)
+        future.add_done_callback(lambda _: context.run(self._observe, query, params, started, started))
+        return future
+
+    def _current_transaction(self) -> Optional[sqlite3.Connection]:
+        return getattr(self._local, "conn", None)
+
+    def in_transaction(self) -> bool:
+        return self._current_transaction() is not None
+
+    @contextmanager
+    def transaction(self) -> Iterable[None]:
+        """Unit of work: every db call on this thread inside the block shares one connection
+        and commits once. Nested blocks become savepoints and roll back independently."""
+        conn = self._current_transaction()
+        if conn is not None:
+            depth = self._local.depth
+            savepoint = f"uow_{depth}"
+            self._local.depth = depth + 1
+            conn.execute(f"SAVEPOINT {savepoint}")
+            try:
+                yield
+            except BaseException:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+                raise
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+            finally:
+                self._local.depth = depth
+            return
+
+        started = perf_counter()
+        with self._lock:
+            acquired = perf_counter()
+            if self._tx_conn is None:
+                self._tx_conn = self._open(autocommit=True)
+            conn = self._tx_conn
+            conn.execute("BEGIN IMMEDIATE")
+            self._local.conn = conn
+            self._local.depth = 1
+            try:
+                yield
+                conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            finally:
+                self._local.conn = None
+                if self._closed:
+                    conn.close()
+                    self._tx_conn = None
+                self._observe("TRANSACTION", (), started, acquired, explainable=False)
+
+    def close(self) -> None:
+        if self.shards is not None:
+            self.shards.close_all()
+        if self._writer is not None:
+            if self._writer.is_alive():
+                self._write_queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+        with self._lock:
+            if self._tx_conn is not None:
+                self._tx_conn.close()
+                self._tx_conn = None
+        with self._pool_guard:
+            self._closed = True
+            while True:
+                try:
+                    conn = self._pool.get_nowait()
+                except Empty:
+                    break
+                conn.close()
+                self._opened -= 1
+
+    def _init_schema(self) -> None:
+        conn = self._open(autocommit=True)
+        try:
+            apply_migrations(conn)
+        finally:
+            conn.close()
+
+    def vacuum(self) -> None:
+        # VACUUM cannot run inside the writer's transactions, so it gets its own autocommit connection.
+        conn = self._open(autocommit=True)
+        try:
+            with self._lock:
+                conn.execute("VACUUM")
+        finally:
+            conn.close()
 
     @staticmethod
     def now_iso() -> str:
         return datetime.now(timezone.utc).isoformat()
 
+    @staticmethod
+    def epoch_ms(value: str | datetime) -> int:
+        """Sortable integer timestamp stored next to ISO columns (`*_ts`) for indexed range scans."""
+        moment = datetime.fromisoformat(value) if isinstance(value, str) else value
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        # Rounded to the millisecond exactly as SQLite's julianday() does (seconds as a double,
+        # half up), so rows backfilled in SQL (migrations._epoch_ms_sql) and rows written here agree.
+        moment = moment.astimezone(timezone.utc)
+        minute = moment.replace(second=0, microsecond=0)
+        seconds = moment.second + moment.microsecond / 1_000_000
+        return (minute - _EPOCH) // timedelta(milliseconds=1) + int(seconds * 1000 + 0.5)
+
     @staticmethod
     def to_json(value: Any) -> str:
-        return json.dumps(value, ensure_ascii=False)
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
 
     @staticmethod
     def from_json(value: str) -> Any:
         return json.loads(value)
 
     def execute(self, query: str, params: tuple[Any, ...] = ()) -> None:
-        with self._lock:
-            with self._connect() as conn:
-                conn.execute(query, params)
+        self._write(query, params, lambda conn: conn.execute(query, params))
 
-    def executemany(self, query: str, params: list[tuple[Any, ...]]) -> None:
-        with self._lock:
-            with self._connect() as conn:
-                conn.executemany(query, params)
+    def executemany(self, query: str, params: list[tuple[Any, ...]]) -> int:
+        """Returns the number of rows changed (rows skipped by ON CONFLICT DO NOTHING are not counted)."""
+        return self._write(query, params, lambda conn: conn.executemany(query, params).rowcount)
+
+    def insert_returning(self, query: str, params: tuple[Any, ...] = ()) -> dict[str, Any]:
+        """Run an INSERT and return the inserted row from the same connection and transaction.
+
+        `RETURNING *` is appended unless the statement already has a RETURNING clause.
+        """
+        statement = query.strip().rstrip(";")
+        if not re.search(r"\breturning\b", statement, re.IGNORECASE):
+            statement = f"{statement} RETURNING *"
+        rows = self._write(statement, params, lambda conn: conn.execute(statement, params).fetchall())
+        if not rows:
+            raise ValueError("INSERT ... RETURNING 결과가 비어 있습니다.")
+        return dict(rows[0])
 
     def fetchone(self, query: str, params: tuple[Any, ...] = ()) -> Optional[dict[str, Any]]:
-        with self._lock:
-            with self._connect() as conn:
-                row = conn.execute(query, params).fetchone()
+        row = self._read(query, params, lambda cursor: cursor.fetchone())
         return dict(row) if row else None
 
     def fetchall(self, query: str, params: tuple[Any, ...] = ()) -> list[dict[str, Any]]:
-        with self._lock:
-            with self._connect() as conn:
-                rows = conn.execute(query, params).fetchall()
+        rows = self._read(query, params, lambda cursor: cursor.fetchall())
         return [dict(row) for row in rows]
 
     def clear_all(self) -> None:
@@ -257,22 +492,28 @@ class AppDatabase:
             "agent_execution_logs",
             "approvals",
             "billing_invoices",
+            "report_jobs",
             "reports",
             "chat_messages",
             "chat_channels",
             "docs",
             "github_repos",
             "github_installations",
+            "github_event_rollups",
             "github_events",
             "oauth_accounts",
             "workspace_members",
             "workspaces",
             "users",
         ]
-        with self._lock:
-            with self._connect() as conn:
-                for table in tables:
-                    conn.execute(f"DELETE FROM {table}")
+
+        def _delete_all(conn: sqlite3.Connection) -> None:
+            for table in tables:
+                conn.execute(f"DELETE FROM {table}")
+
+        self._write("clear_all", (), _delete_all, explainable=False)
+        if self.shards is not None:
+            self.shards.drop_all()
 
 
 db = AppDatabase(settings.db_path)
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import logging
+import re
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Callable, Optional
+
+from app.core.settings import settings
+
+logger = logging.getLogger("app.db")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(query: str) -> str:
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+@dataclass
+class StatementStats:
+    statement: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    wait_ms: float = 0.0
+
+    def add(self, elapsed_ms: float, wait_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.wait_ms += wait_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+
+    def as_dict(self) -> dict:
+        return {
+            "statement": self.statement,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "wait_ms": round(self.wait_ms, 3),
+        }
+
+
+@dataclass
+class RequestQueryStats:
+    """Statements issued while serving one HTTP request (bound through `current_request_stats`)."""
+
+    count: int = 0
+    total_ms: float = 0.0
+    wait_ms: float = 0.0
+    statements: dict[str, int] = field(default_factory=dict)
+
+    def add(self, statement: str, elapsed_ms: float, wait_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.wait_ms += wait_ms
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def repeated(self, min_count: int = 2) -> list[tuple[str, int]]:
+        return sorted(
+            ((statement, count) for statement, count in self.statements.items() if count >= min_count),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+
+current_request_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_request_stats", default=None)
+
+
+class QueryStats:
+    def __init__(self, *, enabled: bool = settings.db_instrumentation, slow_query_ms: float = settings.db_slow_query_ms) -> None:
+        self.enabled = enabled
+        self.slow_query_ms = slow_query_ms
+        self._lock = Lock()
+        self._statements: dict[str, StatementStats] = {}
+        self._slow: deque[dict] = deque(maxlen=100)
+
+    def record(
+        self,
+        query: str,
+        *,
+        elapsed_ms: float,
+        wait_ms: float = 0.0,
+        explain: Optional[Callable[[], list[str]]] = None,
+    ) -> None:
+        if not self.enabled:
+            return
+        statement = normalize_sql(query)
+        with self._lock:
+            stats = self._statements.get(statement)
+            if stats is None:
+                stats = self._statements[statement] = StatementStats(statement)
+            stats.add(elapsed_ms, wait_ms)
+
+        request_stats = current_request_stats.get()
+        if request_stats is not None:
+            request_stats.add(statement, elapsed_ms, wait_ms)
+
+        if self.slow_query_ms > 0 and elapsed_ms >= self.slow_query_ms:
+            plan: list[str] = []
+            if explain is not None:
+                try:
+                    plan = explain()
+                except Exception as exc:  # pragma: no cover - diagnostics only
+                    plan = [f"EXPLAIN 실패: {exc}"]
+            entry = {
+                "statement": statement,
+                "elapsed_ms": round(elapsed_ms, 3),
+                "wait_ms": round(wait_ms, 3),
+                "plan": plan,
+            }
+            with self._lock:
+                self._slow.append(entry)
+            logger.warning("slow query %.1fms (wait %.1fms): %s | plan: %s", elapsed_ms, wait_ms, statement, " / ".join(plan))
+
+    def top(self, limit: int = 20, order_by: str = "total_ms") -> list[dict]:
+        if order_by not in {"total_ms", "count", "max_ms", "wait_ms"}:
+            raise ValueError(f"지원하지 않는 정렬 기준입니다: {order_by}")
+        with self._lock:
+            items = sorted(self._statements.values(), key=lambda item: getattr(item, order_by), reverse=True)
+            return [item.as_dict() for item in items[:limit]]
+
+    def slow_queries(self) -> list[dict]:
+        with self._lock:
+            return list(self._slow)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self._slow.clear()
+
+
+query_stats = QueryStats()
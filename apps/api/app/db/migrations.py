@@ -0,0 +1,529 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    rows = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    return any(row[1] == column for row in rows)
+
+
+def _add_column_if_missing(conn: sqlite3.Connection, table: str, column: str, sql_type: str) -> None:
+    if not _column_exists(conn, table, column):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {sql_type}")
+
+
+def _run_statements(conn: sqlite3.Connection, statements: list[str]) -> None:
+    for statement in statements:
+        conn.execute(statement)
+
+
+BASELINE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        email TEXT PRIMARY KEY,
+        display_name TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS workspaces (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        owner_email TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        FOREIGN KEY(owner_email) REFERENCES users(email)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS workspace_members (
+        workspace_id INTEGER NOT NULL,
+        user_email TEXT NOT NULL,
+        role TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        PRIMARY KEY(workspace_id, user_email),
+        FOREIGN KEY(workspace_id) REFERENCES workspaces(id),
+        FOREIGN KEY(user_email) REFERENCES users(email)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS oauth_accounts (
+        provider TEXT NOT NULL,
+        user_email TEXT NOT NULL,
+        access_token TEXT,
+        refresh_token TEXT,
+        scope TEXT,
+        token_type TEXT,
+        expires_at TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        PRIMARY KEY (provider, user_email)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS github_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        workspace_id INTEGER,
+        event_type TEXT NOT NULL,
+        repo TEXT,
+        actor TEXT,
+        payload_json TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS github_installations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        workspace_id INTEGER NOT NULL,
+        installation_id INTEGER NOT NULL,
+        account_login TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        UNIQUE(workspace_id, installation_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS github_repos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        workspace_id INTEGER NOT NULL,
+        installation_id INTEGER,
+        repo_id INTEGER,
+        full_name TEXT NOT NULL,
+        default_branch TEXT,
+        is_private INTEGER NOT NULL DEFAULT 0,
+        linked_by TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS docs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        workspace_id INTEGER,
+        space TEXT NOT NULL,
+        title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        tags_json TEXT NOT NULL,
+        created_by TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS chat_channels (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        workspace_id INTEGER,
+        name TEXT NOT NULL,
+        description TEXT,
+        created_by TEXT,
+        created_at TEXT NOT NULL,
+        UNIQUE(workspace_id, name)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS chat_messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        channel_id INTEGER NOT NULL,
+        sender TEXT NOT NULL,
+        content TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        FOREIGN KEY(channel_id) REFERENCES chat_channels(id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS reports (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        workspace_id INTEGER,
+        report_type TEXT NOT NULL,
+        period_start TEXT NOT NULL,
+        period_end TEXT NOT NULL,
+        title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        created_by TEXT,
+        created_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS billing_invoices (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        workspace_id INTEGER,
+        customer TEXT NOT NULL,
+        business_no TEXT,
+        amount REAL NOT NULL,
+        tax_amount REAL NOT NULL,
+        status TEXT NOT NULL,
+        metadata_json TEXT NOT NULL,
+        created_by TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS approvals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        workspace_id INTEGER NOT NULL,
+        request_type TEXT NOT NULL,
+        payload_json TEXT NOT NULL,
+        reason TEXT,
+        status TEXT NOT NULL,
+        requested_by TEXT NOT NULL,
+        requested_at TEXT NOT NULL,
+        decided_by TEXT,
+        decided_at TEXT,
+        decision_note TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS agent_execution_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        workspace_id INTEGER NOT NULL,
+        user_email TEXT NOT NULL,
+        instruction TEXT NOT NULL,
+        context_json TEXT NOT NULL,
+        steps_json TEXT,
+        outputs_json TEXT,
+        status TEXT NOT NULL,
+        error_message TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """,
+]
+
+
+def _m001_baseline(conn: sqlite3.Connection) -> None:
+    _run_statements(conn, BASELINE_TABLES)
+
+    # Backward-compat for local DBs created before the migration table existed
+    _add_column_if_missing(conn, "oauth_accounts", "token_type", "TEXT")
+    _add_column_if_missing(conn, "oauth_accounts", "expires_at", "TEXT")
+    _add_column_if_missing(conn, "docs", "workspace_id", "INTEGER")
+    _add_column_if_missing(conn, "docs", "created_by", "TEXT")
+    _add_column_if_missing(conn, "chat_channels", "workspace_id", "INTEGER")
+    _add_column_if_missing(conn, "chat_channels", "created_by", "TEXT")
+    _add_column_if_missing(conn, "reports", "workspace_id", "INTEGER")
+    _add_column_if_missing(conn, "reports", "created_by", "TEXT")
+    _add_column_if_missing(conn, "billing_invoices", "workspace_id", "INTEGER")
+    _add_column_if_missing(conn, "billing_invoices", "created_by", "TEXT")
+    _add_column_if_missing(conn, "github_events", "workspace_id", "INTEGER")
+
+
+HOT_PATH_INDEXES = [
+    # github_service.list_events / events_between, events_after / latest_event_id (SSE tail)
+    "CREATE INDEX IF NOT EXISTS idx_github_events_workspace_id ON github_events(workspace_id, id)",
+    # github_integration_service.resolve_workspace_from_installation (covering)
+    "CREATE INDEX IF NOT EXISTS idx_github_installations_installation ON github_installations(installation_id, id, workspace_id)",
+    # github_integration_service.list_linked_repos
+    "CREATE INDEX IF NOT EXISTS idx_github_repos_workspace_id ON github_repos(workspace_id, id)",
+    # docs_service.list / search
+    "CREATE INDEX IF NOT EXISTS idx_docs_workspace_updated ON docs(workspace_id, updated_at)",
+    "CREATE INDEX IF NOT EXISTS idx_docs_workspace_space_updated ON docs(workspace_id, space, updated_at)",
+    # chat_service.list_messages
+    "CREATE INDEX IF NOT EXISTS idx_chat_messages_channel_id ON chat_messages(channel_id, id)",
+    # approval_service.list_requests
+    "CREATE INDEX IF NOT EXISTS idx_approvals_workspace_id ON approvals(workspace_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_approvals_workspace_status ON approvals(workspace_id, status, id)",
+    # report_service.list_reports
+    "CREATE INDEX IF NOT EXISTS idx_reports_workspace_id ON reports(workspace_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_reports_workspace_type ON reports(workspace_id, report_type, id)",
+    # billing_service.list_invoices
+    "CREATE INDEX IF NOT EXISTS idx_billing_invoices_workspace_id ON billing_invoices(workspace_id, id)",
+    # execution_log_service.list_logs
+    "CREATE INDEX IF NOT EXISTS idx_agent_execution_logs_workspace_id ON agent_execution_logs(workspace_id, id)",
+    # workspace_service.list_workspaces (covering)
+    "CREATE INDEX IF NOT EXISTS idx_workspace_members_user ON workspace_members(user_email, workspace_id, role)",
+]
+
+
+def _m002_hot_path_indexes(conn: sqlite3.Connection) -> None:
+    _run_statements(conn, HOT_PATH_INDEXES)
+
+
+def _epoch_ms_sql(column: str) -> str:
+    return f"CAST(ROUND((julianday({column}) - 2440587.5) * 86400000) AS INTEGER)"
+
+
+# (table, epoch column, ISO source column, index columns)
+EPOCH_COLUMNS = [
+    ("github_events", "created_ts", "created_at", "workspace_id, created_ts"),
+    ("chat_messages", "created_ts", "created_at", "channel_id, created_ts"),
+    ("agent_execution_logs", "created_ts", "created_at", "workspace_id, created_ts"),
+    ("approvals", "requested_ts", "requested_at", "workspace_id, requested_ts"),
+    ("docs", "updated_ts", "updated_at", "workspace_id, updated_ts"),
+    ("reports", "created_ts", "created_at", "workspace_id, created_ts"),
+]
+
+
+def _m003_epoch_timestamps(conn: sqlite3.Connection) -> None:
+    for table, column, source, index_columns in EPOCH_COLUMNS:
+        _add_column_if_missing(conn, table, column, "INTEGER")
+        conn.execute(f"UPDATE {table} SET {column}={_epoch_ms_sql(source)} WHERE {column} IS NULL")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({index_columns})")
+
+    _run_statements(
+        conn,
+        [
+            "CREATE INDEX IF NOT EXISTS idx_approvals_workspace_status_ts ON approvals(workspace_id, status, requested_ts)",
+            "CREATE INDEX IF NOT EXISTS idx_docs_workspace_space_ts ON docs(workspace_id, space, updated_ts)",
+            "CREATE INDEX IF NOT EXISTS idx_reports_workspace_type_ts ON reports(workspace_id, report_type, created_ts)",
+            # Superseded by the epoch indexes above.
+            "DROP INDEX IF EXISTS idx_chat_messages_channel_id",
+            "DROP INDEX IF EXISTS idx_agent_execution_logs_workspace_id",
+            "DROP INDEX IF EXISTS idx_approvals_workspace_id",
+            "DROP INDEX IF EXISTS idx_approvals_workspace_status",
+            "DROP INDEX IF EXISTS idx_docs_workspace_updated",
+            "DROP INDEX IF EXISTS idx_docs_workspace_space_updated",
+            "DROP INDEX IF EXISTS idx_reports_workspace_id",
+            "DROP INDEX IF EXISTS idx_reports_workspace_type",
+        ],
+    )
+
+
+def _m004_membership_versions(conn: sqlite3.Connection) -> None:
+    # One row per workspace whose membership changed; `version` is a DB-wide sequence so other
+    # processes can ask "what changed since version N" with a single indexed range scan.
+    _run_statements(
+        conn,
+        [
+            """
+            CREATE TABLE IF NOT EXISTS membership_versions (
+                workspace_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_membership_versions_version ON membership_versions(version)",
+        ],
+    )
+
+
+def _m005_github_delivery_ids(conn: sqlite3.Connection) -> None:
+    # X-GitHub-Delivery GUID; NULL for events stored before this column or without the header.
+    _add_column_if_missing(conn, "github_events", "delivery_id", "TEXT")
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_github_events_delivery_id ON github_events(delivery_id) WHERE delivery_id IS NOT NULL"
+    )
+
+
+# Typed columns extracted from webhook payloads at ingest (github_service.event_columns).
+# Rows stored earlier are filled by scripts/backfill_event_columns.py.
+GITHUB_EVENT_COLUMNS = [
+    ("action", "TEXT"),
+    ("branch", "TEXT"),
+    ("commit_count", "INTEGER"),
+    ("pr_number", "INTEGER"),
+    ("merged", "INTEGER"),
+]
+
+
+def _m006_github_event_columns(conn: sqlite3.Connection) -> None:
+    for column, sql_type in GITHUB_EVENT_COLUMNS:
+        _add_column_if_missing(conn, "github_events", column, sql_type)
+    _run_statements(
+        conn,
+        [
+            "CREATE INDEX IF NOT EXISTS idx_github_events_workspace_type_ts ON github_events(workspace_id, event_type, created_ts)",
+            "CREATE INDEX IF NOT EXISTS idx_github_events_workspace_branch_ts ON github_events(workspace_id, branch, created_ts)",
+            "CREATE INDEX IF NOT EXISTS idx_github_events_workspace_pr ON github_events(workspace_id, pr_number) WHERE pr_number IS NOT NULL",
+        ],
+    )
+
+
+# Daily activity counts maintained by triggers on github_events, so every write path (webhook
+# queue, bulk import, direct inserts) updates them in the inserting transaction. Rows skipped by
+# ON CONFLICT DO NOTHING never fire the trigger. scripts/rebuild_event_rollups.py recomputes them.
+_M007_ROLLUP_REBUILD = """
+    INSERT INTO github_event_rollups(workspace_id, day, event_type, repo, actor, event_count, commit_count)
+    SELECT workspace_id, substr(created_at, 1, 10), event_type, COALESCE(repo, ''), COALESCE(actor, ''),
+           COUNT(*), COALESCE(SUM(commit_count), 0)
+    FROM github_events
+    WHERE workspace_id IS NOT NULL
+    GROUP BY workspace_id, substr(created_at, 1, 10), event_type, COALESCE(repo, ''), COALESCE(actor, '')
+"""
+
+
+def _m007_github_event_rollups(conn: sqlite3.Connection) -> None:
+    _run_statements(
+        conn,
+        [
+            """
+            CREATE TABLE IF NOT EXISTS github_event_rollups (
+                workspace_id INTEGER NOT NULL,
+                day TEXT NOT NULL,
+                event_type TEXT NOT NULL,
+                repo TEXT NOT NULL,
+                actor TEXT NOT NULL,
+                event_count INTEGER NOT NULL,
+                commit_count INTEGER NOT NULL,
+                PRIMARY KEY(workspace_id, day, event_type, repo, actor)
+            ) WITHOUT ROWID
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_github_events_rollup_insert
+            AFTER INSERT ON github_events
+            WHEN NEW.workspace_id IS NOT NULL
+            BEGIN
+                INSERT INTO github_event_rollups(workspace_id, day, event_type, repo, actor, event_count, commit_count)
+                VALUES (
+                    NEW.workspace_id, substr(NEW.created_at, 1, 10), NEW.event_type,
+                    COALESCE(NEW.repo, ''), COALESCE(NEW.actor, ''), 1, COALESCE(NEW.commit_count, 0)
+                )
+                ON CONFLICT(workspace_id, day, event_type, repo, actor) DO UPDATE SET
+                    event_count=event_count + 1,
+                    commit_count=commit_count + excluded.commit_count;
+            END
+            """,
+            "DELETE FROM github_event_rollups",
+            _M007_ROLLUP_REBUILD,
+        ],
+    )
+
+
+# Current definition, used by migration 8 and GithubService.rebuild_rollups.
+GITHUB_EVENT_ROLLUP_REBUILD = """
+    INSERT INTO github_event_rollups(workspace_id, day, event_type, repo, actor, event_count, commit_count, max_event_id)
+    SELECT workspace_id, substr(created_at, 1, 10), event_type, COALESCE(repo, ''), COALESCE(actor, ''),
+           COUNT(*), COALESCE(SUM(commit_count), 0), MAX(id)
+    FROM github_events
+    WHERE workspace_id IS NOT NULL
+    GROUP BY workspace_id, substr(created_at, 1, 10), event_type, COALESCE(repo, ''), COALESCE(actor, '')
+"""
+
+
+def _m008_report_watermarks(conn: sqlite3.Connection) -> None:
+    # Rollups remember the newest event id per cell, so the newest event in any report window is
+    # an O(days x dimensions) lookup; reports remember the watermark they were generated at.
+    _add_column_if_missing(conn, "github_event_rollups", "max_event_id", "INTEGER NOT NULL DEFAULT 0")
+    _add_column_if_missing(conn, "reports", "source_event_id", "INTEGER")
+    _run_statements(
+        conn,
+        [
+            "DROP TRIGGER IF EXISTS trg_github_events_rollup_insert",
+            """
+            CREATE TRIGGER trg_github_events_rollup_insert
+            AFTER INSERT ON github_events
+            WHEN NEW.workspace_id IS NOT NULL
+            BEGIN
+                INSERT INTO github_event_rollups(workspace_id, day, event_type, repo, actor, event_count, commit_count, max_event_id)
+                VALUES (
+                    NEW.workspace_id, substr(NEW.created_at, 1, 10), NEW.event_type,
+                    COALESCE(NEW.repo, ''), COALESCE(NEW.actor, ''), 1, COALESCE(NEW.commit_count, 0), NEW.id
+                )
+                ON CONFLICT(workspace_id, day, event_type, repo, actor) DO UPDATE SET
+                    event_count=event_count + 1,
+                    commit_count=commit_count + excluded.commit_count,
+                    max_event_id=MAX(max_event_id, excluded.max_event_id);
+            END
+            """,
+            "DELETE FROM github_event_rollups",
+            GITHUB_EVENT_ROLLUP_REBUILD,
+            """
+            CREATE INDEX IF NOT EXISTS idx_reports_workspace_period
+            ON reports(workspace_id, report_type, period_start, period_end, source_event_id)
+            """,
+        ],
+    )
+
+
+def _m009_report_jobs(conn: sqlite3.Connection) -> None:
+    # Checkpoints for scheduled report runs; catalog-only, one row per workspace and period.
+    _run_statements(
+        conn,
+        [
+            """
+            CREATE TABLE IF NOT EXISTS report_jobs (
+                report_type TEXT NOT NULL,
+                period_start TEXT NOT NULL,
+                period_end TEXT NOT NULL,
+                workspace_id INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                report_id INTEGER,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                duration_ms INTEGER,
+                error TEXT,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY(report_type, period_start, period_end, workspace_id)
+            )
+            """,
+        ],
+    )
+
+
+def _m010_report_job_leases(conn: sqlite3.Connection) -> None:
+    # Epoch ms when the running job was claimed; scheduler processes only take over expired leases.
+    _add_column_if_missing(conn, "report_jobs", "lease_ts", "INTEGER")
+
+
+def _m011_github_installation_uninstalls(conn: sqlite3.Connection) -> None:
+    # Set by a live installation.deleted webhook and cleared by the next install callback; rows with
+    # it set no longer route events, in any worker and across restarts.
+    _add_column_if_missing(conn, "github_installations", "uninstalled_at", "TEXT")
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "baseline_tables", _m001_baseline),
+    Migration(2, "hot_path_indexes", _m002_hot_path_indexes),
+    Migration(3, "epoch_timestamps", _m003_epoch_timestamps),
+    Migration(4, "membership_versions", _m004_membership_versions),
+    Migration(5, "github_delivery_ids", _m005_github_delivery_ids),
+    Migration(6, "github_event_columns", _m006_github_event_columns),
+    Migration(7, "github_event_rollups", _m007_github_event_rollups),
+    Migration(8, "report_watermarks", _m008_report_watermarks),
+    Migration(9, "report_jobs", _m009_report_jobs),
+    Migration(10, "report_job_leases", _m010_report_job_leases),
+    Migration(11, "github_installation_uninstalls", _m011_github_installation_uninstalls),
+]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    try:
+        row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return int(row[0] or 0)
+
+
+def apply_migrations(conn: sqlite3.Connection, migrations: list[Migration] = MIGRATIONS) -> int:
+    """Apply pending migrations in order, each in its own transaction. `conn` must be in autocommit mode."""
+    latest = migrations[-1].version if migrations else 0
+    if current_version(conn) >= latest:
+        return latest
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+        """
+    )
+    for migration in migrations:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-check inside the write lock: another worker process may have applied it.
+            if current_version(conn) >= migration.version:
+                conn.execute("COMMIT")
+                continue
+            migration.apply(conn)
+            conn.execute(
+                "INSERT INTO schema_version(version, name, applied_at) VALUES (?, ?, ?)",
+                (migration.version, migration.name, datetime.now(timezone.utc).isoformat()),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    return latest
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    items: list[T]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(sort_key: int, row_id: int) -> str:
+    raw = f"{int(sort_key)}:{int(row_id)}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_key, row_id = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii").split(":")
+        return int(sort_key), int(row_id)
+    except (ValueError, UnicodeError) as exc:
+        raise ValueError("잘못된 cursor입니다.") from exc
+
+
+def keyset_after(sort_column: str, cursor: Optional[str]) -> tuple[str, tuple[Any, ...]]:
+    """WHERE fragment continuing a `ORDER BY sort_column DESC, id DESC` listing after `cursor`.
+
+    The row-value comparison lets SQLite seek straight into the (scope, sort_column) index, so
+    every page costs O(limit) regardless of depth.
+    """
+    if not cursor:
+        return "", ()
+    sort_key, row_id = decode_cursor(cursor)
+    if sort_column == "id":
+        return " AND id < ?", (row_id,)
+    return f" AND ({sort_column}, id) < (?, ?)", (sort_key, row_id)
+
+
+def build_page(
+    rows: list[dict],
+    *,
+    limit: int,
+    sort_column: str,
+    load: Optional[Callable[[dict], T]] = None,
+) -> Page[T]:
+    """`rows` must have been fetched with LIMIT limit + 1; the extra row only signals a next page."""
+    visible = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and visible:
+        last = visible[-1]
+        next_cursor = encode_cursor(last[sort_column], last["id"])
+    items = [load(row) for row in visible] if load is not None else visible
+    return Page(items=items, next_cursor=next_cursor)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from typing import Any, Callable, Iterable, Optional
+
+Decoder = Callable[[Any], Any]
+
+
+class LazyRecord(Mapping[str, Any]):
+    """Read-only API row; JSON-backed fields are decoded on first access and cached."""
+
+    __slots__ = ("_order", "_values", "_pending")
+
+    def __init__(self, order: tuple[str, ...], values: dict[str, Any], pending: dict[str, tuple[Any, Decoder]]) -> None:
+        self._order = order
+        self._values = values
+        self._pending = pending
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._pending:
+            raw, decoder = self._pending.pop(key)
+            self._values[key] = decoder(raw)
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._order)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._values or key in self._pending
+
+    def pending_fields(self) -> list[str]:
+        """JSON fields not decoded yet."""
+        return list(self._pending)
+
+    def __repr__(self) -> str:
+        return f"LazyRecord({dict(self)!r})"
+
+
+class RecordSpec:
+    """Maps API field names to table columns so list queries select only what the caller needs.
+
+    `columns` are copied as-is (field -> column); `json_fields` hold (column, decoder) pairs that
+    are decoded lazily through `LazyRecord`. Field order follows the spec, not the request.
+    """
+
+    def __init__(self, table: str, columns: dict[str, str], json_fields: Optional[dict[str, tuple[str, Decoder]]] = None) -> None:
+        self.table = table
+        self.columns = columns
+        self.json_fields = json_fields or {}
+        self.fields = tuple(columns) + tuple(self.json_fields)
+
+    def resolve(self, fields: Optional[Iterable[str]]) -> tuple[str, ...]:
+        if fields is None:
+            return self.fields
+        requested = {field.strip() for field in fields if field and field.strip()}
+        unknown = requested.difference(self.fields)
+        if unknown:
+            raise ValueError(f"지원하지 않는 필드입니다: {', '.join(sorted(unknown))}")
+        return tuple(field for field in self.fields if field in requested) or self.fields
+
+    def select(self, fields: Optional[Iterable[str]] = None, *, include: Iterable[str] = ()) -> str:
+        """`include` adds raw columns the query itself needs (e.g. keyset sort keys) to the SELECT list."""
+        names = self.resolve(fields)
+        selected: list[str] = list(include)
+        for name in names:
+            column = self.columns[name] if name in self.columns else self.json_fields[name][0]
+            if column not in selected:
+                selected.append(column)
+        return f"SELECT {', '.join(selected)} FROM {self.table}"
+
+    def load(self, row: dict[str, Any], fields: Optional[Iterable[str]] = None) -> LazyRecord:
+        names = self.resolve(fields) if fields is not None else self.fields
+        values: dict[str, Any] = {}
+        pending: dict[str, tuple[Any, Decoder]] = {}
+        for name in names:
+            if name in self.columns:
+                values[name] = row.get(self.columns[name])
+            else:
+                column, decoder = self.json_fields[name]
+                pending[name] = (row.get(column), decoder)
+        return LazyRecord(names, values, pending)
+
+
+def parse_fields(value: Optional[str]) -> Optional[list[str]]:
+    """`?fields=id,title` query parameter -> field list (None means every field)."""
+    if not value:
+        return None
+    return [part for part in value.split(",") if part.strip()]
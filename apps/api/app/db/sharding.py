@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from app.db.database import AppDatabase
+
+# Tables whose rows belong to exactly one workspace. With sharding enabled they are read and
+# written through `db.for_workspace(workspace_id)`; everything else stays in the catalog DB.
+WORKSPACE_TABLES = frozenset(
+    {
+        "docs",
+        "chat_channels",
+        "chat_messages",
+        "github_events",
+        "github_event_rollups",
+        "reports",
+        "approvals",
+        "agent_execution_logs",
+        "billing_invoices",
+    }
+)
+
+
+class ShardManager:
+    """Opens one SQLite file per workspace lazily and keeps at most `max_open` of them open (LRU)."""
+
+    def __init__(self, shard_dir: str, *, max_open: int, factory: Callable[[str], "AppDatabase"]) -> None:
+        self.shard_dir = Path(shard_dir)
+        self.max_open = max(1, max_open)
+        self._factory = factory
+        self._lock = Lock()
+        self._open: OrderedDict[int, "AppDatabase"] = OrderedDict()
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, workspace_id: int) -> Path:
+        return self.shard_dir / f"workspace_{workspace_id}.db"
+
+    def get(self, workspace_id: int) -> "AppDatabase":
+        with self._lock:
+            shard = self._open.get(workspace_id)
+            if shard is not None:
+                self._open.move_to_end(workspace_id)
+                return shard
+
+        # Open (and migrate) outside the manager lock so a cold shard does not block hot ones.
+        opened = self._factory(str(self.path_for(workspace_id)))
+        evicted: list["AppDatabase"] = []
+        with self._lock:
+            shard = self._open.get(workspace_id)
+            if shard is None:
+                shard = self._open[workspace_id] = opened
+                opened = None
+            self._open.move_to_end(workspace_id)
+            while len(self._open) > self.max_open:
+                _, old = self._open.popitem(last=False)
+                evicted.append(old)
+
+        if opened is not None:
+            opened.close()
+        for old in evicted:
+            # Callers still holding an evicted shard keep working; its idle connections close now
+            # and connections checked out by in-flight calls are closed when they are released.
+            old.close()
+        return shard
+
+    def open_workspace_ids(self) -> list[int]:
+        with self._lock:
+            return list(self._open.keys())
+
+    def close_all(self) -> None:
+        with self._lock:
+            shards = list(self._open.values())
+            self._open.clear()
+        for shard in shards:
+            shard.close()
+
+    def drop_all(self) -> None:
+        self.close_all()
+        for path in self.shard_dir.glob("workspace_*.db*"):
+            path.unlink(missing_ok=True)
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from app.api.routes.agent import router as agent_router
@@ -11,9 +13,25 @@ from app.api.routes.health import router as health_router
 from app.api.routes.reports import router as reports_router
 from app.api.routes.roadmap import router as roadmap_router
 from app.api.routes.workspace import router as workspace_router
+from app.core.middleware import QueryStatsMiddleware
 from app.core.settings import settings
+from app.services.github_integration_service import github_integration_service
+from app.services.report_scheduler import report_scheduler
+from app.services.webhook_queue import github_webhook_queue
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    github_integration_service.load_installations()
+    report_scheduler.start()
+    yield
+    report_scheduler.stop()
+    # Store webhook deliveries that were accepted (202) but not written yet.
+    github_webhook_queue.close()
+
 
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
+app.add_middleware(QueryStatsMiddleware)
 
 app.include_router(health_router)
 app.include_router(roadmap_router)
@@ -1,8 +1,27 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Iterable, Optional
 
 from app.db.database import db
+from app.db.pagination import Page, build_page, keyset_after
+from app.db.records import LazyRecord, RecordSpec
+
+APPROVAL_RECORD = RecordSpec(
+    "approvals",
+    {
+        "id": "id",
+        "workspace_id": "workspace_id",
+        "request_type": "request_type",
+        "reason": "reason",
+        "status": "status",
+        "requested_by": "requested_by",
+        "requested_at": "requested_at",
+        "decided_by": "decided_by",
+        "decided_at": "decided_at",
+        "decision_note": "decision_note",
+    },
+    {"payload": ("payload_json", db.from_json)},
+)
 
 
 class ApprovalService:
@@ -16,65 +35,77 @@ class ApprovalService:
         reason: str,
     ) -> dict:
         now = db.now_iso()
-        db.execute(
+        row = db.for_workspace(workspace_id).insert_returning(
             """
-            INSERT INTO approvals(workspace_id, request_type, payload_json, reason, status, requested_by, requested_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO approvals(workspace_id, request_type, payload_json, reason, status, requested_by, requested_at, requested_ts)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (workspace_id, request_type, db.to_json(payload), reason, "pending", requested_by, now),
+            (workspace_id, request_type, db.to_json(payload), reason, "pending", requested_by, now, db.epoch_ms(now)),
         )
-        row = db.fetchone("SELECT * FROM approvals ORDER BY id DESC LIMIT 1")
-        assert row is not None
         return self._deserialize(row)
 
-    def list_requests(self, *, workspace_id: int, status: Optional[str], limit: int = 100) -> list[dict]:
+    def list_requests(
+        self,
+        *,
+        workspace_id: int,
+        status: Optional[str],
+        limit: int = 100,
+        fields: Optional[Iterable[str]] = None,
+        cursor: Optional[str] = None,
+    ) -> Page[LazyRecord]:
+        select = APPROVAL_RECORD.select(fields, include=("id", "requested_ts"))
+        after, after_params = keyset_after("requested_ts", cursor)
         if status:
-            rows = db.fetchall(
-                "SELECT * FROM approvals WHERE workspace_id=? AND status=? ORDER BY id DESC LIMIT ?",
-                (workspace_id, status, limit),
+            rows = db.for_workspace(workspace_id).fetchall(
+                f"{select} WHERE workspace_id=? AND status=?{after} ORDER BY requested_ts DESC, id DESC LIMIT ?",
+                (workspace_id, status, *after_params, limit + 1),
             )
         else:
-            rows = db.fetchall(
-                "SELECT * FROM approvals WHERE workspace_id=? ORDER BY id DESC LIMIT ?",
-                (workspace_id, limit),
+            rows = db.for_workspace(workspace_id).fetchall(
+                f"{select} WHERE workspace_id=?{after} ORDER BY requested_ts DESC, id DESC LIMIT ?",
+                (workspace_id, *after_params, limit + 1),
             )
-        return [self._deserialize(row) for row in rows]
+        return build_page(rows, limit=limit, sort_column="requested_ts", load=lambda row: APPROVAL_RECORD.load(row, fields))
 
-    def get_request(self, request_id: int) -> Optional[dict]:
-        row = db.fetchone("SELECT * FROM approvals WHERE id=?", (request_id,))
+    def get_request(self, workspace_id: int, request_id: int) -> Optional[dict]:
+        row = db.for_workspace(workspace_id).fetchone("SELECT * FROM approvals WHERE workspace_id=? AND id=?", (workspace_id, request_id))
         if not row:
             return None
         return self._deserialize(row)
 
-    def approve(self, *, request_id: int, decided_by: str, note: str = "") -> Optional[dict]:
-        row = db.fetchone("SELECT * FROM approvals WHERE id=?", (request_id,))
-        if not row:
-            return None
-        if row["status"] != "pending":
-            raise ValueError("이미 처리된 승인 요청입니다.")
+    def approve(self, *, workspace_id: int, request_id: int, decided_by: str, note: str = "") -> Optional[dict]:
+        ws_db = db.for_workspace(workspace_id)
+        with ws_db.transaction():
+            row = ws_db.fetchone("SELECT * FROM approvals WHERE workspace_id=? AND id=?", (workspace_id, request_id))
+            if not row:
+                return None
+            if row["status"] != "pending":
+                raise ValueError("이미 처리된 승인 요청입니다.")
 
-        now = db.now_iso()
-        db.execute(
-            "UPDATE approvals SET status=?, decided_by=?, decided_at=?, decision_note=? WHERE id=?",
-            ("approved", decided_by, now, note, request_id),
-        )
-        updated = db.fetchone("SELECT * FROM approvals WHERE id=?", (request_id,))
-        return self._deserialize(updated) if updated else None
+            now = db.now_iso()
+            ws_db.execute(
+                "UPDATE approvals SET status=?, decided_by=?, decided_at=?, decision_note=? WHERE id=?",
+                ("approved", decided_by, now, note, request_id),
+            )
+            updated = ws_db.fetchone("SELECT * FROM approvals WHERE id=?", (request_id,))
+            return self._deserialize(updated) if updated else None
 
-    def reject(self, *, request_id: int, decided_by: str, note: str = "") -> Optional[dict]:
-        row = db.fetchone("SELECT * FROM approvals WHERE id=?", (request_id,))
-        if not row:
-            return None
-        if row["status"] != "pending":
-            raise ValueError("이미 처리된 승인 요청입니다.")
+    def reject(self, *, workspace_id: int, request_id: int, decided_by: str, note: str = "") -> Optional[dict]:
+        ws_db = db.for_workspace(workspace_id)
+        with ws_db.transaction():
+            row = ws_db.fetchone("SELECT * FROM approvals WHERE workspace_id=? AND id=?", (workspace_id, request_id))
+            if not row:
+                return None
+            if row["status"] != "pending":
+                raise ValueError("이미 처리된 승인 요청입니다.")
 
-        now = db.now_iso()
-        db.execute(
-            "UPDATE approvals SET status=?, decided_by=?, decided_at=?, decision_note=? WHERE id=?",
-            ("rejected", decided_by, now, note, request_id),
-        )
-        updated = db.fetchone("SELECT * FROM approvals WHERE id=?", (request_id,))
-        return self._deserialize(updated) if updated else None
+            now = db.now_iso()
+            ws_db.execute(
+                "UPDATE approvals SET status=?, decided_by=?, decided_at=?, decision_note=? WHERE id=?",
+                ("rejected", decided_by, now, note, request_id),
+            )
+            updated = ws_db.fetchone("SELECT * FROM approvals WHERE id=?", (request_id,))
+            return self._deserialize(updated) if updated else None
 
     def ensure_approved(
         self,
@@ -86,7 +117,7 @@ class ApprovalService:
         if request_id is None:
             raise ValueError("approval_request_id가 필요합니다.")
 
-        req = self.get_request(request_id)
+        req = self.get_request(workspace_id, request_id)
         if not req:
             raise ValueError("승인 요청을 찾을 수 없습니다.")
         if req["workspace_id"] != workspace_id:
@@ -99,19 +130,7 @@ class ApprovalService:
 
     @staticmethod
     def _deserialize(row: dict) -> dict:
-        return {
-            "id": row["id"],
-            "workspace_id": row["workspace_id"],
-            "request_type": row["request_type"],
-            "payload": db.from_json(row["payload_json"]),
-            "reason": row["reason"],
-            "status": row["status"],
-            "requested_by": row["requested_by"],
-            "requested_at": row["requested_at"],
-            "decided_by": row["decided_by"],
-            "decided_at": row["decided_at"],
-            "decision_note": row["decision_note"],
-        }
+        return dict(APPROVAL_RECORD.load(row))
 
 
 approval_service = ApprovalService()
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Optional
 
 from app.db.database import db
+from app.db.pagination import Page, build_page, keyset_after
 
 
 class BillingService:
@@ -22,20 +23,17 @@ class BillingService:
         now = db.now_iso()
         status = "draft"
 
-        db.execute(
+        row = db.for_workspace(workspace_id).insert_returning(
             """
             INSERT INTO billing_invoices(workspace_id, customer, business_no, amount, tax_amount, status, metadata_json, created_by, created_at, updated_at)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (workspace_id, customer, business_no, total_amount, tax_amount, status, db.to_json(metadata), created_by, now, now),
         )
-
-        row = db.fetchone("SELECT * FROM billing_invoices ORDER BY id DESC LIMIT 1")
-        assert row is not None
         return self._deserialize(row)
 
     def issue_invoice(self, *, workspace_id: int, invoice_id: int, approver: str) -> Optional[dict]:
-        row = db.fetchone("SELECT * FROM billing_invoices WHERE workspace_id=? AND id=?", (workspace_id, invoice_id))
+        row = db.for_workspace(workspace_id).fetchone("SELECT * FROM billing_invoices WHERE workspace_id=? AND id=?", (workspace_id, invoice_id))
         if not row:
             return None
 
@@ -44,26 +42,27 @@ class BillingService:
         metadata["issued_via"] = "barobill-ready-adapter"
 
         now = db.now_iso()
-        db.execute(
+        db.for_workspace(workspace_id).execute(
             "UPDATE billing_invoices SET status=?, metadata_json=?, updated_at=? WHERE workspace_id=? AND id=?",
             ("issued", db.to_json(metadata), now, workspace_id, invoice_id),
         )
 
-        updated = db.fetchone("SELECT * FROM billing_invoices WHERE workspace_id=? AND id=?", (workspace_id, invoice_id))
+        updated = db.for_workspace(workspace_id).fetchone("SELECT * FROM billing_invoices WHERE workspace_id=? AND id=?", (workspace_id, invoice_id))
         return self._deserialize(updated) if updated else None
 
     def get_invoice(self, workspace_id: int, invoice_id: int) -> Optional[dict]:
-        row = db.fetchone("SELECT * FROM billing_invoices WHERE workspace_id=? AND id=?", (workspace_id, invoice_id))
+        row = db.for_workspace(workspace_id).fetchone("SELECT * FROM billing_invoices WHERE workspace_id=? AND id=?", (workspace_id, invoice_id))
         if not row:
             return None
         return self._deserialize(row)
 
-    def list_invoices(self, workspace_id: int, limit: int = 100) -> list[dict]:
-        rows = db.fetchall(
-            "SELECT * FROM billing_invoices WHERE workspace_id=? ORDER BY id DESC LIMIT ?",
-            (workspace_id, limit),
+    def list_invoices(self, workspace_id: int, limit: int = 100, cursor: Optional[str] = None) -> Page[dict]:
+        after, after_params = keyset_after("id", cursor)
+        rows = db.for_workspace(workspace_id).fetchall(
+            f"SELECT * FROM billing_invoices WHERE workspace_id=?{after} ORDER BY id DESC LIMIT ?",
+            (workspace_id, *after_params, limit + 1),
         )
-        return [self._deserialize(row) for row in rows]
+        return build_page(rows, limit=limit, sort_column="id", load=self._deserialize)
 
     @staticmethod
     def _deserialize(row: dict) -> dict:
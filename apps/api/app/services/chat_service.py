@@ -3,24 +3,22 @@ from __future__ import annotations
 from typing import Optional
 
 from app.db.database import db
+from app.db.pagination import Page, build_page, keyset_after
 
 
 class ChatService:
     def create_channel(self, *, workspace_id: int, created_by: str, name: str, description: str) -> dict:
         now = db.now_iso()
-        db.execute(
+        return db.for_workspace(workspace_id).insert_returning(
             "INSERT INTO chat_channels(workspace_id, name, description, created_by, created_at) VALUES (?, ?, ?, ?, ?)",
             (workspace_id, name, description, created_by, now),
         )
-        row = db.fetchone("SELECT * FROM chat_channels WHERE workspace_id=? AND name=?", (workspace_id, name))
-        assert row is not None
-        return row
 
     def list_channels(self, workspace_id: int) -> list[dict]:
-        return db.fetchall("SELECT * FROM chat_channels WHERE workspace_id=? ORDER BY id ASC", (workspace_id,))
+        return db.for_workspace(workspace_id).fetchall("SELECT * FROM chat_channels WHERE workspace_id=? ORDER BY id ASC", (workspace_id,))
 
     def get_channel(self, workspace_id: int, channel_id: int) -> Optional[dict]:
-        return db.fetchone("SELECT * FROM chat_channels WHERE workspace_id=? AND id=?", (workspace_id, channel_id))
+        return db.for_workspace(workspace_id).fetchone("SELECT * FROM chat_channels WHERE workspace_id=? AND id=?", (workspace_id, channel_id))
 
     def post_message(self, *, workspace_id: int, channel_id: int, sender: str, content: str) -> dict:
         channel = self.get_channel(workspace_id, channel_id)
@@ -28,22 +26,21 @@ class ChatService:
             raise ValueError("채널을 찾을 수 없습니다.")
 
         now = db.now_iso()
-        db.execute(
-            "INSERT INTO chat_messages(channel_id, sender, content, created_at) VALUES (?, ?, ?, ?)",
-            (channel_id, sender, content, now),
+        return db.for_workspace(workspace_id).insert_returning(
+            "INSERT INTO chat_messages(channel_id, sender, content, created_at, created_ts) VALUES (?, ?, ?, ?, ?)",
+            (channel_id, sender, content, now, db.epoch_ms(now)),
         )
-        row = db.fetchone("SELECT * FROM chat_messages ORDER BY id DESC LIMIT 1")
-        assert row is not None
-        return row
 
-    def list_messages(self, workspace_id: int, channel_id: int, limit: int = 100) -> list[dict]:
+    def list_messages(self, workspace_id: int, channel_id: int, limit: int = 100, cursor: Optional[str] = None) -> Page[dict]:
         channel = self.get_channel(workspace_id, channel_id)
         if not channel:
-            return []
-        return db.fetchall(
-            "SELECT * FROM chat_messages WHERE channel_id=? ORDER BY id DESC LIMIT ?",
-            (channel_id, limit),
+            return Page(items=[], next_cursor=None)
+        after, after_params = keyset_after("created_ts", cursor)
+        rows = db.for_workspace(workspace_id).fetchall(
+            f"SELECT * FROM chat_messages WHERE channel_id=?{after} ORDER BY created_ts DESC, id DESC LIMIT ?",
+            (channel_id, *after_params, limit + 1),
         )
+        return build_page(rows, limit=limit, sort_column="created_ts")
 
 
 chat_service = ChatService()
@@ -10,6 +10,7 @@ from dataclasses import dataclass
 from datetime import date, timedelta
 from typing import Iterator
 
+from app.core.auth import AuthContext
 from app.services.billing_service import billing_service
 from app.services.docs_service import docs_service
 from app.services.github_service import github_service
@@ -45,12 +46,10 @@ def runtime_status() -> dict:
 
 
 class DeepAgentOrchestrator:
-    def execute(self, *, workspace_id: int, actor_email: str, user_email: str, instruction: str, context: dict) -> dict:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="agent.execute",
-        )
+    def execute(self, *, auth: AuthContext, user_email: str, instruction: str, context: dict) -> dict:
+        auth.require("agent.execute")
+        workspace_id = auth.workspace_id
+        actor_email = auth.actor_email
 
         text = instruction.strip()
         lowered = text.lower()
@@ -84,15 +83,14 @@ class DeepAgentOrchestrator:
             outputs["daily_report"] = report
 
         if "커밋" in text or "github" in lowered or "깃헙" in text:
-            events = github_service.list_events(workspace_id=workspace_id, limit=20)
+            events = github_service.list_events(workspace_id=workspace_id, limit=20).items
             steps.append({"module": "github", "action": "list_events", "ok": True, "count": len(events)})
-            outputs["github_events"] = events
+            outputs["github_events"] = [dict(event) for event in events]
 
         if "일정" in text or "calendar" in lowered:
             calendar_payload = context.get("calendar", {"title": "AI 자동 생성 일정"})
             result = workspace_service.execute(
-                workspace_id=workspace_id,
-                actor_email=actor_email,
+                auth=auth,
                 user_email=user_email,
                 service="calendar",
                 action="create",
@@ -144,11 +142,10 @@ class DeepAgentOrchestrator:
         summary = f"{len(steps)}개 단계 실행(또는 계획) 완료"
         return {"summary": summary, "steps": steps, "outputs": outputs}
 
-    def stream(self, *, workspace_id: int, actor_email: str, user_email: str, instruction: str, context: dict) -> Iterator[dict]:
-        yield {"event": "start", "data": {"workspace_id": workspace_id, "actor_email": actor_email}}
+    def stream(self, *, auth: AuthContext, user_email: str, instruction: str, context: dict) -> Iterator[dict]:
+        yield {"event": "start", "data": {"workspace_id": auth.workspace_id, "actor_email": auth.actor_email}}
         result = self.execute(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
+            auth=auth,
             user_email=user_email,
             instruction=instruction,
             context=context,
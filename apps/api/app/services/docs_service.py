@@ -1,8 +1,25 @@
 from __future__ import annotations
 
-from typing import Optional
-
-from app.db.database import db
+from typing import Iterable, Optional
+
+from app.db.database import AppDatabase, db
+from app.db.pagination import Page, build_page, keyset_after
+from app.db.records import LazyRecord, RecordSpec
+
+DOC_RECORD = RecordSpec(
+    "docs",
+    {
+        "id": "id",
+        "workspace_id": "workspace_id",
+        "space": "space",
+        "title": "title",
+        "content": "content",
+        "created_by": "created_by",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    },
+    {"tags": ("tags_json", db.from_json)},
+)
 
 
 class DocsService:
@@ -15,36 +32,45 @@ class DocsService:
         title: str,
         content: str,
         tags: list[str],
+        database: Optional[AppDatabase] = None,
     ) -> dict:
+        """`database` is the workspace's database when the caller already holds a transaction on it."""
         now = db.now_iso()
-        db.execute(
+        row = (database or db.for_workspace(workspace_id)).insert_returning(
             """
-            INSERT INTO docs(workspace_id, space, title, content, tags_json, created_by, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO docs(workspace_id, space, title, content, tags_json, created_by, created_at, updated_at, updated_ts)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (workspace_id, space, title, content, db.to_json(tags), created_by, now, now),
+            (workspace_id, space, title, content, db.to_json(tags), created_by, now, now, db.epoch_ms(now)),
         )
-
-        row = db.fetchone("SELECT * FROM docs ORDER BY id DESC LIMIT 1")
-        assert row is not None
         return self._deserialize(row)
 
-    def list(self, *, workspace_id: int, space: Optional[str] = None, limit: int = 100) -> list[dict]:
+    def list(
+        self,
+        *,
+        workspace_id: int,
+        space: Optional[str] = None,
+        limit: int = 100,
+        fields: Optional[Iterable[str]] = None,
+        cursor: Optional[str] = None,
+    ) -> Page[LazyRecord]:
+        select = DOC_RECORD.select(fields, include=("id", "updated_ts"))
+        after, after_params = keyset_after("updated_ts", cursor)
         if space:
-            rows = db.fetchall(
-                "SELECT * FROM docs WHERE workspace_id=? AND space=? ORDER BY updated_at DESC LIMIT ?",
-                (workspace_id, space, limit),
+            rows = db.for_workspace(workspace_id).fetchall(
+                f"{select} WHERE workspace_id=? AND space=?{after} ORDER BY updated_ts DESC, id DESC LIMIT ?",
+                (workspace_id, space, *after_params, limit + 1),
             )
         else:
-            rows = db.fetchall(
-                "SELECT * FROM docs WHERE workspace_id=? ORDER BY updated_at DESC LIMIT ?",
-                (workspace_id, limit),
+            rows = db.for_workspace(workspace_id).fetchall(
+                f"{select} WHERE workspace_id=?{after} ORDER BY updated_ts DESC, id DESC LIMIT ?",
+                (workspace_id, *after_params, limit + 1),
             )
 
-        return [self._deserialize(row) for row in rows]
+        return build_page(rows, limit=limit, sort_column="updated_ts", load=lambda row: DOC_RECORD.load(row, fields))
 
     def get(self, workspace_id: int, doc_id: int) -> Optional[dict]:
-        row = db.fetchone("SELECT * FROM docs WHERE workspace_id=? AND id=?", (workspace_id, doc_id))
+        row = db.for_workspace(workspace_id).fetchone("SELECT * FROM docs WHERE workspace_id=? AND id=?", (workspace_id, doc_id))
         if not row:
             return None
         return self._deserialize(row)
@@ -58,7 +84,7 @@ class DocsService:
         content: Optional[str],
         tags: Optional[list[str]],
     ) -> Optional[dict]:
-        current = db.fetchone("SELECT * FROM docs WHERE workspace_id=? AND id=?", (workspace_id, doc_id))
+        current = db.for_workspace(workspace_id).fetchone("SELECT * FROM docs WHERE workspace_id=? AND id=?", (workspace_id, doc_id))
         if not current:
             return None
 
@@ -67,43 +93,33 @@ class DocsService:
         next_tags = tags if tags is not None else db.from_json(current["tags_json"])
         updated_at = db.now_iso()
 
-        db.execute(
-            "UPDATE docs SET title=?, content=?, tags_json=?, updated_at=? WHERE workspace_id=? AND id=?",
-            (next_title, next_content, db.to_json(next_tags), updated_at, workspace_id, doc_id),
+        db.for_workspace(workspace_id).execute(
+            "UPDATE docs SET title=?, content=?, tags_json=?, updated_at=?, updated_ts=? WHERE workspace_id=? AND id=?",
+            (next_title, next_content, db.to_json(next_tags), updated_at, db.epoch_ms(updated_at), workspace_id, doc_id),
         )
 
-        updated = db.fetchone("SELECT * FROM docs WHERE workspace_id=? AND id=?", (workspace_id, doc_id))
+        updated = db.for_workspace(workspace_id).fetchone("SELECT * FROM docs WHERE workspace_id=? AND id=?", (workspace_id, doc_id))
         return self._deserialize(updated) if updated else None
 
     def delete(self, workspace_id: int, doc_id: int) -> bool:
-        existing = db.fetchone("SELECT id FROM docs WHERE workspace_id=? AND id=?", (workspace_id, doc_id))
+        existing = db.for_workspace(workspace_id).fetchone("SELECT id FROM docs WHERE workspace_id=? AND id=?", (workspace_id, doc_id))
         if not existing:
             return False
 
-        db.execute("DELETE FROM docs WHERE workspace_id=? AND id=?", (workspace_id, doc_id))
+        db.for_workspace(workspace_id).execute("DELETE FROM docs WHERE workspace_id=? AND id=?", (workspace_id, doc_id))
         return True
 
     def search(self, *, workspace_id: int, query: str, limit: int = 50) -> list[dict]:
         pattern = f"%{query}%"
-        rows = db.fetchall(
-            "SELECT * FROM docs WHERE workspace_id=? AND (title LIKE ? OR content LIKE ?) ORDER BY updated_at DESC LIMIT ?",
+        rows = db.for_workspace(workspace_id).fetchall(
+            "SELECT * FROM docs WHERE workspace_id=? AND (title LIKE ? OR content LIKE ?) ORDER BY updated_ts DESC, id DESC LIMIT ?",
             (workspace_id, pattern, pattern, limit),
         )
         return [self._deserialize(row) for row in rows]
 
     @staticmethod
     def _deserialize(row: dict) -> dict:
-        return {
-            "id": row["id"],
-            "workspace_id": row.get("workspace_id"),
-            "space": row["space"],
-            "title": row["title"],
-            "content": row["content"],
-            "tags": db.from_json(row["tags_json"]),
-            "created_by": row.get("created_by"),
-            "created_at": row["created_at"],
-            "updated_at": row["updated_at"],
-        }
+        return dict(DOC_RECORD.load(row))
 
 
 docs_service = DocsService()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+from threading import Lock
+from typing import Callable, Iterable, Optional
+
+from app.core.settings import settings
+
+# (workspace_id, after_id, limit) -> rows with an "id" key, ascending by id.
+FetchAfter = Callable[[int, int, int], list[dict]]
+
+
+class Subscription:
+    """One SSE client's view of a workspace feed, consumed on the event loop that created it."""
+
+    def __init__(self, workspace_id: int, *, maxsize: int) -> None:
+        self.workspace_id = workspace_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=maxsize)
+        # Set when the queue overflowed; the consumer re-reads from the table instead.
+        self.lagged = False
+
+    def push(self, rows: list[dict]) -> None:
+        self.loop.call_soon_threadsafe(self._deliver, rows)
+
+    def _deliver(self, rows: list[dict]) -> None:
+        for row in rows:
+            try:
+                self.queue.put_nowait(row)
+            except asyncio.QueueFull:
+                self.lagged = True
+                return
+
+
+class EventBroker:
+    """In-process fan-out of newly stored rows to per-workspace subscribers.
+
+    Writers call `notify()` after committing; the broker reads the new rows once per workspace
+    (only for workspaces somebody is subscribed to) and pushes them to every subscriber, so the
+    write path keeps its batched inserts and N listeners cost one query instead of N polls.
+    """
+
+    def __init__(self, *, fetch_after: FetchAfter, queue_size: int = settings.event_stream_queue_size) -> None:
+        self.fetch_after = fetch_after
+        self.queue_size = max(1, queue_size)
+        # Guards the two maps only; subscribe/unsubscribe run on the event loop and must not wait on DB I/O.
+        self._lock = Lock()
+        self._subscribers: dict[int, set[Subscription]] = {}
+        self._published: dict[int, int] = {}
+        # One per workspace ever notified while subscribed, so concurrent writers never publish
+        # the same rows twice (kept for the process lifetime; one small lock per workspace).
+        self._publish_locks: dict[int, Lock] = {}
+
+    def subscribe(self, workspace_id: int, latest_id: int) -> Subscription:
+        """Must be called from the event loop that will consume the subscription. `latest_id` is the
+        newest stored id the caller has seen; it seeds the feed when this is the first subscriber."""
+        subscription = Subscription(workspace_id, maxsize=self.queue_size)
+        with self._lock:
+            if workspace_id not in self._subscribers:
+                self._subscribers[workspace_id] = set()
+                self._published[workspace_id] = latest_id
+            self._subscribers[workspace_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.workspace_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.workspace_id]
+                del self._published[subscription.workspace_id]
+
+    def subscriber_count(self, workspace_id: Optional[int] = None) -> int:
+        with self._lock:
+            if workspace_id is not None:
+                return len(self._subscribers.get(workspace_id, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def notify(self, workspace_ids: Iterable[Optional[int]]) -> None:
+        for workspace_id in {value for value in workspace_ids if value is not None}:
+            with self._lock:
+                if workspace_id not in self._subscribers:
+                    continue
+                publish_lock = self._publish_locks.setdefault(workspace_id, Lock())
+            with publish_lock:
+                with self._lock:
+                    subscribers = list(self._subscribers.get(workspace_id, ()))
+                    after_id = self._published.get(workspace_id)
+                if not subscribers or after_id is None:
+                    continue
+                rows = self.fetch_after(workspace_id, after_id, self.queue_size)
+                if not rows:
+                    continue
+                with self._lock:
+                    if workspace_id in self._published:
+                        self._published[workspace_id] = max(self._published[workspace_id], rows[-1]["id"])
+                # Anything beyond one queue's worth overflows subscribers, who then catch up from the table.
+                for subscription in subscribers:
+                    subscription.push(rows)
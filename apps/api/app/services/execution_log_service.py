@@ -1,67 +1,87 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Iterable, Optional
 
 from app.db.database import db
+from app.db.pagination import Page, build_page, keyset_after
+from app.db.records import LazyRecord, RecordSpec
+
+EXECUTION_LOG_RECORD = RecordSpec(
+    "agent_execution_logs",
+    {
+        "id": "id",
+        "workspace_id": "workspace_id",
+        "user_email": "user_email",
+        "instruction": "instruction",
+        "status": "status",
+        "error_message": "error_message",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    },
+    {
+        "context": ("context_json", db.from_json),
+        "steps": ("steps_json", lambda raw: db.from_json(raw) if raw else []),
+        "outputs": ("outputs_json", lambda raw: db.from_json(raw) if raw else {}),
+    },
+)
 
 
 class ExecutionLogService:
     def create_pending(self, *, workspace_id: int, user_email: str, instruction: str, context: dict) -> int:
         now = db.now_iso()
-        db.execute(
+        row = db.for_workspace(workspace_id).insert_returning(
             """
             INSERT INTO agent_execution_logs(
-                workspace_id, user_email, instruction, context_json, status, created_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                workspace_id, user_email, instruction, context_json, status, created_at, updated_at, created_ts
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            RETURNING id
             """,
-            (workspace_id, user_email, instruction, db.to_json(context), "pending", now, now),
+            (workspace_id, user_email, instruction, db.to_json(context), "pending", now, now, db.epoch_ms(now)),
         )
-        row = db.fetchone("SELECT id FROM agent_execution_logs ORDER BY id DESC LIMIT 1")
-        assert row is not None
         return int(row["id"])
 
-    def complete(self, *, log_id: int, steps: list[dict], outputs: dict) -> None:
+    def complete(self, *, workspace_id: int, log_id: int, steps: list[dict], outputs: dict) -> None:
         now = db.now_iso()
-        db.execute(
+        db.for_workspace(workspace_id).execute(
             "UPDATE agent_execution_logs SET status=?, steps_json=?, outputs_json=?, updated_at=? WHERE id=?",
             ("completed", db.to_json(steps), db.to_json(outputs), now, log_id),
         )
 
-    def fail(self, *, log_id: int, error_message: str) -> None:
+    def fail(self, *, workspace_id: int, log_id: int, error_message: str) -> None:
         now = db.now_iso()
-        db.execute(
+        db.for_workspace(workspace_id).execute(
             "UPDATE agent_execution_logs SET status=?, error_message=?, updated_at=? WHERE id=?",
             ("failed", error_message, now, log_id),
         )
 
-    def list_logs(self, *, workspace_id: int, limit: int = 100) -> list[dict]:
-        rows = db.fetchall(
-            "SELECT * FROM agent_execution_logs WHERE workspace_id=? ORDER BY id DESC LIMIT ?",
-            (workspace_id, limit),
+    def list_logs(
+        self,
+        *,
+        workspace_id: int,
+        limit: int = 100,
+        fields: Optional[Iterable[str]] = None,
+        cursor: Optional[str] = None,
+    ) -> Page[LazyRecord]:
+        after, after_params = keyset_after("created_ts", cursor)
+        rows = db.for_workspace(workspace_id).fetchall(
+            f"{EXECUTION_LOG_RECORD.select(fields, include=('id', 'created_ts'))} "
+            f"WHERE workspace_id=?{after} ORDER BY created_ts DESC, id DESC LIMIT ?",
+            (workspace_id, *after_params, limit + 1),
         )
-        return [self._deserialize(row) for row in rows]
+        return build_page(rows, limit=limit, sort_column="created_ts", load=lambda row: EXECUTION_LOG_RECORD.load(row, fields))
 
-    def get_log(self, log_id: int) -> Optional[dict]:
-        row = db.fetchone("SELECT * FROM agent_execution_logs WHERE id=?", (log_id,))
+    def get_log(self, workspace_id: int, log_id: int) -> Optional[dict]:
+        row = db.for_workspace(workspace_id).fetchone(
+            "SELECT * FROM agent_execution_logs WHERE workspace_id=? AND id=?",
+            (workspace_id, log_id),
+        )
         if not row:
             return None
         return self._deserialize(row)
 
     @staticmethod
     def _deserialize(row: dict) -> dict:
-        return {
-            "id": row["id"],
-            "workspace_id": row["workspace_id"],
-            "user_email": row["user_email"],
-            "instruction": row["instruction"],
-            "context": db.from_json(row["context_json"]),
-            "steps": db.from_json(row["steps_json"]) if row.get("steps_json") else [],
-            "outputs": db.from_json(row["outputs_json"]) if row.get("outputs_json") else {},
-            "status": row["status"],
-            "error_message": row.get("error_message"),
-            "created_at": row["created_at"],
-            "updated_at": row["updated_at"],
-        }
+        return dict(EXECUTION_LOG_RECORD.load(row))
 
 
 execution_log_service = ExecutionLogService()
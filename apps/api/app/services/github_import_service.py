@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import json
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from app.core.settings import settings
+from app.services.github_service import github_service
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+# (event_type, payload, delivery_id, delivered_at as UTC ISO or None)
+Delivery = tuple[str, dict, Optional[str], Optional[str]]
+
+
+class NdjsonReader:
+    """Incremental NDJSON line splitter; gzip input is detected from the first bytes and inflated
+    chunk by chunk, so memory stays bounded by the longest line."""
+
+    def __init__(self) -> None:
+        self._inflater: Optional[Any] = None
+        self._sniffed = False
+        self._pending = b""
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        if not self._sniffed:
+            self._pending += chunk
+            if len(self._pending) < len(_GZIP_MAGIC):
+                return []
+            self._sniffed = True
+            chunk, self._pending = self._pending, b""
+            if chunk.startswith(_GZIP_MAGIC):
+                self._inflater = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        if self._inflater is not None:
+            chunk = self._inflater.decompress(chunk)
+        lines = (self._pending + chunk).split(b"\n")
+        self._pending = lines.pop()
+        return [line for line in lines if line.strip()]
+
+    def finish(self) -> list[bytes]:
+        tail = self._pending
+        if self._inflater is not None:
+            tail += self._inflater.flush()
+        self._pending = b""
+        return [line for line in tail.split(b"\n") if line.strip()]
+
+
+@dataclass
+class ImportProgress:
+    lines: int = 0
+    stored: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    rejected: int = 0
+    batches: int = 0
+    started: float = field(default_factory=perf_counter)
+
+    def as_dict(self) -> dict:
+        elapsed = perf_counter() - self.started
+        return {
+            "lines": self.lines,
+            "stored": self.stored,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "elapsed_sec": round(elapsed, 3),
+            "events_per_sec": round(self.lines / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+
+class GithubImportService:
+    """Bulk replay/backfill of archived webhook deliveries (NDJSON, optionally gzip).
+
+    Each line is one delivery: `{"delivery_id"|"guid", "event"|"event_type", "payload",
+    "delivered_at"|"timestamp"}`. The timestamp (ISO 8601 or epoch seconds) becomes the event's
+    `created_at`, so archived events land in their original day; lines without one are stamped now.
+    Signatures are not checked per delivery; callers are trusted (CLI) or authorized per workspace
+    (endpoint).
+    """
+
+    def __init__(self, *, batch_size: int = settings.github_import_batch_size) -> None:
+        self.batch_size = max(1, batch_size)
+
+    @staticmethod
+    def parse_line(line: bytes) -> Optional[Delivery]:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(record, dict) or not isinstance(record.get("payload"), dict):
+            return None
+        event_type = record.get("event") or record.get("event_type")
+        if not event_type:
+            return None
+        delivery_id = record.get("delivery_id") or record.get("guid")
+        delivered_at = record.get("delivered_at", record.get("timestamp"))
+        if delivered_at is not None:
+            delivered_at = GithubImportService.parse_timestamp(delivered_at)
+            if delivered_at is None:
+                return None
+        return str(event_type), record["payload"], str(delivery_id) if delivery_id else None, delivered_at
+
+    @staticmethod
+    def parse_timestamp(value: Any) -> Optional[str]:
+        """ISO 8601 (naive = UTC) or epoch seconds -> UTC ISO as stored in github_events.created_at."""
+        try:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                moment = datetime.fromtimestamp(value, tz=timezone.utc)
+            elif isinstance(value, str):
+                moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            else:
+                return None
+        except (ValueError, OverflowError, OSError):
+            return None
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment.astimezone(timezone.utc).isoformat()
+
+    def store_batch(self, lines: list[bytes], progress: ImportProgress, *, workspace_id: Optional[int] = None) -> None:
+        """Parse, dedupe and store one batch of lines.
+
+        With `workspace_id`, deliveries are filed under that workspace; deliveries whose installation
+        is linked to a different workspace are counted as rejected instead of stored.
+        """
+        progress.lines += len(lines)
+        progress.batches += 1
+        deliveries: list[Delivery] = []
+        for line in lines:
+            delivery = self.parse_line(line)
+            if delivery is None:
+                progress.invalid += 1
+            elif not github_service.claim_delivery(delivery[2]):
+                progress.duplicates += 1
+            else:
+                deliveries.append(delivery)
+        if not deliveries:
+            return
+
+        events = []
+        try:
+            resolved_deliveries = github_service.resolve_deliveries([delivery[:3] for delivery in deliveries])
+            for (resolved, event_type, payload, delivery_id), delivery in zip(resolved_deliveries, deliveries):
+                delivered_at = delivery[3]
+                if workspace_id is not None:
+                    if resolved is not None and resolved != workspace_id:
+                        # Not ours to import; let the owning workspace's import claim it.
+                        github_service.release_delivery(delivery_id)
+                        progress.rejected += 1
+                        continue
+                    resolved = workspace_id
+                events.append((resolved, event_type, payload, delivery_id, delivered_at))
+
+            stored = github_service.store_events(events)
+        except Exception:
+            # Nothing was stored: release the claims so a retried import (or a redelivery) goes through.
+            for delivery in deliveries:
+                github_service.release_delivery(delivery[2])
+            raise
+        progress.stored += stored
+        # Delivery ids already in the DB (from earlier imports or live webhooks) are skipped by the index.
+        progress.duplicates += len(events) - stored
+
+    def batches(self, chunks: Iterable[bytes]) -> Iterator[list[bytes]]:
+        reader = NdjsonReader()
+        batch: list[bytes] = []
+        for chunk in chunks:
+            for line in reader.feed(chunk):
+                batch.append(line)
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+        batch.extend(reader.finish())
+        while batch:
+            yield batch[: self.batch_size]
+            batch = batch[self.batch_size :]
+
+    def import_chunks(
+        self,
+        chunks: Iterable[bytes],
+        *,
+        workspace_id: Optional[int] = None,
+        on_batch: Optional[Callable[[ImportProgress], None]] = None,
+    ) -> dict:
+        progress = ImportProgress()
+        for batch in self.batches(chunks):
+            self.store_batch(batch, progress, workspace_id=workspace_id)
+            if on_batch is not None:
+                on_batch(progress)
+        return progress.as_dict()
+
+
+github_import_service = GithubImportService()
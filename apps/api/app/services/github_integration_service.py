@@ -4,11 +4,13 @@ import base64
 import json
 import secrets
 import time
-from typing import Optional
+from typing import Iterable, Optional
 from urllib.parse import urlencode
 
 import httpx
 
+from app.core.auth import AuthContext
+from app.core.cache import MISSING, TTLCache
 from app.core.security import sign_state, verify_state
 from app.core.settings import settings
 from app.db.database import db
@@ -16,6 +18,19 @@ from app.services.workspace_service import workspace_service
 
 
 class GithubIntegrationService:
+    def __init__(self) -> None:
+        # installation_id -> workspace_id for installations that are not uninstalled, kept current by
+        # callback()/forget_installation() in this process. Changes made by other workers are picked
+        # up when the entries expire.
+        self._installations: TTLCache[int, int] = TTLCache(
+            maxsize=10000,
+            ttl_seconds=settings.github_installation_cache_ttl_seconds,
+        )
+        self._unknown_installations: TTLCache[int, bool] = TTLCache(
+            maxsize=10000,
+            ttl_seconds=settings.github_installation_negative_ttl_seconds,
+        )
+
     @staticmethod
     def _b64url(data: bytes) -> str:
         return base64.urlsafe_b64encode(data).decode("utf-8").rstrip("=")
@@ -84,12 +99,10 @@ class GithubIntegrationService:
 
         return None
 
-    def install_url(self, *, workspace_id: int, actor_email: str) -> dict:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="github.link",
-        )
+    def install_url(self, auth: AuthContext) -> dict:
+        auth.require("github.link")
+        workspace_id = auth.workspace_id
+        actor_email = auth.actor_email
         if not settings.github_app_slug and not settings.github_app_install_url:
             raise ValueError("GITHUB_APP_SLUG 또는 GITHUB_APP_INSTALL_URL 설정이 필요합니다.")
 
@@ -123,48 +136,33 @@ class GithubIntegrationService:
 
         workspace_id = int(payload["workspace_id"])
         actor_email = str(payload["actor_email"])
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="github.link",
-        )
+        workspace_service.auth_context(workspace_id, actor_email).require("github.link")
 
         now = db.now_iso()
-        db.execute(
+        row = db.insert_returning(
             """
             INSERT INTO github_installations(workspace_id, installation_id, account_login, created_at, updated_at)
             VALUES (?, ?, ?, ?, ?)
             ON CONFLICT(workspace_id, installation_id) DO UPDATE SET
                 account_login=excluded.account_login,
+                uninstalled_at=NULL,
                 updated_at=excluded.updated_at
             """,
             (workspace_id, installation_id, account_login, now, now),
         )
-
-        row = db.fetchone(
-            "SELECT * FROM github_installations WHERE workspace_id=? AND installation_id=?",
-            (workspace_id, installation_id),
-        )
-        assert row is not None
+        self._installations.set(int(installation_id), workspace_id)
+        self._unknown_installations.invalidate(int(installation_id))
         return row
 
-    def list_installations(self, *, workspace_id: int, actor_email: str) -> list[dict]:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="workspace.read",
-        )
+    def list_installations(self, auth: AuthContext) -> list[dict]:
+        auth.require("workspace.read")
         return db.fetchall(
             "SELECT * FROM github_installations WHERE workspace_id=? ORDER BY id DESC",
-            (workspace_id,),
+            (auth.workspace_id,),
         )
 
-    def list_installation_repos(self, *, workspace_id: int, actor_email: str, installation_id: int) -> dict:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="github.link",
-        )
+    def list_installation_repos(self, auth: AuthContext, *, installation_id: int) -> dict:
+        auth.require("github.link")
 
         token = self._get_repo_query_token(installation_id)
         if not token:
@@ -195,17 +193,14 @@ class GithubIntegrationService:
 
     def link_repo(
         self,
+        auth: AuthContext,
         *,
-        workspace_id: int,
-        actor_email: str,
         installation_id: int,
         repo_full_name: str,
     ) -> dict:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="github.link",
-        )
+        auth.require("github.link")
+        workspace_id = auth.workspace_id
+        actor_email = auth.actor_email
 
         repo_id = None
         default_branch = None
@@ -232,16 +227,13 @@ class GithubIntegrationService:
             mode = "real-github-api"
 
         now = db.now_iso()
-        db.execute(
+        row = db.insert_returning(
             """
             INSERT INTO github_repos(workspace_id, installation_id, repo_id, full_name, default_branch, is_private, linked_by, created_at, updated_at)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (workspace_id, installation_id, repo_id, repo_full_name, default_branch, is_private, actor_email, now, now),
         )
-
-        row = db.fetchone("SELECT * FROM github_repos ORDER BY id DESC LIMIT 1")
-        assert row is not None
         return {
             **row,
             "mode": mode,
@@ -250,23 +242,71 @@ class GithubIntegrationService:
             else "GITHUB_APP_TOKEN 또는 GITHUB_APP_ID+GITHUB_APP_PRIVATE_KEY를 설정하면 실제 repo 메타데이터를 저장합니다.",
         }
 
-    def list_linked_repos(self, *, workspace_id: int, actor_email: str) -> list[dict]:
-        workspace_service.require_permission(
-            workspace_id=workspace_id,
-            actor_email=actor_email,
-            permission="workspace.read",
-        )
+    def list_linked_repos(self, auth: AuthContext) -> list[dict]:
+        auth.require("workspace.read")
         return db.fetchall(
             "SELECT * FROM github_repos WHERE workspace_id=? ORDER BY id DESC",
-            (workspace_id,),
+            (auth.workspace_id,),
         )
 
+    def load_installations(self) -> None:
+        """Warm the installation map from github_installations (startup)."""
+        rows = db.fetchall(
+            "SELECT installation_id, workspace_id FROM github_installations WHERE uninstalled_at IS NULL ORDER BY id ASC"
+        )
+        self._installations.clear()
+        self._unknown_installations.clear()
+        # Later rows win, matching the newest-link-first lookup below.
+        for row in rows:
+            self._installations.set(int(row["installation_id"]), int(row["workspace_id"]))
+
     def resolve_workspace_from_installation(self, installation_id: int) -> Optional[int]:
-        row = db.fetchone(
-            "SELECT workspace_id FROM github_installations WHERE installation_id=? ORDER BY id DESC LIMIT 1",
-            (installation_id,),
+        return self.resolve_workspaces([installation_id]).get(int(installation_id))
+
+    def resolve_workspaces(self, installation_ids: Iterable[int]) -> dict[int, Optional[int]]:
+        """installation_id -> linked workspace (None if unknown); misses are looked up with one query per chunk."""
+        resolved: dict[int, Optional[int]] = {}
+        missing: list[int] = []
+        for installation_id in {int(value) for value in installation_ids}:
+            workspace_id = self._installations.get(installation_id)
+            if workspace_id is not MISSING:
+                resolved[installation_id] = workspace_id
+            elif self._unknown_installations.get(installation_id) is not MISSING:
+                resolved[installation_id] = None
+            else:
+                missing.append(installation_id)
+
+        generation = self._installations.generation
+        unknown_generation = self._unknown_installations.generation
+        for start in range(0, len(missing), 500):
+            chunk = missing[start : start + 500]
+            rows = db.fetchall(
+                f"""
+                SELECT installation_id, workspace_id FROM github_installations
+                WHERE installation_id IN ({', '.join('?' for _ in chunk)}) AND uninstalled_at IS NULL
+                ORDER BY id ASC
+                """,
+                tuple(chunk),
+            )
+            found = {int(row["installation_id"]): int(row["workspace_id"]) for row in rows}
+            for installation_id in chunk:
+                if installation_id in found:
+                    self._installations.set(installation_id, found[installation_id], generation=generation)
+                else:
+                    self._unknown_installations.set(installation_id, True, generation=unknown_generation)
+                resolved[installation_id] = found.get(installation_id)
+        return resolved
+
+    def forget_installation(self, installation_id: int) -> None:
+        """The GitHub App was uninstalled: mark its links uninstalled so no worker routes its events
+        to a workspace any more. The rows stay; a new install callback clears the mark."""
+        installation_id = int(installation_id)
+        db.execute(
+            "UPDATE github_installations SET uninstalled_at=? WHERE installation_id=? AND uninstalled_at IS NULL",
+            (db.now_iso(), installation_id),
         )
-        return int(row["workspace_id"]) if row else None
+        self._installations.invalidate(installation_id)
+        self._unknown_installations.set(installation_id, True)
 
 
 github_integration_service = GithubIntegrationService()
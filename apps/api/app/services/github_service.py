@@ -2,14 +2,74 @@ from __future__ import annotations
 
 import hashlib
 import hmac
-import json
-from datetime import datetime, timezone
-from typing import Optional
+from datetime import date, datetime
+from typing import Iterable, Optional
 
+from app.core.cache import TTLCache
 from app.core.settings import settings
-from app.db.database import db
+from app.db.compression import decode_json, encode_json
+from app.db.database import AppDatabase, db
+from app.db.migrations import GITHUB_EVENT_ROLLUP_REBUILD
+from app.db.pagination import Page, build_page, keyset_after
+from app.db.records import LazyRecord, RecordSpec
+from app.services.event_broker import EventBroker
 from app.services.github_integration_service import github_integration_service
 
+EVENT_RECORD = RecordSpec(
+    "github_events",
+    {
+        "id": "id",
+        "workspace_id": "workspace_id",
+        "event_type": "event_type",
+        "repo": "repo",
+        "actor": "actor",
+        "action": "action",
+        "branch": "branch",
+        "commit_count": "commit_count",
+        "pr_number": "pr_number",
+        "merged": "merged",
+        "created_at": "created_at",
+    },
+    {"payload": ("payload_json", decode_json)},
+)
+
+# Fields pushed to /github/events/stream subscribers; the payload stays in the table.
+STREAM_FIELDS = tuple(field for field in EVENT_RECORD.fields if field != "payload")
+
+# Filterable typed columns for list_events (query parameter -> column).
+EVENT_FILTERS = ("event_type", "action", "branch", "pr_number")
+
+
+def _branch_name(ref: Optional[str]) -> Optional[str]:
+    if not ref:
+        return None
+    return ref[len("refs/heads/") :] if ref.startswith("refs/heads/") else ref
+
+
+def event_columns(event_type: str, payload: dict) -> tuple[Optional[str], Optional[str], Optional[int], Optional[int], Optional[int]]:
+    """Normalized (action, branch, commit_count, pr_number, merged) pulled out of a webhook payload at ingest."""
+    action = payload.get("action") or None
+    branch = None
+    commit_count = None
+    pr_number = None
+    merged = None
+    if event_type == "push":
+        branch = _branch_name(payload.get("ref"))
+        commits = payload.get("commits")
+        commit_count = len(commits) if isinstance(commits, list) else payload.get("size")
+    elif event_type in {"create", "delete"}:
+        if payload.get("ref_type") == "branch":
+            branch = payload.get("ref")
+    elif event_type.startswith("pull_request"):
+        pull_request = payload.get("pull_request") or {}
+        pr_number = payload.get("number") or pull_request.get("number")
+        branch = (pull_request.get("base") or {}).get("ref")
+        if "merged" in pull_request:
+            merged = 1 if pull_request.get("merged") else 0
+        if event_type == "pull_request":
+            commit_count = pull_request.get("commits")
+    return action, branch, commit_count, pr_number, merged
+
 
 class GithubService:
     def verify_signature(self, body: bytes, signature_header: Optional[str]) -> bool:
@@ -24,84 +84,234 @@ class GithubService:
         received = signature_header.split("=", 1)[1]
         return hmac.compare_digest(expected, received)
 
-    def ingest_event(self, event_type: str, payload: dict) -> dict:
-        repo = payload.get("repository", {}).get("full_name", "")
-        actor = payload.get("sender", {}).get("login", "")
-        installation_id = payload.get("installation", {}).get("id")
-        workspace_id = None
-        if installation_id:
-            workspace_id = github_integration_service.resolve_workspace_from_installation(int(installation_id))
-
-        created_at = db.now_iso()
+    # Redeliveries that get past the in-memory filter (other workers, restarts) hit the unique index.
+    _INSERT_EVENT = """
+        INSERT INTO github_events(
+            workspace_id, event_type, repo, actor, payload_json, created_at, created_ts, delivery_id,
+            action, branch, commit_count, pr_number, merged
+        )
+        VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(delivery_id) WHERE delivery_id IS NOT NULL DO NOTHING
+    """
 
-        db.execute(
-            "INSERT INTO github_events(workspace_id, event_type, repo, actor, payload_json, created_at) VALUES(?, ?, ?, ?, ?, ?)",
-            (workspace_id, event_type, repo, actor, db.to_json(payload), created_at),
+    def __init__(self) -> None:
+        self.recent_deliveries: TTLCache[str, bool] = TTLCache(
+            maxsize=settings.github_delivery_cache_size,
+            ttl_seconds=settings.github_delivery_cache_ttl_seconds,
         )
 
-        return {
+    def claim_delivery(self, delivery_id: Optional[str]) -> bool:
+        """False if this X-GitHub-Delivery was seen recently. Deliveries without an id are always accepted."""
+        if not delivery_id:
+            return True
+        return self.recent_deliveries.add(delivery_id, True)
+
+    def release_delivery(self, delivery_id: Optional[str]) -> None:
+        """Forget a claimed delivery that was not accepted after all, so its redelivery goes through."""
+        if delivery_id:
+            self.recent_deliveries.invalidate(delivery_id)
+
+    @staticmethod
+    def _installation_id(payload: dict) -> Optional[int]:
+        installation_id = payload.get("installation", {}).get("id")
+        return int(installation_id) if installation_id else None
+
+    @staticmethod
+    def _is_uninstall(event_type: str, payload: dict) -> bool:
+        return event_type == "installation" and payload.get("action") == "deleted"
+
+    @staticmethod
+    def _event_record(
+        event_type: str,
+        payload: dict,
+        workspace_id: Optional[int],
+        delivery_id: Optional[str] = None,
+        created_at: Optional[str] = None,
+    ) -> tuple[tuple, dict]:
+        """`created_at` is the original delivery time for replayed events (UTC ISO); defaults to now."""
+        repo = payload.get("repository", {}).get("full_name", "")
+        actor = payload.get("sender", {}).get("login", "")
+        created_at = created_at or db.now_iso()
+        typed = event_columns(event_type, payload)
+        params = (workspace_id, event_type, repo, actor, encode_json(payload), created_at, db.epoch_ms(created_at), delivery_id, *typed)
+        result = {
             "saved": True,
             "workspace_id": workspace_id,
             "event_type": event_type,
             "repo": repo,
             "actor": actor,
+            **dict(zip(("action", "branch", "commit_count", "pr_number", "merged"), typed)),
             "created_at": created_at,
         }
+        return params, result
+
+    def ingest_event(self, event_type: str, payload: dict, delivery_id: Optional[str] = None) -> dict:
+        installation_id = self._installation_id(payload)
+        workspace_id = None
+        if installation_id:
+            workspace_id = github_integration_service.resolve_workspace_from_installation(installation_id)
 
-    def list_events(self, workspace_id: Optional[int] = None, limit: int = 100) -> list[dict]:
-        if workspace_id is not None:
-            rows = db.fetchall(
-                "SELECT id, workspace_id, event_type, repo, actor, payload_json, created_at FROM github_events WHERE workspace_id=? ORDER BY id DESC LIMIT ?",
-                (workspace_id, limit),
-            )
-        else:
-            rows = db.fetchall(
-                "SELECT id, workspace_id, event_type, repo, actor, payload_json, created_at FROM github_events ORDER BY id DESC LIMIT ?",
-                (limit,),
-            )
-
-        result: list[dict] = []
-        for row in rows:
-            result.append(
-                {
-                    "id": row["id"],
-                    "workspace_id": row.get("workspace_id"),
-                    "event_type": row["event_type"],
-                    "repo": row["repo"],
-                    "actor": row["actor"],
-                    "payload": db.from_json(row["payload_json"]),
-                    "created_at": row["created_at"],
-                }
-            )
+        params, result = self._event_record(event_type, payload, workspace_id, delivery_id)
+        result["saved"] = db.for_workspace(workspace_id).executemany(self._INSERT_EVENT, [params]) > 0
+        github_event_broker.notify([workspace_id])
+        if installation_id and self._is_uninstall(event_type, payload):
+            github_integration_service.forget_installation(installation_id)
         return result
 
-    def events_between(self, workspace_id: int, start: datetime, end: datetime) -> list[dict]:
-        rows = db.fetchall(
+    def ingest_batch(self, deliveries: list[tuple[str, dict, Optional[str]]]) -> int:
+        """Store (event_type, payload, delivery_id) deliveries, resolving their workspaces in one batch.
+        Returns the number of rows stored; already-stored delivery ids are skipped."""
+        return self.store_events([(*event, None) for event in self.resolve_deliveries(deliveries)])
+
+    def resolve_deliveries(self, deliveries: list[tuple[str, dict, Optional[str]]]) -> list[tuple[Optional[int], str, dict, Optional[str]]]:
+        """(event_type, payload, delivery_id) -> (workspace_id, ...) with one batched installation lookup."""
+        installation_ids = {self._installation_id(payload) for _, payload, _ in deliveries}
+        workspaces = github_integration_service.resolve_workspaces(value for value in installation_ids if value)
+        return [
+            (workspaces.get(self._installation_id(payload)), event_type, payload, delivery_id)
+            for event_type, payload, delivery_id in deliveries
+        ]
+
+    def store_events(self, events: list[tuple[Optional[int], str, dict, Optional[str], Optional[str]]]) -> int:
+        """Store (workspace_id, event_type, payload, delivery_id, created_at) rows with one executemany
+        (one transaction) per target database. A None `created_at` means now."""
+        grouped: dict[AppDatabase, list[tuple]] = {}
+        uninstalled: set[int] = set()
+        for workspace_id, event_type, payload, delivery_id, created_at in events:
+            installation_id = self._installation_id(payload)
+            # Replayed (dated) uninstall events are history, not a change to the current mapping.
+            if installation_id and created_at is None and self._is_uninstall(event_type, payload):
+                uninstalled.add(installation_id)
+            params, _ = self._event_record(event_type, payload, workspace_id, delivery_id, created_at)
+            grouped.setdefault(db.for_workspace(workspace_id), []).append(params)
+
+        stored = sum(target.executemany(self._INSERT_EVENT, rows) for target, rows in grouped.items())
+        github_event_broker.notify(event[0] for event in events)
+        # The uninstall event itself is still filed under the workspace it belonged to.
+        for installation_id in uninstalled:
+            github_integration_service.forget_installation(installation_id)
+        return stored
+
+    def list_events(
+        self,
+        workspace_id: Optional[int] = None,
+        limit: int = 100,
+        fields: Optional[Iterable[str]] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[dict] = None,
+    ) -> Page[LazyRecord]:
+        """`filters` maps EVENT_FILTERS names to exact values; None values are ignored."""
+        select = EVENT_RECORD.select(fields, include=("id", "created_ts"))
+        after, after_params = keyset_after("created_ts", cursor)
+        conditions = ["workspace_id=?"] if workspace_id is not None else ["1=1"]
+        params: list = [workspace_id] if workspace_id is not None else []
+        for name, value in (filters or {}).items():
+            if name not in EVENT_FILTERS:
+                raise ValueError(f"지원하지 않는 필터입니다: {name}")
+            if value is not None:
+                conditions.append(f"{name}=?")
+                params.append(value)
+        rows = db.for_workspace(workspace_id).fetchall(
+            f"{select} WHERE {' AND '.join(conditions)}{after} ORDER BY created_ts DESC, id DESC LIMIT ?",
+            (*params, *after_params, limit + 1),
+        )
+        return build_page(rows, limit=limit, sort_column="created_ts", load=lambda row: EVENT_RECORD.load(row, fields))
+
+    def latest_event_id(self, workspace_id: int) -> int:
+        row = db.for_workspace(workspace_id).fetchone(
+            "SELECT id FROM github_events WHERE workspace_id=? ORDER BY id DESC LIMIT 1",
+            (workspace_id,),
+        )
+        return int(row["id"]) if row else 0
+
+    def events_after(self, workspace_id: int, after_id: int, limit: int = 500) -> list[dict]:
+        """Events newer than `after_id` in id order, without payloads (SSE feed and Last-Event-ID resume)."""
+        rows = db.for_workspace(workspace_id).fetchall(
+            f"{EVENT_RECORD.select(STREAM_FIELDS)} WHERE workspace_id=? AND id > ? ORDER BY id ASC LIMIT ?",
+            (workspace_id, after_id, limit),
+        )
+        return [dict(EVENT_RECORD.load(row, STREAM_FIELDS)) for row in rows]
+
+    def events_between(
+        self,
+        workspace_id: int,
+        start: datetime,
+        end: datetime,
+        fields: Optional[Iterable[str]] = None,
+        limit: int = -1,
+    ) -> list[LazyRecord]:
+        rows = db.for_workspace(workspace_id).fetchall(
+            f"""
+            {EVENT_RECORD.select(fields)}
+            WHERE workspace_id=?
+              AND created_ts BETWEEN ? AND ?
+            ORDER BY created_ts ASC, id ASC
+            LIMIT ?
+            """,
+            (workspace_id, db.epoch_ms(start), db.epoch_ms(end), limit),
+        )
+        return [EVENT_RECORD.load(row, fields) for row in rows]
+
+    def rollup_totals(self, workspace_id: int, start_day: date, end_day: date, *, by: str) -> list[dict]:
+        """Event counts per `by` (event_type, repo or actor) from github_event_rollups, largest first."""
+        if by not in {"event_type", "repo", "actor"}:
+            raise ValueError(f"지원하지 않는 집계 기준입니다: {by}")
+        return db.for_workspace(workspace_id).fetchall(
+            f"""
+            SELECT {by} AS key, SUM(event_count) AS event_count, SUM(commit_count) AS commit_count
+            FROM github_event_rollups
+            WHERE workspace_id=? AND day BETWEEN ? AND ?
+            GROUP BY {by}
+            ORDER BY event_count DESC, key ASC
+            """,
+            (workspace_id, start_day.isoformat(), end_day.isoformat()),
+        )
+
+    def rollup_watermark(self, workspace_id: int, start_day: date, end_day: date) -> int:
+        """Newest event id stored for the days in range (0 = none); changes whenever the window does."""
+        row = db.for_workspace(workspace_id).fetchone(
+            """
+            SELECT COALESCE(MAX(max_event_id), 0) AS watermark
+            FROM github_event_rollups
+            WHERE workspace_id=? AND day BETWEEN ? AND ?
+            """,
+            (workspace_id, start_day.isoformat(), end_day.isoformat()),
+        )
+        return int(row["watermark"]) if row else 0
+
+    def branch_commits(self, workspace_id: int, start: datetime, end: datetime) -> list[dict]:
+        return db.for_workspace(workspace_id).fetchall(
             """
-            SELECT id, workspace_id, event_type, repo, actor, payload_json, created_at
+            SELECT branch, SUM(COALESCE(commit_count, 0)) AS commit_count
             FROM github_events
-            WHERE workspace_id=?
-              AND datetime(created_at) >= datetime(?)
-              AND datetime(created_at) <= datetime(?)
-            ORDER BY id ASC
+            WHERE workspace_id=? AND event_type='push' AND created_ts BETWEEN ? AND ? AND branch IS NOT NULL
+            GROUP BY branch
+            ORDER BY commit_count DESC, branch ASC
+            """,
+            (workspace_id, db.epoch_ms(start), db.epoch_ms(end)),
+        )
+
+    def pull_request_counts(self, workspace_id: int, start: datetime, end: datetime) -> dict:
+        row = db.for_workspace(workspace_id).fetchone(
+            """
+            SELECT
+                COUNT(DISTINCT CASE WHEN action='opened' THEN repo || '#' || pr_number END) AS opened,
+                COUNT(DISTINCT CASE WHEN action='closed' AND merged=1 THEN repo || '#' || pr_number END) AS merged
+            FROM github_events
+            WHERE workspace_id=? AND event_type='pull_request' AND created_ts BETWEEN ? AND ?
             """,
-            (workspace_id, start.astimezone(timezone.utc).isoformat(), end.astimezone(timezone.utc).isoformat()),
+            (workspace_id, db.epoch_ms(start), db.epoch_ms(end)),
         )
+        return {"opened": int(row["opened"] or 0), "merged": int(row["merged"] or 0)} if row else {"opened": 0, "merged": 0}
 
-        events = []
-        for row in rows:
-            events.append(
-                {
-                    "id": row["id"],
-                    "workspace_id": row.get("workspace_id"),
-                    "event_type": row["event_type"],
-                    "repo": row["repo"],
-                    "actor": row["actor"],
-                    "payload": json.loads(row["payload_json"]),
-                    "created_at": row["created_at"],
-                }
-            )
-        return events
+    def rebuild_rollups(self, database: AppDatabase) -> int:
+        """Recompute github_event_rollups for every workspace stored in `database`."""
+        with database.transaction():
+            database.execute("DELETE FROM github_event_rollups")
+            database.execute(GITHUB_EVENT_ROLLUP_REBUILD)
+        row = database.fetchone("SELECT COUNT(*) AS total FROM github_event_rollups")
+        return int(row["total"]) if row else 0
 
 
 github_service = GithubService()
+github_event_broker = EventBroker(fetch_after=github_service.events_after)
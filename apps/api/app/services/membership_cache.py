@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from threading import Lock
+from time import monotonic
+from typing import Callable, Iterable, Optional
+
+from app.core.cache import MISSING, TTLCache
+from app.core.settings import settings
+from app.db.database import db
+
+MembershipKey = tuple[int, str]
+
+
+class MembershipCache:
+    """(workspace_id, user_email) -> membership row (or None for non-members).
+
+    Writes in this process invalidate synchronously through `changed()`. Writes from other
+    workers are picked up by polling `membership_versions` for rows newer than the last version
+    seen, at most every `sync_ms` (0 = before every lookup). The per-workspace versions learned
+    that way also back access-token revocation (`version()`).
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int = settings.membership_cache_size,
+        ttl_seconds: float = settings.membership_cache_ttl_seconds,
+        sync_ms: int = settings.membership_cache_sync_ms,
+    ) -> None:
+        self.cache: TTLCache[MembershipKey, Optional[dict]] = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self.sync_ms = sync_ms
+        self._sync_lock = Lock()
+        self._seen_version: Optional[int] = None
+        self._last_sync: Optional[float] = None
+        self._versions: dict[int, int] = {}
+
+    def get(self, workspace_id: int, user_email: str, loader: Callable[[], Optional[dict]]) -> Optional[dict]:
+        if db.in_transaction():
+            # The caller may be looking at its own uncommitted membership change.
+            return loader()
+
+        self._sync()
+        key = (int(workspace_id), user_email)
+        cached = self.cache.get(key)
+        if cached is not MISSING:
+            return dict(cached) if cached else None
+
+        generation = self.cache.generation
+        row = loader()
+        self.cache.set(key, dict(row) if row else None, generation=generation)
+        return row
+
+    def get_many(
+        self,
+        keys: Iterable[MembershipKey],
+        loader: Callable[[list[MembershipKey]], dict[MembershipKey, dict]],
+    ) -> dict[MembershipKey, Optional[dict]]:
+        """Batch `get()`: cached keys are answered locally, the rest are loaded with one `loader` call."""
+        wanted = list(dict.fromkeys((int(workspace_id), email) for workspace_id, email in keys))
+        if db.in_transaction():
+            loaded = loader(wanted) if wanted else {}
+            return {key: loaded.get(key) for key in wanted}
+
+        self._sync()
+        found: dict[MembershipKey, Optional[dict]] = {}
+        missing: list[MembershipKey] = []
+        for key in wanted:
+            cached = self.cache.get(key)
+            if cached is MISSING:
+                missing.append(key)
+            else:
+                found[key] = dict(cached) if cached else None
+
+        if missing:
+            generation = self.cache.generation
+            loaded = loader(missing)
+            for key in missing:
+                row = loaded.get(key)
+                self.cache.set(key, dict(row) if row else None, generation=generation)
+                found[key] = row
+        return {key: found[key] for key in wanted}
+
+    def changed(self, workspace_id: int) -> None:
+        """Record a membership change. Call inside the write's transaction when there is one."""
+        db.execute(
+            """
+            INSERT INTO membership_versions(workspace_id, version)
+            SELECT ?, COALESCE(MAX(version), 0) + 1 FROM membership_versions WHERE true
+            ON CONFLICT(workspace_id) DO UPDATE SET version=excluded.version
+            """,
+            (workspace_id,),
+        )
+        row = db.fetchone("SELECT version FROM membership_versions WHERE workspace_id=?", (workspace_id,))
+        with self._sync_lock:
+            self._versions[int(workspace_id)] = int(row["version"])
+        self.invalidate(workspace_id)
+
+    def version(self, workspace_id: int) -> int:
+        """Membership version of a workspace as of the last sync (0 = never changed)."""
+        self._sync()
+        return self._versions.get(int(workspace_id), 0)
+
+    def invalidate(self, workspace_id: int) -> None:
+        workspace_id = int(workspace_id)
+        self.cache.invalidate_where(lambda key: key[0] == workspace_id)
+
+    def clear(self) -> None:
+        self.cache.clear()
+        with self._sync_lock:
+            self._seen_version = None
+            self._last_sync = None
+            self._versions.clear()
+
+    def _sync(self) -> None:
+        if not self._sync_due():
+            return
+        with self._sync_lock:
+            if not self._sync_due():
+                return
+            self._last_sync = monotonic()
+            if self._seen_version is None:
+                rows = db.fetchall("SELECT workspace_id, version FROM membership_versions")
+                self._versions = {int(row["workspace_id"]): int(row["version"]) for row in rows}
+                self._seen_version = max(self._versions.values(), default=0)
+                return
+
+            rows = db.fetchall(
+                "SELECT workspace_id, version FROM membership_versions WHERE version > ?",
+                (self._seen_version,),
+            )
+            if not rows:
+                return
+            changed = {int(row["workspace_id"]) for row in rows}
+            for row in rows:
+                workspace_id = int(row["workspace_id"])
+                self._versions[workspace_id] = max(self._versions.get(workspace_id, 0), int(row["version"]))
+            self._seen_version = max(int(row["version"]) for row in rows)
+        self.cache.invalidate_where(lambda key: key[0] in changed)
+
+    def _sync_due(self) -> bool:
+        return self._last_sync is None or monotonic() - self._last_sync >= self.sync_ms / 1000
+
+
+membership_cache = MembershipCache()
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from threading import Event, Lock, Thread
+from time import perf_counter
+from typing import Callable, Iterable, Optional
+
+from app.core.settings import settings
+from app.db.database import db
+from app.services.report_service import report_service
+
+logger = logging.getLogger("app.reports")
+
+REPORT_TYPES = ("daily", "weekly")
+
+DONE = "done"
+FAILED = "failed"
+RUNNING = "running"
+
+
+@dataclass
+class ReportJob:
+    report_type: str
+    period_start: date
+    period_end: date
+    workspace_id: int
+    actor_email: str
+    status: str = RUNNING
+    report_id: Optional[int] = None
+    duration_ms: int = 0
+    error: Optional[str] = None
+    lease_ts: Optional[int] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "report_type": self.report_type,
+            "period_start": self.period_start.isoformat(),
+            "period_end": self.period_end.isoformat(),
+            "workspace_id": self.workspace_id,
+            "status": self.status,
+            "report_id": self.report_id,
+            "duration_ms": self.duration_ms,
+            "error": self.error,
+        }
+
+
+def report_period(report_type: str, today: date) -> tuple[date, date]:
+    """Most recent complete period before `today`: yesterday, or last Monday-Sunday week."""
+    if report_type == "daily":
+        day = today - timedelta(days=1)
+        return day, day
+    if report_type == "weekly":
+        end = today - timedelta(days=today.weekday() + 1)
+        return end - timedelta(days=6), end
+    raise ValueError(f"지원하지 않는 리포트 유형입니다: {report_type}")
+
+
+class ReportScheduler:
+    """Generates one report type/period for every workspace on a bounded thread pool.
+
+    Progress is checkpointed per workspace in `report_jobs`, so a rerun of an interrupted (or
+    partly failed) run only generates what is not `done` yet. Each job is claimed with a lease
+    before it runs, so several processes running the schedule split the work instead of
+    repeating it. The lease is renewed every `lease_seconds / 3` while the report is generated, so
+    only a job whose worker stopped renewing it (crash) becomes claimable again. `workers` bounds how many reports are generated at once, leaving DB connections and
+    the writer for interactive requests.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = settings.report_scheduler_workers,
+        lease_seconds: float = settings.report_job_lease_seconds,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.lease_seconds = lease_seconds
+        self._run_lock = Lock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    def run(
+        self,
+        report_type: str,
+        period_start: date,
+        period_end: date,
+        *,
+        workspace_ids: Optional[Iterable[int]] = None,
+        on_job: Optional[Callable[[ReportJob], None]] = None,
+    ) -> dict:
+        if report_type not in REPORT_TYPES:
+            raise ValueError(f"지원하지 않는 리포트 유형입니다: {report_type}")
+        if period_end < period_start:
+            raise ValueError("리포트 기간이 올바르지 않습니다.")
+
+        # One run at a time per process; a second caller waits instead of doubling the load.
+        with self._run_lock:
+            started = perf_counter()
+            jobs, skipped = self._pending_jobs(report_type, period_start, period_end, workspace_ids)
+            finished: list[ReportJob] = []
+            # Jobs another process holds a live lease on.
+            busy = 0
+            if jobs:
+                with ThreadPoolExecutor(max_workers=min(self.workers, len(jobs)), thread_name_prefix="report-job") as pool:
+                    futures = [pool.submit(self._run_job, job) for job in jobs]
+                    for future in as_completed(futures):
+                        job = future.result()
+                        if job is None:
+                            busy += 1
+                            continue
+                        finished.append(job)
+                        if on_job is not None:
+                            on_job(job)
+
+            durations = sorted(job.duration_ms for job in finished)
+            return {
+                "report_type": report_type,
+                "period_start": period_start.isoformat(),
+                "period_end": period_end.isoformat(),
+                "workers": self.workers,
+                "total": len(jobs) + skipped,
+                "skipped": skipped,
+                "busy": busy,
+                "done": sum(1 for job in finished if job.status == DONE),
+                "failed": sum(1 for job in finished if job.status == FAILED),
+                "elapsed_sec": round(perf_counter() - started, 3),
+                "job_ms_p50": durations[len(durations) // 2] if durations else 0,
+                "job_ms_max": durations[-1] if durations else 0,
+                "jobs": [job.as_dict() for job in sorted(finished, key=lambda job: job.workspace_id)],
+            }
+
+    def run_due(self, today: Optional[date] = None) -> list[dict]:
+        """Run every report type for its latest complete period; already finished jobs are skipped."""
+        today = today or datetime.now(timezone.utc).date()
+        return [self.run(report_type, *report_period(report_type, today)) for report_type in REPORT_TYPES]
+
+    def jobs(self, report_type: str, period_start: date, period_end: date) -> list[dict]:
+        return db.fetchall(
+            """
+            SELECT * FROM report_jobs
+            WHERE report_type=? AND period_start=? AND period_end=?
+            ORDER BY workspace_id
+            """,
+            (report_type, period_start.isoformat(), period_end.isoformat()),
+        )
+
+    def start(self, interval_seconds: float = settings.report_schedule_interval_seconds) -> None:
+        """Call `run_due()` every `interval_seconds` on a background thread (0 = disabled)."""
+        if interval_seconds <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._loop, args=(interval_seconds,), name="report-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join()
+
+    def _loop(self, interval_seconds: float) -> None:
+        while not self._stop.is_set():
+            try:
+                for summary in self.run_due():
+                    if summary["done"] or summary["failed"]:
+                        logger.info(
+                            "scheduled %s reports %s~%s: done=%d failed=%d elapsed=%.3fs",
+                            summary["report_type"],
+                            summary["period_start"],
+                            summary["period_end"],
+                            summary["done"],
+                            summary["failed"],
+                            summary["elapsed_sec"],
+                        )
+            except Exception:
+                logger.exception("scheduled report run failed")
+            self._stop.wait(interval_seconds)
+
+    def _pending_jobs(
+        self,
+        report_type: str,
+        period_start: date,
+        period_end: date,
+        workspace_ids: Optional[Iterable[int]],
+    ) -> tuple[list[ReportJob], int]:
+        workspaces = db.fetchall("SELECT id, owner_email FROM workspaces ORDER BY id")
+        if workspace_ids is not None:
+            wanted = {int(workspace_id) for workspace_id in workspace_ids}
+            workspaces = [row for row in workspaces if row["id"] in wanted]
+        done = {row["workspace_id"] for row in self.jobs(report_type, period_start, period_end) if row["status"] == DONE}
+        jobs = [
+            ReportJob(report_type, period_start, period_end, int(row["id"]), row["owner_email"])
+            for row in workspaces
+            if row["id"] not in done
+        ]
+        return jobs, len(workspaces) - len(jobs)
+
+    def _run_job(self, job: ReportJob) -> Optional[ReportJob]:
+        if not self._claim(job):
+            return None
+        started = perf_counter()
+        done = Event()
+        renewer = Thread(target=self._keep_lease, args=(job, done), name="report-lease", daemon=True)
+        renewer.start()
+        try:
+            report = report_service.generate_report(
+                workspace_id=job.workspace_id,
+                actor_email=job.actor_email,
+                report_type=job.report_type,
+                period_start=job.period_start,
+                period_end=job.period_end,
+            )
+            job.status, job.report_id = DONE, int(report["id"])
+        except Exception as exc:
+            logger.exception("report job failed: workspace_id=%s %s", job.workspace_id, job.report_type)
+            job.status, job.error = FAILED, str(exc) or exc.__class__.__name__
+        finally:
+            done.set()
+            renewer.join()
+        job.duration_ms = int((perf_counter() - started) * 1000)
+        self._finish(job)
+        return job
+
+    def _keep_lease(self, job: ReportJob, done: Event) -> None:
+        """Push the lease forward until `done` is set; stops once the lease was lost."""
+        while not done.wait(self.lease_seconds / 3):
+            try:
+                if not self._renew(job):
+                    logger.warning("report job lease lost: workspace_id=%s %s", job.workspace_id, job.report_type)
+                    return
+            except Exception:
+                logger.exception("report job lease renewal failed: workspace_id=%s", job.workspace_id)
+
+    def _claim(self, job: ReportJob) -> bool:
+        """Atomically mark the job running under a new lease; False if it is done or leased elsewhere."""
+        now = db.now_iso()
+        job.lease_ts = db.epoch_ms(now)
+        claimed = db.executemany(
+            """
+            INSERT INTO report_jobs(
+                report_type, period_start, period_end, workspace_id, status, attempts, lease_ts, updated_at
+            )
+            VALUES (?, ?, ?, ?, 'running', 1, ?, ?)
+            ON CONFLICT(report_type, period_start, period_end, workspace_id) DO UPDATE SET
+                status='running',
+                attempts=report_jobs.attempts + 1,
+                lease_ts=excluded.lease_ts,
+                report_id=NULL,
+                duration_ms=NULL,
+                error=NULL,
+                updated_at=excluded.updated_at
+            WHERE report_jobs.status != 'done'
+              AND (report_jobs.status != 'running' OR report_jobs.lease_ts < ?)
+            """,
+            [
+                (
+                    job.report_type,
+                    job.period_start.isoformat(),
+                    job.period_end.isoformat(),
+                    job.workspace_id,
+                    job.lease_ts,
+                    now,
+                    job.lease_ts - int(self.lease_seconds * 1000),
+                )
+            ],
+        )
+        return claimed > 0
+
+    @staticmethod
+    def _renew(job: ReportJob) -> bool:
+        lease_ts = db.epoch_ms(db.now_iso())
+        renewed = db.executemany(
+            """
+            UPDATE report_jobs SET lease_ts=?
+            WHERE report_type=? AND period_start=? AND period_end=? AND workspace_id=?
+              AND status='running' AND lease_ts=?
+            """,
+            [
+                (
+                    lease_ts,
+                    job.report_type,
+                    job.period_start.isoformat(),
+                    job.period_end.isoformat(),
+                    job.workspace_id,
+                    job.lease_ts,
+                )
+            ],
+        )
+        if renewed:
+            job.lease_ts = lease_ts
+        return renewed > 0
+
+    @staticmethod
+    def _finish(job: ReportJob) -> None:
+        # Only while this run still holds the lease; an expired lease may have been taken over.
+        db.execute(
+            """
+            UPDATE report_jobs
+            SET status=?, report_id=?, duration_ms=?, error=?, updated_at=?
+            WHERE report_type=? AND period_start=? AND period_end=? AND workspace_id=? AND lease_ts=?
+            """,
+            (
+                job.status,
+                job.report_id,
+                job.duration_ms,
+                job.error,
+                db.now_iso(),
+                job.report_type,
+                job.period_start.isoformat(),
+                job.period_end.isoformat(),
+                job.workspace_id,
+                job.lease_ts,
+            ),
+        )
+
+
+report_scheduler = ReportScheduler()
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-from collections import Counter
 from datetime import date, datetime, time, timezone
 from typing import Optional
 
-from app.db.database import db
+from app.db.database import AppDatabase, db
+from app.db.pagination import Page, build_page, keyset_after
 from app.services.docs_service import docs_service
 from app.services.github_service import github_service
 
@@ -19,34 +19,63 @@ class ReportService:
         period_start: date,
         period_end: date,
     ) -> dict:
+        """Reports are reused while no event lands in their window: the rollup watermark (newest
+        event id in the period) is stored with each report and a matching one is returned as is."""
+        ws_db = db.for_workspace(workspace_id)
+        source_event_id = github_service.rollup_watermark(workspace_id, period_start, period_end)
+        cached = self._find_report(ws_db, workspace_id, report_type, period_start, period_end, source_event_id)
+        if cached is not None:
+            return cached
+
         start = datetime.combine(period_start, time.min).replace(tzinfo=timezone.utc)
         end = datetime.combine(period_end, time.max).replace(tzinfo=timezone.utc)
-        events = github_service.events_between(workspace_id, start, end)
-
-        counter = Counter([event["event_type"] for event in events])
-        repo_counter = Counter([event["repo"] for event in events if event["repo"]])
+        # Summaries come from the daily rollups; only the listed top events are read from github_events.
+        by_type = github_service.rollup_totals(workspace_id, period_start, period_end, by="event_type")
+        by_repo = [row for row in github_service.rollup_totals(workspace_id, period_start, period_end, by="repo") if row["key"]]
+        branch_commits = github_service.branch_commits(workspace_id, start, end)
+        pull_requests = github_service.pull_request_counts(workspace_id, start, end)
+        events = github_service.events_between(
+            workspace_id,
+            start,
+            end,
+            fields=("id", "event_type", "repo", "actor", "created_at"),
+            limit=30,
+        )
+        total = sum(row["event_count"] for row in by_type)
 
         lines: list[str] = []
         lines.append(f"# {report_type.upper()} Report")
         lines.append(f"- 기간: {period_start.isoformat()} ~ {period_end.isoformat()}")
-        lines.append(f"- 수집 이벤트 수: {len(events)}")
+        lines.append(f"- 수집 이벤트 수: {total}")
         lines.append("")
 
-        if counter:
+        if by_type:
             lines.append("## 이벤트 타입 요약")
-            for event_type, count in counter.items():
-                lines.append(f"- {event_type}: {count}건")
+            for row in by_type:
+                lines.append(f"- {row['key']}: {row['event_count']}건")
             lines.append("")
 
-        if repo_counter:
+        if by_repo:
             lines.append("## 저장소 활동 요약")
-            for repo, count in repo_counter.items():
-                lines.append(f"- {repo}: {count}건")
+            for row in by_repo:
+                lines.append(f"- {row['key']}: {row['event_count']}건")
+            lines.append("")
+
+        if branch_commits:
+            lines.append("## 브랜치별 커밋")
+            for row in branch_commits:
+                lines.append(f"- {row['branch']}: {row['commit_count']}개 커밋")
+            lines.append("")
+
+        if pull_requests["opened"] or pull_requests["merged"]:
+            lines.append("## Pull Request 요약")
+            lines.append(f"- 생성: {pull_requests['opened']}건")
+            lines.append(f"- 머지: {pull_requests['merged']}건")
             lines.append("")
 
         if events:
             lines.append("## 주요 이벤트")
-            for event in events[:30]:
+            for event in events:
                 lines.append(
                     f"- [{event['created_at']}] {event['event_type']} / {event['repo'] or '-'} / {event['actor'] or '-'}"
                 )
@@ -58,40 +87,83 @@ class ReportService:
         now = db.now_iso()
         title = f"{report_type}-{period_start.isoformat()}-{period_end.isoformat()}"
 
-        db.execute(
-            """
-            INSERT INTO reports(workspace_id, report_type, period_start, period_end, title, content, created_by, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (workspace_id, report_type, period_start.isoformat(), period_end.isoformat(), title, content, actor_email, now),
-        )
+        with ws_db.transaction():
+            # A concurrent request for the same window may have stored it while this one rendered.
+            cached = self._find_report(ws_db, workspace_id, report_type, period_start, period_end, source_event_id)
+            if cached is not None:
+                return cached
+            report = ws_db.insert_returning(
+                """
+                INSERT INTO reports(
+                    workspace_id, report_type, period_start, period_end, title, content,
+                    created_by, created_at, created_ts, source_event_id
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    workspace_id,
+                    report_type,
+                    period_start.isoformat(),
+                    period_end.isoformat(),
+                    title,
+                    content,
+                    actor_email,
+                    now,
+                    db.epoch_ms(now),
+                    source_event_id,
+                ),
+            )
 
-        report = db.fetchone("SELECT * FROM reports ORDER BY id DESC LIMIT 1")
-        assert report is not None
+            docs_service.create(
+                workspace_id=workspace_id,
+                created_by=actor_email,
+                space="reports",
+                title=title,
+                content=content,
+                tags=["report", report_type, period_start.isoformat(), period_end.isoformat()],
+                database=ws_db,
+            )
 
-        docs_service.create(
-            workspace_id=workspace_id,
-            created_by=actor_email,
-            space="reports",
-            title=title,
-            content=content,
-            tags=["report", report_type, period_start.isoformat(), period_end.isoformat()],
-        )
+            return report
 
-        return report
+    @staticmethod
+    def _find_report(
+        ws_db: AppDatabase,
+        workspace_id: int,
+        report_type: str,
+        period_start: date,
+        period_end: date,
+        source_event_id: int,
+    ) -> Optional[dict]:
+        return ws_db.fetchone(
+            """
+            SELECT * FROM reports
+            WHERE workspace_id=? AND report_type=? AND period_start=? AND period_end=? AND source_event_id=?
+            ORDER BY id DESC LIMIT 1
+            """,
+            (workspace_id, report_type, period_start.isoformat(), period_end.isoformat(), source_event_id),
+        )
 
-    def list_reports(self, *, workspace_id: int, report_type: Optional[str] = None, limit: int = 100) -> list[dict]:
+    def list_reports(
+        self,
+        *,
+        workspace_id: int,
+        report_type: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Page[dict]:
+        after, after_params = keyset_after("created_ts", cursor)
         if report_type:
-            rows = db.fetchall(
-                "SELECT * FROM reports WHERE workspace_id=? AND report_type=? ORDER BY id DESC LIMIT ?",
-                (workspace_id, report_type, limit),
+            rows = db.for_workspace(workspace_id).fetchall(
+                f"SELECT * FROM reports WHERE workspace_id=? AND report_type=?{after} ORDER BY created_ts DESC, id DESC LIMIT ?",
+                (workspace_id, report_type, *after_params, limit + 1),
             )
         else:
-            rows = db.fetchall(
-                "SELECT * FROM reports WHERE workspace_id=? ORDER BY id DESC LIMIT ?",
-                (workspace_id, limit),
+            rows = db.for_workspace(workspace_id).fetchall(
+                f"SELECT * FROM reports WHERE workspace_id=?{after} ORDER BY created_ts DESC, id DESC LIMIT ?",
+                (workspace_id, *after_params, limit + 1),
             )
-        return rows
+        return build_page(rows, limit=limit, sort_column="created_ts")
 
 
 report_service = ReportService()
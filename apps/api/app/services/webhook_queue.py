@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import json
+import logging
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from time import sleep
+from typing import Any, Optional
+
+from app.core.settings import settings
+from app.services.github_service import github_service
+
+logger = logging.getLogger("app.github")
+
+_STOP = object()
+
+QUEUED = "queued"
+DUPLICATE = "duplicate"
+FULL = "full"
+
+
+class WebhookQueue:
+    """Bounded in-process queue between `POST /github/webhook` and the DB.
+
+    The route only verifies the signature and enqueues the raw body; a single worker thread
+    parses deliveries and stores up to `batch_size` of them per `GithubService.ingest_batch`
+    call. A full queue is reported to the caller (503) instead of blocking the event loop, and a
+    recently seen X-GitHub-Delivery is dropped before it is queued or parsed.
+    A batch the DB rejects is retried up to `store_attempts` times; after that its delivery ids
+    are released so a redelivery is stored instead of being dropped as a duplicate.
+    Deliveries still queued when the process dies are lost; GitHub redelivers on failure.
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int = settings.github_webhook_queue_size,
+        batch_size: int = settings.github_webhook_batch_size,
+        store_attempts: int = 3,
+        retry_delay_seconds: float = 0.5,
+    ) -> None:
+        self.maxsize = max(1, maxsize)
+        self.batch_size = max(1, batch_size)
+        self.store_attempts = max(1, store_attempts)
+        self.retry_delay_seconds = retry_delay_seconds
+        self._queue: Queue[Any] = Queue(maxsize=self.maxsize)
+        self._worker: Optional[Thread] = None
+        self._worker_guard = Lock()
+        self._stats_lock = Lock()
+        self.enqueued = 0
+        self.rejected = 0
+        self.duplicates = 0
+        self.stored = 0
+        self.skipped = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+        self.last_batch_size = 0
+
+    def enqueue(self, event_type: str, body: bytes, delivery_id: Optional[str] = None) -> str:
+        """QUEUED, DUPLICATE, or FULL (the caller should ask GitHub to retry later)."""
+        if not github_service.claim_delivery(delivery_id):
+            with self._stats_lock:
+                self.duplicates += 1
+            return DUPLICATE
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((event_type, body, delivery_id))
+        except Full:
+            github_service.release_delivery(delivery_id)
+            with self._stats_lock:
+                self.rejected += 1
+            return FULL
+        with self._stats_lock:
+            self.enqueued += 1
+        return QUEUED
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self) -> None:
+        """Block until every delivery enqueued so far has been stored (or dropped as invalid)."""
+        self._queue.join()
+
+    def close(self) -> None:
+        with self._worker_guard:
+            worker, self._worker = self._worker, None
+        if worker is None:
+            return
+        self._queue.put(_STOP)
+        worker.join()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "depth": self.depth(),
+                "maxsize": self.maxsize,
+                "enqueued": self.enqueued,
+                "rejected": self.rejected,
+                "duplicates": self.duplicates,
+                "stored": self.stored,
+                "skipped": self.skipped,
+                "failed": self.failed,
+                "retries": self.retries,
+                "batches": self.batches,
+                "last_batch_size": self.last_batch_size,
+            }
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._worker_guard:
+            if self._worker is None:
+                self._worker = Thread(target=self._worker_loop, name="github-webhook-writer", daemon=True)
+                self._worker.start()
+
+    def _worker_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                self._store(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _store(self, batch: list[tuple[str, bytes, Optional[str]]]) -> None:
+        deliveries: list[tuple[str, dict, Optional[str]]] = []
+        failed = 0
+        for event_type, body, delivery_id in batch:
+            try:
+                deliveries.append((event_type, json.loads(body.decode("utf-8") or "{}"), delivery_id))
+            except ValueError:
+                failed += 1
+        stored = 0
+        for attempt in range(1, self.store_attempts + 1):
+            try:
+                # Safe to repeat: deliveries stored by a failed attempt are skipped by delivery_id.
+                stored = github_service.ingest_batch(deliveries) if deliveries else 0
+                break
+            except Exception:
+                if attempt < self.store_attempts:
+                    logger.warning("retrying %d github webhook deliveries (attempt %d)", len(deliveries), attempt, exc_info=True)
+                    with self._stats_lock:
+                        self.retries += 1
+                    sleep(self.retry_delay_seconds * attempt)
+                    continue
+                logger.exception("failed to store %d github webhook deliveries", len(deliveries))
+                for _, _, delivery_id in deliveries:
+                    github_service.release_delivery(delivery_id)
+                failed += len(deliveries)
+                deliveries = []
+        with self._stats_lock:
+            self.batches += 1
+            self.last_batch_size = len(batch)
+            self.stored += stored
+            # Already stored by another worker or before a restart (unique delivery_id).
+            self.skipped += len(deliveries) - stored
+            self.failed += failed
+
+
+github_webhook_queue = WebhookQueue()
@@ -1,114 +1,190 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Iterable, Optional
 
 import httpx
 
-from app.core.rbac import has_permission, normalize_role
+from app.core.auth import AuthContext, decode_access_token, encode_access_token
+from app.core.rbac import normalize_role, roles_with
+from app.core.settings import settings
 from app.db.database import db
+from app.services.membership_cache import membership_cache
 from app.services.oauth_service import oauth_service
 
 
 class WorkspaceService:
     supported_services = ["calendar", "tasks", "drive", "docs", "sheets", "slides", "meet"]
+    # Pairs per `(workspace_id, user_email) IN (VALUES ...)` query, well under SQLite's bound-parameter limit.
+    membership_batch_size = 400
 
     def upsert_user(self, email: str, display_name: str = "") -> None:
-        now = db.now_iso()
-        existing = db.fetchone("SELECT email FROM users WHERE email=?", (email,))
-        if existing:
+        with db.transaction():
+            now = db.now_iso()
+            existing = db.fetchone("SELECT email FROM users WHERE email=?", (email,))
+            if existing:
+                db.execute(
+                    "UPDATE users SET display_name=?, updated_at=? WHERE email=?",
+                    (display_name, now, email),
+                )
+                return
             db.execute(
-                "UPDATE users SET display_name=?, updated_at=? WHERE email=?",
-                (display_name, now, email),
+                "INSERT INTO users(email, display_name, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (email, display_name, now, now),
             )
-            return
-        db.execute(
-            "INSERT INTO users(email, display_name, created_at, updated_at) VALUES (?, ?, ?, ?)",
-            (email, display_name, now, now),
-        )
 
     def create_workspace(self, *, actor_email: str, name: str) -> dict:
-        self.upsert_user(actor_email)
-        now = db.now_iso()
-        db.execute(
-            "INSERT INTO workspaces(name, owner_email, created_at, updated_at) VALUES (?, ?, ?, ?)",
-            (name, actor_email, now, now),
-        )
-        ws = db.fetchone("SELECT * FROM workspaces ORDER BY id DESC LIMIT 1")
-        assert ws is not None
-        db.execute(
-            "INSERT OR REPLACE INTO workspace_members(workspace_id, user_email, role, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
-            (ws["id"], actor_email, "owner", now, now),
-        )
+        with db.transaction():
+            self.upsert_user(actor_email)
+            now = db.now_iso()
+            ws = db.insert_returning(
+                "INSERT INTO workspaces(name, owner_email, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (name, actor_email, now, now),
+            )
+            db.execute(
+                "INSERT OR REPLACE INTO workspace_members(workspace_id, user_email, role, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (ws["id"], actor_email, "owner", now, now),
+            )
+            membership_cache.changed(ws["id"])
+        # Drop a "not a member" another thread may have cached while the transaction was open.
+        membership_cache.invalidate(ws["id"])
         return ws
 
-    def list_workspaces(self, user_email: str) -> list[dict]:
+    def list_workspaces(self, user_email: str, *, permissions: Optional[Iterable[str]] = None) -> list[dict]:
+        """Workspaces the user belongs to; with `permissions`, only those where the user holds all of them."""
+        role_filter = ""
+        params: list = [user_email]
+        if permissions:
+            roles = roles_with(permissions)
+            if not roles:
+                return []
+            role_filter = f" AND m.role IN ({', '.join('?' for _ in roles)})"
+            params.extend(roles)
         return db.fetchall(
-            """
+            f"""
             SELECT w.*
             FROM workspaces w
             JOIN workspace_members m ON m.workspace_id=w.id
-            WHERE m.user_email=?
+            WHERE m.user_email=?{role_filter}
             ORDER BY w.id ASC
             """,
-            (user_email,),
+            tuple(params),
         )
 
-    def get_workspace(self, workspace_id: int, actor_email: str) -> Optional[dict]:
-        self.require_permission(workspace_id=workspace_id, actor_email=actor_email, permission="workspace.read")
-        return db.fetchone("SELECT * FROM workspaces WHERE id=?", (workspace_id,))
+    def get_workspace(self, auth: AuthContext) -> Optional[dict]:
+        auth.require("workspace.read")
+        return db.fetchone("SELECT * FROM workspaces WHERE id=?", (auth.workspace_id,))
 
     def membership(self, workspace_id: int, user_email: str) -> Optional[dict]:
+        return membership_cache.get(workspace_id, user_email, lambda: self._load_membership(workspace_id, user_email))
+
+    def _load_membership(self, workspace_id: int, user_email: str) -> Optional[dict]:
         return db.fetchone(
             "SELECT workspace_id, user_email, role, created_at, updated_at FROM workspace_members WHERE workspace_id=? AND user_email=?",
             (workspace_id, user_email),
         )
 
+    def _load_memberships(self, keys: list[tuple[int, str]]) -> dict[tuple[int, str], dict]:
+        loaded: dict[tuple[int, str], dict] = {}
+        for start in range(0, len(keys), self.membership_batch_size):
+            chunk = keys[start : start + self.membership_batch_size]
+            rows = db.fetchall(
+                f"""
+                SELECT workspace_id, user_email, role, created_at, updated_at
+                FROM workspace_members
+                WHERE (workspace_id, user_email) IN (VALUES {', '.join('(?, ?)' for _ in chunk)})
+                """,
+                tuple(value for key in chunk for value in key),
+            )
+            for row in rows:
+                loaded[(int(row["workspace_id"]), row["user_email"])] = row
+        return loaded
+
     def role_of(self, workspace_id: int, user_email: str) -> Optional[str]:
         membership = self.membership(workspace_id, user_email)
         if not membership:
             return None
         return membership["role"]
 
+    def auth_context(self, workspace_id: int, actor_email: str) -> AuthContext:
+        return AuthContext.for_role(
+            workspace_id=workspace_id,
+            actor_email=actor_email,
+            role=self.role_of(workspace_id, actor_email),
+        )
+
+    def auth_contexts(self, pairs: Iterable[tuple[int, str]]) -> dict[tuple[int, str], AuthContext]:
+        """Batch `auth_context()` for many (workspace_id, user_email) pairs with at most one query per chunk."""
+        memberships = membership_cache.get_many(pairs, self._load_memberships)
+        return {
+            key: AuthContext.for_role(workspace_id=key[0], actor_email=key[1], role=row["role"] if row else None)
+            for key, row in memberships.items()
+        }
+
+    def issue_access_token(self, auth: AuthContext) -> dict:
+        auth.require("workspace.read")
+        expires_in = settings.access_token_ttl_seconds
+        version = membership_cache.version(auth.workspace_id)
+        return {
+            "access_token": encode_access_token(auth, version=version, expires_in_sec=expires_in),
+            "token_type": "bearer",
+            "expires_in": expires_in,
+            "role": auth.role,
+        }
+
+    def auth_from_token(self, token: str, workspace_id: int) -> Optional[AuthContext]:
+        """AuthContext from an access token without a membership lookup; None if invalid, expired or revoked."""
+        payload = decode_access_token(token)
+        if not payload or int(payload.get("workspace_id", 0)) != int(workspace_id):
+            return None
+        # Any membership change in the workspace bumps its version and revokes older tokens.
+        if int(payload.get("ver", -1)) < membership_cache.version(workspace_id):
+            return None
+        return AuthContext.for_role(workspace_id=int(workspace_id), actor_email=payload["user_email"], role=payload["role"])
+
     def require_permission(self, *, workspace_id: int, actor_email: str, permission: str) -> str:
-        role = self.role_of(workspace_id, actor_email)
-        if not has_permission(role, permission):
-            raise ValueError(f"권한이 없습니다. permission={permission}, actor={actor_email}, role={role}")
-        return role
+        return self.auth_context(workspace_id, actor_email).require(permission).role
 
     def add_member(self, *, workspace_id: int, actor_email: str, target_email: str, role: str) -> dict:
         self.require_permission(workspace_id=workspace_id, actor_email=actor_email, permission="workspace.manage_members")
         target_role = normalize_role(role)
-        self.upsert_user(target_email)
-
-        now = db.now_iso()
-        existing = self.membership(workspace_id, target_email)
-        if existing:
-            db.execute(
-                "UPDATE workspace_members SET role=?, updated_at=? WHERE workspace_id=? AND user_email=?",
-                (target_role, now, workspace_id, target_email),
-            )
-        else:
-            db.execute(
-                "INSERT INTO workspace_members(workspace_id, user_email, role, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
-                (workspace_id, target_email, target_role, now, now),
-            )
+        with db.transaction():
+            self.upsert_user(target_email)
+
+            now = db.now_iso()
+            existing = self.membership(workspace_id, target_email)
+            if existing:
+                db.execute(
+                    "UPDATE workspace_members SET role=?, updated_at=? WHERE workspace_id=? AND user_email=?",
+                    (target_role, now, workspace_id, target_email),
+                )
+            else:
+                db.execute(
+                    "INSERT INTO workspace_members(workspace_id, user_email, role, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (workspace_id, target_email, target_role, now, now),
+                )
+            membership_cache.changed(workspace_id)
 
-        row = self.membership(workspace_id, target_email)
-        assert row is not None
+            row = self.membership(workspace_id, target_email)
+            assert row is not None
+        # Drop anything another thread cached from the pre-commit state.
+        membership_cache.invalidate(workspace_id)
         return row
 
     def update_member_role(self, *, workspace_id: int, actor_email: str, target_email: str, role: str) -> Optional[dict]:
         self.require_permission(workspace_id=workspace_id, actor_email=actor_email, permission="workspace.manage_members")
         target_role = normalize_role(role)
-        existing = self.membership(workspace_id, target_email)
-        if not existing:
-            return None
+        with db.transaction():
+            existing = self.membership(workspace_id, target_email)
+            if not existing:
+                return None
 
-        now = db.now_iso()
-        db.execute(
-            "UPDATE workspace_members SET role=?, updated_at=? WHERE workspace_id=? AND user_email=?",
-            (target_role, now, workspace_id, target_email),
-        )
+            now = db.now_iso()
+            db.execute(
+                "UPDATE workspace_members SET role=?, updated_at=? WHERE workspace_id=? AND user_email=?",
+                (target_role, now, workspace_id, target_email),
+            )
+            membership_cache.changed(workspace_id)
+        membership_cache.invalidate(workspace_id)
         return self.membership(workspace_id, target_email)
 
     def remove_member(self, *, workspace_id: int, actor_email: str, target_email: str) -> bool:
@@ -119,38 +195,33 @@ class WorkspaceService:
         if ws["owner_email"] == target_email:
             raise ValueError("owner는 삭제할 수 없습니다.")
 
-        existing = self.membership(workspace_id, target_email)
-        if not existing:
-            return False
+        with db.transaction():
+            existing = self.membership(workspace_id, target_email)
+            if not existing:
+                return False
 
-        db.execute(
-            "DELETE FROM workspace_members WHERE workspace_id=? AND user_email=?",
-            (workspace_id, target_email),
-        )
+            db.execute(
+                "DELETE FROM workspace_members WHERE workspace_id=? AND user_email=?",
+                (workspace_id, target_email),
+            )
+            membership_cache.changed(workspace_id)
+        membership_cache.invalidate(workspace_id)
         return True
 
-    def list_members(self, *, workspace_id: int, actor_email: str) -> list[dict]:
-        self.require_permission(workspace_id=workspace_id, actor_email=actor_email, permission="workspace.read")
+    def list_members(self, auth: AuthContext) -> list[dict]:
+        auth.require("workspace.read")
         return db.fetchall(
             "SELECT workspace_id, user_email, role, created_at, updated_at FROM workspace_members WHERE workspace_id=? ORDER BY created_at ASC",
-            (workspace_id,),
+            (auth.workspace_id,),
         )
 
     def permissions_me(self, *, workspace_id: int, user_email: str) -> dict:
-        role = self.role_of(workspace_id, user_email)
+        auth = self.auth_context(workspace_id, user_email)
         return {
             "workspace_id": workspace_id,
             "user_email": user_email,
-            "role": role,
-            "permissions": {
-                "workspace.read": has_permission(role, "workspace.read"),
-                "workspace.manage_members": has_permission(role, "workspace.manage_members"),
-                "workspace.execute": has_permission(role, "workspace.execute"),
-                "agent.execute": has_permission(role, "agent.execute"),
-                "approval.decide": has_permission(role, "approval.decide"),
-                "invoice.issue": has_permission(role, "invoice.issue"),
-                "invoice.create": has_permission(role, "invoice.create"),
-            },
+            "role": auth.role,
+            "permissions": auth.permission_map(),
         }
 
     def _execute_simulated(self, *, workspace_id: int, actor_email: str, user_email: str, service: str, action: str, payload: dict, token_type: str) -> dict:
@@ -267,17 +338,18 @@ class WorkspaceService:
     def execute(
         self,
         *,
-        workspace_id: int,
-        actor_email: str,
+        auth: AuthContext,
         user_email: Optional[str],
         service: str,
         action: str,
         payload: dict,
     ) -> dict:
-        self.require_permission(workspace_id=workspace_id, actor_email=actor_email, permission="workspace.execute")
+        auth.require("workspace.execute")
+        workspace_id = auth.workspace_id
+        actor_email = auth.actor_email
 
         resolved_user_email = user_email or actor_email
-        if not self.membership(workspace_id, resolved_user_email):
+        if resolved_user_email != actor_email and not self.membership(workspace_id, resolved_user_email):
             raise ValueError("지정된 user_email이 workspace 멤버가 아닙니다.")
 
         token_info = oauth_service.ensure_valid_access_token(resolved_user_email)
@@ -7,14 +7,17 @@ os.environ.setdefault("ALLOW_MOCK_AUTH", "true")
 os.environ.setdefault("GITHUB_APP_SLUG", "gws-deepagent")
 os.environ.setdefault("APP_SECRET", "test-secret")
 os.environ.setdefault("DB_PATH", "apps/api/data/test.db")
+os.environ.setdefault("DB_STATS_ADMIN_TOKEN", "test-admin-token")
 
 from app.db.database import db  # noqa: E402
 from app.main import app  # noqa: E402
+from app.services.github_integration_service import github_integration_service  # noqa: E402
 
 
 @pytest.fixture(autouse=True)
 def cleanup_db() -> None:
     db.clear_all()
+    github_integration_service.load_installations()
 
 
 @pytest.fixture()
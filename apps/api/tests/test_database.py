@@ -0,0 +1,301 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.db.async_database import AsyncAppDatabase
+from app.db.compression import CODEC_ZLIB_DICT_V1, decode_json, encode_json
+from app.db.database import AppDatabase
+from app.db.instrumentation import QueryStats
+from app.db.migrations import MIGRATIONS
+
+
+def test_pooled_connections_use_wal_and_are_reused(tmp_path) -> None:
+    database = AppDatabase(str(tmp_path / "pool.db"), pool_size=2)
+
+    mode = database.fetchone("PRAGMA journal_mode")
+    assert mode is not None and mode["journal_mode"] == "wal"
+
+    def insert(i: int) -> None:
+        database.execute(
+            "INSERT INTO users(email, display_name, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (f"user{i}@example.com", "", database.now_iso(), database.now_iso()),
+        )
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(insert, range(50)))
+
+    row = database.fetchone("SELECT COUNT(*) AS n FROM users")
+    assert row is not None and row["n"] == 50
+    assert database._opened <= 2
+    database.close()
+
+
+def test_write_queue_group_commit_isolates_failures(tmp_path) -> None:
+    database = AppDatabase(str(tmp_path / "queue.db"), write_mode="queue", write_batch_size=16)
+    now = database.now_iso()
+    insert = "INSERT INTO users(email, display_name, created_at, updated_at) VALUES (?, ?, ?, ?)"
+
+    futures = [database.submit(insert, (f"user{i}@example.com", "", now, now)) for i in range(20)]
+    duplicate = database.submit(insert, ("user0@example.com", "", now, now))
+
+    assert all(future.result() == 1 for future in futures)
+    try:
+        duplicate.result()
+    except Exception as exc:
+        assert "UNIQUE" in str(exc)
+    else:
+        raise AssertionError("duplicate insert should fail")
+
+    row = database.fetchone("SELECT COUNT(*) AS n FROM users")
+    assert row is not None and row["n"] == 20
+    database.close()
+
+
+def test_write_queue_fails_writes_when_writer_dies(tmp_path) -> None:
+    class BrokenWriter(AppDatabase):
+        def _open(self, *, readonly: bool = False, autocommit: bool = False):
+            if threading.current_thread().name.startswith("db-writer"):
+                raise sqlite3.OperationalError("unable to open database file")
+            return super()._open(readonly=readonly, autocommit=autocommit)
+
+    database = BrokenWriter(str(tmp_path / "broken.db"), write_mode="queue", write_queue_size=4)
+    database._writer.join(timeout=5)
+    now = database.now_iso()
+    try:
+        database.execute("INSERT INTO users(email, display_name, created_at, updated_at) VALUES (?, ?, ?, ?)", ("a@example.com", "", now, now))
+    except RuntimeError as exc:
+        assert isinstance(exc.__cause__, sqlite3.OperationalError)
+    else:
+        raise AssertionError("write should fail once the writer is gone")
+    database.close()
+
+
+def test_async_facade_reads_and_writes(tmp_path) -> None:
+    database = AppDatabase(str(tmp_path / "async.db"), write_mode="queue")
+    facade = AsyncAppDatabase(database, max_workers=2)
+    now = database.now_iso()
+
+    async def scenario() -> list[dict]:
+        await asyncio.gather(
+            *[
+                facade.execute(
+                    "INSERT INTO users(email, display_name, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                    (f"user{i}@example.com", "", now, now),
+                )
+                for i in range(10)
+            ]
+        )
+        return await facade.fetchall("SELECT email FROM users ORDER BY email")
+
+    rows = asyncio.run(scenario())
+    assert len(rows) == 10
+    facade.close()
+    database.close()
+
+
+def test_async_facade_keeps_the_loop_responsive_when_the_write_queue_is_full(tmp_path) -> None:
+    database = AppDatabase(str(tmp_path / "full.db"), write_mode="queue", write_queue_size=1)
+    facade = AsyncAppDatabase(database, max_workers=2)
+    now = database.now_iso()
+    insert = "INSERT INTO users(email, display_name, created_at, updated_at) VALUES (?, ?, ?, ?)"
+
+    # Stall the writer on its first batch, then fill the one-slot queue.
+    database._lock.acquire()
+    first = database.submit(insert, ("user0@example.com", "", now, now))
+    deadline = time.monotonic() + 5
+    while not database._write_queue.empty() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    queued = database.submit(insert, ("user1@example.com", "", now, now))
+
+    async def scenario() -> None:
+        pending = asyncio.create_task(facade.execute(insert, ("user2@example.com", "", now, now)))
+        started = time.monotonic()
+        await asyncio.sleep(0.05)
+        assert time.monotonic() - started < 1
+        assert not pending.done()
+        database._lock.release()
+        await asyncio.wait_for(pending, timeout=5)
+
+    asyncio.run(scenario())
+    assert first.result() == queued.result() == 1
+    assert database.fetchone("SELECT COUNT(*) AS n FROM users")["n"] == 3
+    facade.close()
+    database.close()
+
+
+def test_insert_returning_returns_own_row_under_concurrency(tmp_path) -> None:
+    database = AppDatabase(str(tmp_path / "returning.db"))
+    now = database.now_iso()
+
+    def create(i: int) -> tuple[int, dict]:
+        row = database.insert_returning(
+            "INSERT INTO workspaces(name, owner_email, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (f"ws-{i}", f"owner{i}@example.com", now, now),
+        )
+        return i, row
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(create, range(40)))
+
+    assert all(row["name"] == f"ws-{i}" for i, row in results)
+    assert len({row["id"] for _, row in results}) == 40
+    database.close()
+
+
+def test_transaction_is_atomic_and_nests_as_savepoints(tmp_path) -> None:
+    database = AppDatabase(str(tmp_path / "uow.db"), write_mode="queue")
+    now = database.now_iso()
+    insert = "INSERT INTO users(email, display_name, created_at, updated_at) VALUES (?, ?, ?, ?)"
+
+    with database.transaction():
+        database.execute(insert, ("outer@example.com", "", now, now))
+        assert database.fetchone("SELECT email FROM users WHERE email=?", ("outer@example.com",)) is not None
+        try:
+            with database.transaction():
+                database.execute(insert, ("inner@example.com", "", now, now))
+                raise RuntimeError("rollback inner")
+        except RuntimeError:
+            pass
+
+    emails = [row["email"] for row in database.fetchall("SELECT email FROM users")]
+    assert emails == ["outer@example.com"]
+
+    try:
+        with database.transaction():
+            database.execute(insert, ("lost@example.com", "", now, now))
+            database.execute(insert, ("outer@example.com", "", now, now))
+    except Exception:
+        pass
+    assert database.fetchone("SELECT email FROM users WHERE email=?", ("lost@example.com",)) is None
+    database.close()
+
+
+def test_migrations_apply_once_and_index_hot_paths(tmp_path) -> None:
+    path = str(tmp_path / "migrate.db")
+    database = AppDatabase(path)
+    versions = database.fetchall("SELECT version FROM schema_version ORDER BY version")
+    assert [row["version"] for row in versions] == [m.version for m in MIGRATIONS]
+    database.close()
+
+    reopened = AppDatabase(path)
+    assert len(reopened.fetchall("SELECT version FROM schema_version")) == len(MIGRATIONS)
+
+    plan = reopened.fetchall(
+        "EXPLAIN QUERY PLAN SELECT * FROM approvals WHERE workspace_id=? AND status=? ORDER BY requested_ts DESC, id DESC LIMIT 10",
+        (1, "pending"),
+    )
+    assert any("idx_approvals_workspace_status_ts" in row["detail"] for row in plan)
+    indexes = {row["name"] for row in reopened.fetchall("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='github_events'")}
+    assert "idx_github_events_workspace_id" in indexes and "idx_github_events_workspace_id_id" not in indexes
+    reopened.close()
+
+
+def test_epoch_timestamps_are_backfilled_and_range_scanned(tmp_path) -> None:
+    path = str(tmp_path / "epoch.db")
+    legacy = sqlite3.connect(path)
+    legacy.executescript(
+        """
+        CREATE TABLE github_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            workspace_id INTEGER,
+            event_type TEXT NOT NULL,
+            repo TEXT,
+            actor TEXT,
+            payload_json TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        INSERT INTO github_events(workspace_id, event_type, payload_json, created_at)
+        VALUES (1, 'push', '{}', '2026-02-26T10:11:12.123000+00:00'),
+               (1, 'push', '{}', '2030-12-30T04:27:32.115500+00:00');
+        """
+    )
+    legacy.close()
+
+    database = AppDatabase(path)
+    rows = database.fetchall("SELECT created_at, created_ts FROM github_events ORDER BY id")
+    # Backfilled (SQL) and Python-computed values agree, including on half-millisecond inputs.
+    assert [row["created_ts"] for row in rows] == [AppDatabase.epoch_ms(row["created_at"]) for row in rows]
+    row = rows[0]
+    assert row["created_ts"] == 1772100672123
+
+    plan = database.fetchall(
+        "EXPLAIN QUERY PLAN SELECT id FROM github_events WHERE workspace_id=? AND created_ts BETWEEN ? AND ? ORDER BY created_ts",
+        (1, 0, row["created_ts"]),
+    )
+    assert any("idx_github_events_created_ts" in plan_row["detail"] for plan_row in plan)
+    assert not any("TEMP B-TREE" in plan_row["detail"] for plan_row in plan)
+    database.close()
+
+
+def test_slow_query_log_captures_query_plan(tmp_path) -> None:
+    stats = QueryStats(enabled=True, slow_query_ms=0.000001)
+    database = AppDatabase(str(tmp_path / "stats.db"), stats=stats)
+
+    database.fetchall("SELECT * FROM github_events WHERE workspace_id=? ORDER BY created_ts DESC LIMIT 5", (1,))
+
+    top = stats.top(limit=1)
+    assert top[0]["count"] == 1
+    slow = stats.slow_queries()
+    assert slow and any("idx_github_events_created_ts" in line for line in slow[-1]["plan"])
+    database.close()
+
+
+def test_workspace_shards_are_isolated_and_lru_evicted(tmp_path) -> None:
+    catalog = AppDatabase(str(tmp_path / "catalog.db"), shard_dir=str(tmp_path / "shards"), shard_max_open=2)
+    now = catalog.now_iso()
+
+    for workspace_id in (1, 2, 3):
+        catalog.for_workspace(workspace_id).insert_returning(
+            "INSERT INTO docs(workspace_id, space, title, content, tags_json, created_by, created_at, updated_at, updated_ts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (workspace_id, "general", f"doc-{workspace_id}", "", "[]", "owner@example.com", now, now, catalog.epoch_ms(now)),
+        )
+
+    assert catalog.shards is not None
+    assert catalog.shards.open_workspace_ids() == [2, 3]
+    assert catalog.fetchone("SELECT COUNT(*) AS n FROM docs")["n"] == 0
+
+    # A shard evicted while a connection is checked out closes that connection on release.
+    shard = catalog.for_workspace(2)
+    with shard._connect() as conn:
+        catalog.for_workspace(1)
+        catalog.for_workspace(3)
+        assert 2 not in catalog.shards.open_workspace_ids()
+        assert conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0] == 1
+    assert shard._opened == 0 and shard._pool.empty()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+    reopened = catalog.for_workspace(1).fetchall("SELECT title FROM docs")
+    assert [row["title"] for row in reopened] == ["doc-1"]
+    assert catalog.for_workspace(None) is catalog
+    catalog.close()
+
+
+def test_large_event_payloads_are_compressed_and_legacy_rows_stay_readable(tmp_path) -> None:
+    database = AppDatabase(str(tmp_path / "payload.db"))
+    payload = {
+        "ref": "refs/heads/main",
+        "repository": {"full_name": "org/repo", "html_url": "https://github.com/org/repo", "private": True},
+        "commits": [{"id": f"{i:040d}", "message": f"fix {i}", "modified": ["src/app.py"]} for i in range(20)],
+    }
+    packed = encode_json(payload, min_bytes=512)
+    assert isinstance(packed, bytes) and packed[0] == CODEC_ZLIB_DICT_V1
+    assert len(packed) * 3 < len(json.dumps(payload))
+    assert isinstance(encode_json({"small": True}, min_bytes=512), str)
+
+    now = database.now_iso()
+    insert = "INSERT INTO github_events(workspace_id, event_type, payload_json, created_at, created_ts) VALUES (1, 'push', ?, ?, ?)"
+    database.execute(insert, (packed, now, database.epoch_ms(now)))
+    database.execute(insert, (json.dumps(payload), now, database.epoch_ms(now)))
+
+    rows = database.fetchall("SELECT typeof(payload_json) AS kind, payload_json FROM github_events ORDER BY id")
+    assert [row["kind"] for row in rows] == ["blob", "text"]
+    assert all(decode_json(row["payload_json"]) == payload for row in rows)
+    with pytest.raises(ValueError):
+        decode_json(b"\x7f" + packed[1:])
+    database.close()
@@ -1,3 +1,22 @@
+import asyncio
+import gzip
+import json
+import sqlite3
+import threading
+import time
+from urllib.parse import urlencode
+
+import pytest
+
+from app.core.settings import settings
+from app.db.database import db
+from app.main import app
+from app.services.event_broker import EventBroker
+from app.services.github_import_service import github_import_service
+from app.services.github_integration_service import github_integration_service
+from app.services.github_service import github_event_broker, github_service
+from app.services.webhook_queue import WebhookQueue, github_webhook_queue
+
 from conftest import create_workspace
 
 
@@ -37,8 +56,8 @@ def test_github_app_install_link_and_webhook(client) -> None:
             "sender": {"login": "baem1n"},
         },
     )
-    assert webhook.status_code == 200
-    assert webhook.json()["workspace_id"] == workspace_id
+    assert webhook.status_code == 202
+    github_webhook_queue.flush()
 
     events = client.get(
         "/github/events",
@@ -46,3 +65,364 @@ def test_github_app_install_link_and_webhook(client) -> None:
     )
     assert events.status_code == 200
     assert len(events.json()["events"]) == 1
+    assert events.json()["events"][0]["workspace_id"] == workspace_id
+
+
+def test_event_list_projects_requested_fields(client) -> None:
+    workspace_id = create_workspace(client)
+    params, _ = github_service._event_record("push", {"repository": {"full_name": "org/repo"}, "sender": {"login": "dev"}}, workspace_id)
+    db.for_workspace(workspace_id).execute(github_service._INSERT_EVENT, params)
+
+    projected = client.get(
+        "/github/events",
+        params={"workspace_id": workspace_id, "actor_email": "owner@example.com", "fields": "id,repo"},
+    )
+    assert projected.status_code == 200
+    assert [sorted(event) for event in projected.json()["events"]] == [["id", "repo"]]
+
+    invalid = client.get(
+        "/github/events",
+        params={"workspace_id": workspace_id, "actor_email": "owner@example.com", "fields": "id,secret"},
+    )
+    assert invalid.status_code == 400
+
+    events = github_service.list_events(workspace_id=workspace_id).items
+    assert events[0].pending_fields() == ["payload"]
+    assert events[0]["payload"]["sender"]["login"] == "dev"
+    assert events[0].pending_fields() == []
+
+
+def test_event_list_pages_with_keyset_cursor(client) -> None:
+    workspace_id = create_workspace(client)
+    for index in range(5):
+        params, _ = github_service._event_record("push", {"repository": {"full_name": f"org/repo-{index}"}}, workspace_id)
+        db.for_workspace(workspace_id).execute(github_service._INSERT_EVENT, params)
+
+    seen: list[int] = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"workspace_id": workspace_id, "actor_email": "owner@example.com", "limit": 2, "fields": "id"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/github/events", params=params)
+        assert response.status_code == 200
+        body = response.json()
+        seen.extend(event["id"] for event in body["events"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert seen == sorted(seen, reverse=True) and len(set(seen)) == 5
+
+    invalid = client.get(
+        "/github/events",
+        params={"workspace_id": workspace_id, "actor_email": "owner@example.com", "cursor": "not-a-cursor"},
+    )
+    assert invalid.status_code == 400
+
+
+def test_webhook_queue_batches_inserts_and_applies_backpressure(client, monkeypatch) -> None:
+    queue = WebhookQueue(maxsize=3, batch_size=10)
+    monkeypatch.setattr("app.api.routes.github.github_webhook_queue", queue)
+    # Hold the worker on the first batch so later deliveries stay queued.
+    gate = threading.Event()
+    ingest_batch = github_service.ingest_batch
+    monkeypatch.setattr(github_service, "ingest_batch", lambda deliveries: gate.wait() and ingest_batch(deliveries))
+
+    statuses = []
+    for index in range(6):
+        response = client.post(
+            "/github/webhook",
+            headers={"x-github-event": "push"},
+            json={"repository": {"full_name": f"org/repo-{index}"}},
+        )
+        statuses.append(response.status_code)
+        if response.status_code == 503:
+            assert response.headers["retry-after"]
+    assert statuses.count(202) >= 3 and statuses[-1] == 503
+
+    gate.set()
+    queue.flush()
+    assert client.get("/github/webhook/queue").status_code == 401
+    assert client.get("/github/webhook/queue", headers={"x-admin-token": "wrong"}).status_code == 401
+    stats = client.get("/github/webhook/queue", headers={"x-admin-token": "test-admin-token"}).json()
+    assert stats["stored"] == statuses.count(202)
+    assert stats["rejected"] == statuses.count(503)
+    assert stats["depth"] == 0
+    assert len(github_service.list_events(limit=10).items) == statuses.count(202)
+    queue.close()
+
+
+def test_webhook_queue_retries_and_releases_failed_deliveries(client, monkeypatch) -> None:
+    queue = WebhookQueue(maxsize=10, batch_size=10, store_attempts=2, retry_delay_seconds=0)
+    monkeypatch.setattr("app.api.routes.github.github_webhook_queue", queue)
+    ingest_batch = github_service.ingest_batch
+    calls = []
+
+    def flaky(deliveries):
+        calls.append(len(deliveries))
+        if len(calls) != 2:
+            raise sqlite3.OperationalError("database is locked")
+        return ingest_batch(deliveries)
+
+    monkeypatch.setattr(github_service, "ingest_batch", flaky)
+
+    def deliver(delivery_id: str):
+        response = client.post(
+            "/github/webhook",
+            headers={"x-github-event": "push", "x-github-delivery": delivery_id},
+            json={"repository": {"full_name": "org/repo"}},
+        )
+        queue.flush()
+        return response
+
+    # First attempt fails, the retry stores it.
+    assert deliver("retry-1").status_code == 202
+    assert len(github_service.list_events(limit=10).items) == 1
+
+    # Both attempts fail: the delivery id is released, so GitHub's redelivery is accepted and stored.
+    assert deliver("retry-2").status_code == 202
+    assert queue.stats()["failed"] == 1
+    monkeypatch.setattr(github_service, "ingest_batch", ingest_batch)
+    assert deliver("retry-2").json()["queued"] is True
+    assert len(github_service.list_events(limit=10).items) == 2
+    assert queue.stats()["retries"] == 2
+    queue.close()
+
+
+def test_webhook_redeliveries_are_deduplicated(client) -> None:
+    def deliver(delivery_id: str):
+        return client.post(
+            "/github/webhook",
+            headers={"x-github-event": "push", "x-github-delivery": delivery_id},
+            json={"repository": {"full_name": "org/repo"}},
+        )
+
+    assert deliver("dedupe-1").json()["queued"] is True
+    assert deliver("dedupe-1").json()["duplicate"] is True
+    assert deliver("dedupe-2").json()["queued"] is True
+    github_webhook_queue.flush()
+    assert len(github_service.list_events(limit=10).items) == 2
+
+    # A redelivery this process no longer remembers is still stopped by the unique index.
+    github_service.recent_deliveries.clear()
+    assert github_service.ingest_batch([("push", {"repository": {"full_name": "org/repo"}}, "dedupe-1")]) == 0
+    assert deliver("dedupe-2").status_code == 202
+    github_webhook_queue.flush()
+    assert len(github_service.list_events(limit=10).items) == 2
+
+
+def test_installation_workspace_map_tracks_callback_and_uninstall(client, monkeypatch) -> None:
+    workspace_id = create_workspace(client)
+    assert github_integration_service.resolve_workspace_from_installation(777) is None
+    # Negative entry: a row written behind the service's back is not seen until it expires.
+    db.execute(
+        "INSERT INTO github_installations(workspace_id, installation_id, account_login, created_at, updated_at) VALUES (?, ?, '', ?, ?)",
+        (workspace_id, 777, db.now_iso(), db.now_iso()),
+    )
+    assert github_integration_service.resolve_workspace_from_installation(777) is None
+
+    state = client.post(
+        "/github/app/install-url",
+        json={"workspace_id": workspace_id, "actor_email": "owner@example.com"},
+    ).json()["state"]
+    assert client.post("/github/app/callback", json={"state": state, "installation_id": 777, "account_login": "org"}).status_code == 200
+    assert github_integration_service.resolve_workspace_from_installation(777) == workspace_id
+
+    uninstall = github_service.ingest_event("installation", {"action": "deleted", "installation": {"id": 777}})
+    assert uninstall["workspace_id"] == workspace_id
+    assert github_integration_service.resolve_workspace_from_installation(777) is None
+    # The link row stays but is marked, so the mapping stays gone once the negative entry expires
+    # and after a reload (restart, other workers).
+    rows = db.fetchall("SELECT uninstalled_at FROM github_installations WHERE installation_id=777")
+    assert len(rows) == 1 and rows[0]["uninstalled_at"]
+    expired = time.monotonic() + settings.github_installation_negative_ttl_seconds + 1
+    monkeypatch.setattr(github_integration_service._unknown_installations, "_clock", lambda: expired)
+    assert github_integration_service.resolve_workspace_from_installation(777) is None
+    github_integration_service.load_installations()
+    assert github_integration_service.resolve_workspace_from_installation(777) is None
+
+    # Installing again clears the mark.
+    state = client.post(
+        "/github/app/install-url",
+        json={"workspace_id": workspace_id, "actor_email": "owner@example.com"},
+    ).json()["state"]
+    assert client.post("/github/app/callback", json={"state": state, "installation_id": 777, "account_login": "org"}).status_code == 200
+    github_integration_service.load_installations()
+    assert github_integration_service.resolve_workspace_from_installation(777) == workspace_id
+
+    # Positive entries expire too, so a link changed by another worker is eventually seen.
+    other_id = create_workspace(client, owner_email="other@example.com")
+    db.execute("UPDATE github_installations SET workspace_id=? WHERE installation_id=777", (other_id,))
+    assert github_integration_service.resolve_workspace_from_installation(777) == workspace_id
+    expired = time.monotonic() + settings.github_installation_cache_ttl_seconds + 1
+    monkeypatch.setattr(github_integration_service._installations, "_clock", lambda: expired)
+    assert github_integration_service.resolve_workspace_from_installation(777) == other_id
+
+
+def test_typed_event_columns_are_extracted_and_filterable(client) -> None:
+    workspace_id = create_workspace(client)
+    target = db.for_workspace(workspace_id)
+    deliveries = [
+        ("push", {"ref": "refs/heads/main", "commits": [{"id": "a"}, {"id": "b"}], "repository": {"full_name": "org/repo"}}),
+        ("push", {"ref": "refs/heads/feature", "commits": [{"id": "c"}], "repository": {"full_name": "org/repo"}}),
+        (
+            "pull_request",
+            {
+                "action": "closed",
+                "number": 7,
+                "pull_request": {"merged": True, "commits": 3, "base": {"ref": "main"}},
+                "repository": {"full_name": "org/repo"},
+            },
+        ),
+    ]
+    for event_type, payload in deliveries:
+        params, _ = github_service._event_record(event_type, payload, workspace_id)
+        target.execute(github_service._INSERT_EVENT, params)
+
+    params = {"workspace_id": workspace_id, "actor_email": "owner@example.com"}
+    pushes = client.get("/github/events", params={**params, "branch": "main", "event_type": "push"}).json()["events"]
+    assert [(event["branch"], event["commit_count"]) for event in pushes] == [("main", 2)]
+    assert pushes[0]["pr_number"] is None
+
+    merged = client.get("/github/events", params={**params, "pr_number": 7}).json()["events"]
+    assert [(event["action"], event["merged"], event["branch"]) for event in merged] == [("closed", 1, "main")]
+
+    events = github_service.list_events(workspace_id=workspace_id, fields=["event_type", "branch"]).items
+    assert all(event.pending_fields() == [] for event in events)
+
+
+def test_bulk_import_streams_gzip_ndjson_and_dedupes(client) -> None:
+    workspace_id = create_workspace(client)
+    other_id = create_workspace(client, owner_email="other@example.com")
+    db.execute(
+        "INSERT INTO github_installations(workspace_id, installation_id, account_login, created_at, updated_at) VALUES (?, 99, '', ?, ?)",
+        (other_id, db.now_iso(), db.now_iso()),
+    )
+    github_integration_service.load_installations()
+
+    lines = [
+        json.dumps({"delivery_id": f"bulk-{index}", "event": "push", "payload": {"ref": "refs/heads/main", "commits": []}})
+        for index in range(5)
+    ]
+    lines.append(lines[0])
+    lines.append("not json")
+    lines.append(json.dumps({"delivery_id": "bulk-other", "event": "push", "payload": {"installation": {"id": 99}}}))
+    archive = gzip.compress(("\n".join(lines) + "\n").encode("utf-8"))
+
+    imported = client.post(
+        "/github/events/import",
+        params={"workspace_id": workspace_id, "actor_email": "owner@example.com"},
+        content=archive,
+    )
+    assert imported.status_code == 200
+    summary = imported.json()
+    assert (summary["lines"], summary["stored"], summary["duplicates"], summary["invalid"], summary["rejected"]) == (8, 5, 1, 1, 1)
+    assert len(github_service.list_events(workspace_id=workspace_id).items) == 5
+
+    # Replaying the same archive stores nothing, even once the in-memory filter has forgotten it.
+    github_service.recent_deliveries.clear()
+    replay = github_import_service.import_chunks([archive[:7], archive[7:]], workspace_id=workspace_id)
+    assert replay["stored"] == 0 and replay["duplicates"] == 6
+
+
+
+def test_bulk_import_releases_deliveries_when_the_store_fails(client, monkeypatch) -> None:
+    workspace_id = create_workspace(client)
+    lines = [
+        json.dumps({"delivery_id": f"import-retry-{index}", "event": "push", "payload": {"commits": []}})
+        for index in range(3)
+    ]
+    chunks = [("\n".join(lines) + "\n").encode("utf-8")]
+    store_events = github_service.store_events
+
+    def failing(events):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(github_service, "store_events", failing)
+    with pytest.raises(sqlite3.OperationalError):
+        github_import_service.import_chunks(chunks, workspace_id=workspace_id)
+
+    # The failed batch left no claims behind, so importing the same lines again stores them.
+    monkeypatch.setattr(github_service, "store_events", store_events)
+    retried = github_import_service.import_chunks(chunks, workspace_id=workspace_id)
+    assert (retried["stored"], retried["duplicates"]) == (3, 0)
+    assert len(github_service.list_events(workspace_id=workspace_id).items) == 3
+
+def test_event_broker_fetches_without_blocking_subscribers() -> None:
+    fetching, release = threading.Event(), threading.Event()
+
+    def fetch_after(workspace_id: int, after_id: int, limit: int) -> list[dict]:
+        fetching.set()
+        release.wait(timeout=5)
+        return [{"id": after_id + 1}]
+
+    async def scenario() -> None:
+        broker = EventBroker(fetch_after=fetch_after, queue_size=10)
+        subscription = broker.subscribe(1, 0)
+        writer = threading.Thread(target=broker.notify, args=([1],))
+        writer.start()
+        await asyncio.to_thread(fetching.wait)
+        # The writer is inside fetch_after; the event loop can still (un)subscribe immediately.
+        started = time.monotonic()
+        broker.unsubscribe(broker.subscribe(1, 0))
+        assert time.monotonic() - started < 1
+        release.set()
+        await asyncio.to_thread(writer.join)
+        assert (await asyncio.wait_for(subscription.queue.get(), timeout=1))["id"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_event_stream_resumes_from_last_event_id_and_receives_new_events(client, monkeypatch) -> None:
+    workspace_id = create_workspace(client)
+    target = db.for_workspace(workspace_id)
+    for index in range(3):
+        params, _ = github_service._event_record("push", {"ref": f"refs/heads/b{index}"}, workspace_id)
+        target.execute(github_service._INSERT_EVENT, params)
+    ids = [event["id"] for event in github_service.events_after(workspace_id, 0)]
+    monkeypatch.setattr(settings, "event_stream_heartbeat_seconds", 0.05)
+
+    def store_live_event() -> None:
+        while github_event_broker.subscriber_count(workspace_id) == 0:
+            time.sleep(0.01)
+        github_service.store_events([(workspace_id, "push", {"ref": "refs/heads/live"}, None, None)])
+
+    threading.Thread(target=store_live_event, daemon=True).start()
+    # TestClient buffers whole responses, so drive the ASGI app directly and disconnect after 3 events.
+    received: list[dict] = []
+    done = asyncio.Event()
+
+    async def receive() -> dict:
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        for line in message.get("body", b"").decode("utf-8").splitlines():
+            if line.startswith("data: "):
+                received.append(json.loads(line[len("data: ") :]))
+        if len(received) >= 3:
+            done.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/github/events/stream",
+        "raw_path": b"/github/events/stream",
+        "root_path": "",
+        "query_string": urlencode({"workspace_id": workspace_id, "actor_email": "owner@example.com"}).encode(),
+        "headers": [(b"last-event-id", str(ids[0]).encode())],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    asyncio.run(asyncio.wait_for(app(scope, receive, send), timeout=10))
+
+    assert [event["id"] for event in received[:2]] == ids[1:]
+    assert received[2]["branch"] == "live" and "payload" not in received[2]
+    assert github_event_broker.subscriber_count(workspace_id) == 0
@@ -3,3 +3,19 @@ def test_health_check(client) -> None:
 
     assert response.status_code == 200
     assert response.json() == {"ok": True}
+
+
+def test_db_stats_track_request_queries(client) -> None:
+    admin = {"x-admin-token": "test-admin-token"}
+    assert client.get("/platform/db/stats").status_code == 401
+    assert client.delete("/platform/db/stats", headers={"x-admin-token": "wrong"}).status_code == 401
+    client.delete("/platform/db/stats", headers=admin)
+
+    response = client.get("/workspaces", params={"user_email": "owner@example.com"})
+    assert response.status_code == 200
+    assert int(response.headers["x-db-queries"]) == 1
+
+    stats = client.get("/platform/db/stats", params={"limit": 5}, headers=admin)
+    assert stats.status_code == 200
+    statements = stats.json()["statements"]
+    assert any("FROM workspaces w" in item["statement"] for item in statements)
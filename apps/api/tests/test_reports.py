@@ -0,0 +1,208 @@
+import json
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.db.database import db
+from app.services.github_import_service import github_import_service
+from app.services.docs_service import docs_service
+from app.services.github_service import github_service
+from app.services.report_scheduler import ReportScheduler, report_period
+from app.services.report_service import report_service
+
+from conftest import create_workspace
+
+
+def _store(workspace_id: int, event_type: str, payload: dict) -> None:
+    github_service.store_events([(workspace_id, event_type, payload, None, None)])
+
+
+def test_report_summaries_come_from_incremental_rollups(client) -> None:
+    workspace_id = create_workspace(client)
+    for commits in (2, 3):
+        _store(workspace_id, "push", {"ref": "refs/heads/main", "commits": [{}] * commits, "repository": {"full_name": "org/api"}})
+    _store(
+        workspace_id,
+        "pull_request",
+        {"action": "closed", "number": 5, "pull_request": {"merged": True}, "repository": {"full_name": "org/web"}},
+    )
+    today = datetime.now(timezone.utc).date().isoformat()
+
+    rollups = db.for_workspace(workspace_id).fetchall(
+        "SELECT event_type, repo, event_count, commit_count FROM github_event_rollups WHERE workspace_id=? ORDER BY event_type",
+        (workspace_id,),
+    )
+    assert [(row["event_type"], row["repo"], row["event_count"], row["commit_count"]) for row in rollups] == [
+        ("pull_request", "org/web", 1, 0),
+        ("push", "org/api", 2, 5),
+    ]
+    assert github_service.rebuild_rollups(db.for_workspace(workspace_id)) >= 2
+    assert db.for_workspace(workspace_id).fetchall(
+        "SELECT event_type, repo, event_count, commit_count FROM github_event_rollups WHERE workspace_id=? ORDER BY event_type",
+        (workspace_id,),
+    ) == rollups
+
+    report = client.post(
+        "/reports/daily",
+        json={"workspace_id": workspace_id, "actor_email": "owner@example.com", "period_start": today, "period_end": today},
+    )
+    assert report.status_code == 200
+    content = report.json()["content"]
+    assert "- 수집 이벤트 수: 3" in content
+    assert "- push: 2건" in content and "- org/api: 2건" in content
+    assert "- main: 5개 커밋" in content
+    assert "- 머지: 1건" in content
+    assert content.count("\n- [") == 3
+
+
+def test_imported_deliveries_keep_their_original_day(client) -> None:
+    workspace_id = create_workspace(client)
+    push = {"ref": "refs/heads/main", "commits": [{}], "repository": {"full_name": "org/api"}}
+    lines = [
+        {"delivery_id": "old-1", "event": "push", "payload": push, "delivered_at": "2025-03-02T23:30:00Z"},
+        # Offsets are normalized to UTC before the day is taken.
+        {"delivery_id": "old-2", "event": "push", "payload": push, "timestamp": "2025-03-04T08:00:00+09:00"},
+        {"delivery_id": "old-3", "event": "push", "payload": push, "timestamp": 1741046400},
+        {"delivery_id": "undated", "event": "push", "payload": push},
+        {"delivery_id": "bad-date", "event": "push", "payload": push, "delivered_at": "yesterday"},
+    ]
+    archive = "\n".join(json.dumps(line) for line in lines).encode("utf-8")
+    summary = github_import_service.import_chunks([archive], workspace_id=workspace_id)
+    assert (summary["stored"], summary["invalid"]) == (4, 1)
+
+    days = db.for_workspace(workspace_id).fetchall(
+        "SELECT day, event_count FROM github_event_rollups WHERE workspace_id=? ORDER BY day", (workspace_id,)
+    )
+    today = datetime.now(timezone.utc).date().isoformat()
+    assert [(row["day"], row["event_count"]) for row in days] == [("2025-03-02", 1), ("2025-03-03", 1), ("2025-03-04", 1), (today, 1)]
+
+    body = {"workspace_id": workspace_id, "actor_email": "owner@example.com", "period_start": "2025-03-03", "period_end": "2025-03-04"}
+    content = client.post("/reports/weekly", json=body).json()["content"]
+    assert "- 수집 이벤트 수: 2" in content and "- main: 2개 커밋" in content
+
+
+def test_report_is_reused_until_an_event_lands_in_its_window(client) -> None:
+    workspace_id = create_workspace(client)
+    _store(workspace_id, "push", {"ref": "refs/heads/main", "commits": [{}], "repository": {"full_name": "org/api"}})
+    today = datetime.now(timezone.utc).date()
+    body = {"workspace_id": workspace_id, "actor_email": "owner@example.com", "period_start": today.isoformat(), "period_end": today.isoformat()}
+    yesterday = (today - timedelta(days=1)).isoformat()
+    earlier = {**body, "period_start": yesterday, "period_end": yesterday}
+    ws_db = db.for_workspace(workspace_id)
+
+    def report_docs() -> int:
+        row = ws_db.fetchone("SELECT COUNT(*) AS total FROM docs WHERE workspace_id=? AND space='reports'", (workspace_id,))
+        return int(row["total"])
+
+    first = client.post("/reports/daily", json=body).json()
+    again = client.post("/reports/daily", json=body).json()
+    assert again["id"] == first["id"]
+    assert report_docs() == 1
+    earlier_id = client.post("/reports/daily", json=earlier).json()["id"]
+
+    _store(workspace_id, "push", {"ref": "refs/heads/main", "commits": [{}] * 2, "repository": {"full_name": "org/api"}})
+    refreshed = client.post("/reports/daily", json=body).json()
+    assert refreshed["id"] != first["id"]
+    assert "- main: 3개 커밋" in refreshed["content"]
+    # Only the window that received the event is regenerated.
+    assert client.post("/reports/daily", json=earlier).json()["id"] == earlier_id
+    assert report_docs() == 3
+
+
+def test_report_and_its_doc_are_written_in_one_transaction(client, monkeypatch) -> None:
+    workspace_id = create_workspace(client)
+    ws_db = db.for_workspace(workspace_id)
+    create = docs_service.create
+
+    def create_then_fail(**kwargs):
+        assert kwargs["database"] is ws_db
+        create(**kwargs)
+        raise RuntimeError("interrupted")
+
+    monkeypatch.setattr(docs_service, "create", create_then_fail)
+    today = datetime.now(timezone.utc).date()
+    with pytest.raises(RuntimeError):
+        report_service.generate_report(
+            workspace_id=workspace_id,
+            actor_email="owner@example.com",
+            report_type="daily",
+            period_start=today,
+            period_end=today,
+        )
+    # Neither the report nor its doc survives the failed unit of work.
+    for table in ("reports", "docs"):
+        assert ws_db.fetchone(f"SELECT COUNT(*) AS total FROM {table} WHERE workspace_id=?", (workspace_id,))["total"] == 0
+
+def test_scheduled_reports_checkpoint_and_resume(client, monkeypatch) -> None:
+    assert report_period("weekly", date(2026, 10, 14)) == (date(2026, 10, 5), date(2026, 10, 11))
+    workspace_ids = [create_workspace(client, owner_email=f"owner{index}@example.com") for index in range(4)]
+    day = report_period("daily", datetime.now(timezone.utc).date())[0]
+
+    generate = report_service.generate_report
+
+    def flaky(**kwargs):
+        if kwargs["workspace_id"] == workspace_ids[1]:
+            raise RuntimeError("interrupted")
+        return generate(**kwargs)
+
+    monkeypatch.setattr(report_service, "generate_report", flaky)
+    scheduler = ReportScheduler(workers=2)
+    first = scheduler.run("daily", day, day)
+    assert (first["total"], first["done"], first["failed"], first["skipped"]) == (4, 3, 1, 0)
+    assert all(job["duration_ms"] >= 0 for job in first["jobs"])
+
+    monkeypatch.setattr(report_service, "generate_report", generate)
+    resumed = scheduler.run("daily", day, day)
+    assert (resumed["done"], resumed["failed"], resumed["skipped"]) == (1, 0, 3)
+    assert [job["workspace_id"] for job in resumed["jobs"]] == [workspace_ids[1]]
+
+    checkpoints = scheduler.jobs("daily", day, day)
+    assert [row["status"] for row in checkpoints] == ["done"] * 4
+    assert [row["attempts"] for row in checkpoints] == [1, 2, 1, 1]
+    for row in checkpoints:
+        report = db.for_workspace(row["workspace_id"]).fetchone("SELECT * FROM reports WHERE id=?", (row["report_id"],))
+        assert report["workspace_id"] == row["workspace_id"] and report["period_start"] == day.isoformat()
+
+
+def test_scheduled_report_jobs_are_leased_across_processes(client) -> None:
+    first_id, second_id = (create_workspace(client, owner_email=f"lease{index}@example.com") for index in range(2))
+    day = date(2026, 1, 5)
+    now_ms = db.epoch_ms(db.now_iso())
+    # Another process is generating the first workspace's report; a crashed one left the second behind.
+    for workspace_id, lease_ts in ((first_id, now_ms), (second_id, now_ms - 3_600_000)):
+        db.execute(
+            """
+            INSERT INTO report_jobs(report_type, period_start, period_end, workspace_id, status, attempts, lease_ts, updated_at)
+            VALUES ('daily', ?, ?, ?, 'running', 1, ?, ?)
+            """,
+            (day.isoformat(), day.isoformat(), workspace_id, lease_ts, db.now_iso()),
+        )
+
+    summary = ReportScheduler(workers=2, lease_seconds=600).run("daily", day, day)
+    assert (summary["busy"], summary["done"]) == (1, 1)
+    assert [job["workspace_id"] for job in summary["jobs"]] == [second_id]
+    statuses = {row["workspace_id"]: (row["status"], row["attempts"]) for row in ReportScheduler().jobs("daily", day, day)}
+    assert statuses == {first_id: ("running", 1), second_id: ("done", 2)}
+
+
+def test_scheduled_report_lease_is_renewed_while_the_job_runs(client, monkeypatch) -> None:
+    workspace_id = create_workspace(client, owner_email="slow@example.com")
+    day = date(2026, 1, 6)
+    generate = report_service.generate_report
+    calls, rivals = [], []
+
+    def slow(**kwargs):
+        calls.append(kwargs["workspace_id"])
+        if len(calls) == 1:
+            # Outlive the lease several times over, then let another process try to take the job.
+            time.sleep(0.5)
+            rivals.append(ReportScheduler(lease_seconds=0.15).run("daily", day, day, workspace_ids=[workspace_id]))
+        return generate(**kwargs)
+
+    monkeypatch.setattr(report_service, "generate_report", slow)
+    summary = ReportScheduler(lease_seconds=0.15).run("daily", day, day, workspace_ids=[workspace_id])
+    assert summary["done"] == 1
+    assert (rivals[0]["busy"], rivals[0]["done"]) == (1, 0) and len(calls) == 1
+    [row] = ReportScheduler().jobs("daily", day, day)
+    assert (row["status"], row["attempts"]) == ("done", 1)
@@ -1,3 +1,11 @@
+import pytest
+
+from app.core.auth import AuthContext
+from app.core.rbac import PERMISSIONS
+from app.db.database import db
+from app.services.membership_cache import membership_cache
+from app.services.workspace_service import workspace_service
+
 from conftest import connect_google, create_workspace
 
 
@@ -48,3 +56,125 @@ def test_workspace_rbac_and_execute(client) -> None:
         },
     )
     assert execute_forbidden.status_code == 400
+
+
+def test_membership_cache_invalidates_locally_and_across_workers(client, monkeypatch) -> None:
+    workspace_id = create_workspace(client)
+    client.post(
+        f"/workspaces/{workspace_id}/members",
+        json={"actor_email": "owner@example.com", "target_email": "member@example.com", "role": "viewer"},
+    )
+
+    def can_manage() -> bool:
+        response = client.get(
+            f"/workspaces/{workspace_id}/permissions/me",
+            params={"user_email": "member@example.com"},
+        )
+        return response.json()["permissions"]["workspace.manage_members"]
+
+    assert can_manage() is False
+    hits = membership_cache.cache.hits
+    assert can_manage() is False
+    assert membership_cache.cache.hits > hits
+
+    promoted = client.patch(
+        f"/workspaces/{workspace_id}/members/member@example.com",
+        json={"actor_email": "owner@example.com", "role": "admin"},
+    )
+    assert promoted.status_code == 200
+    assert can_manage() is True
+
+    # Another worker demotes the member: only the DB row and the version counter change here.
+    monkeypatch.setattr(membership_cache, "sync_ms", 0)
+    db.execute(
+        "UPDATE workspace_members SET role='viewer' WHERE workspace_id=? AND user_email=?",
+        (workspace_id, "member@example.com"),
+    )
+    db.execute(
+        "UPDATE membership_versions SET version=(SELECT MAX(version) + 1 FROM membership_versions) WHERE workspace_id=?",
+        (workspace_id,),
+    )
+    assert can_manage() is False
+
+
+def test_auth_context_dependency_resolves_role_once(client) -> None:
+    viewer = AuthContext.for_role(workspace_id=1, actor_email="viewer@example.com", role="viewer")
+    assert viewer.can("workspace.read") and not viewer.can("docs.write")
+    assert not viewer.can("unknown.permission")
+    with pytest.raises(ValueError):
+        viewer.require("workspace.manage_members")
+
+    workspace_id = create_workspace(client)
+    params = {"workspace_id": workspace_id, "actor_email": "owner@example.com"}
+    assert client.get("/chat/channels", params=params).status_code == 200
+    membership_cache.invalidate(workspace_id)
+    channels = client.get("/chat/channels", params=params)
+    assert channels.status_code == 200
+    assert channels.json()["channels"] == []
+    # One membership lookup plus the channel query itself.
+    assert channels.headers["x-db-queries"] == "2"
+
+    outsider = client.get("/chat/channels", params={"workspace_id": workspace_id, "actor_email": "nobody@example.com"})
+    assert outsider.status_code == 403
+
+
+def test_permission_filtered_workspaces_and_batch_auth(client) -> None:
+    admin_ws = create_workspace(client)
+    viewer_ws = create_workspace(client, owner_email="other@example.com")
+    add_member = client.post(
+        f"/workspaces/{viewer_ws}/members",
+        json={"actor_email": "other@example.com", "target_email": "owner@example.com", "role": "viewer"},
+    )
+    assert add_member.status_code == 200
+
+    listed = client.get("/workspaces", params={"user_email": "owner@example.com", "permission": "approval.decide"})
+    assert listed.status_code == 200
+    assert [ws["id"] for ws in listed.json()["workspaces"]] == [admin_ws]
+    readable = client.get("/workspaces", params={"user_email": "owner@example.com", "permission": "workspace.read"})
+    assert {ws["id"] for ws in readable.json()["workspaces"]} == {admin_ws, viewer_ws}
+    unknown = client.get("/workspaces", params={"user_email": "owner@example.com", "permission": "nope"})
+    assert unknown.status_code == 400
+
+    perms = client.get(f"/workspaces/{viewer_ws}/permissions/me", params={"user_email": "owner@example.com"}).json()
+    assert list(perms["permissions"]) == list(PERMISSIONS)
+    assert [name for name, granted in perms["permissions"].items() if granted] == ["workspace.read"]
+
+    membership_cache.clear()
+    contexts = workspace_service.auth_contexts(
+        [(admin_ws, "owner@example.com"), (viewer_ws, "owner@example.com"), (viewer_ws, "nobody@example.com")]
+    )
+    assert contexts[(admin_ws, "owner@example.com")].can_all(["github.link", "docs.write"])
+    assert contexts[(viewer_ws, "owner@example.com")].role == "viewer"
+    assert contexts[(viewer_ws, "nobody@example.com")].permissions == 0
+    assert membership_cache.cache.stats()["size"] == 3
+
+
+def test_access_token_skips_membership_lookup_until_revoked(client) -> None:
+    workspace_id = create_workspace(client)
+    client.post(
+        f"/workspaces/{workspace_id}/members",
+        json={"actor_email": "owner@example.com", "target_email": "member@example.com", "role": "member"},
+    )
+    issued = client.post(f"/workspaces/{workspace_id}/access-token", params={"actor_email": "member@example.com"})
+    assert issued.status_code == 200
+    assert issued.json()["role"] == "member"
+    headers = {"Authorization": f"Bearer {issued.json()['access_token']}"}
+
+    channels = client.get("/chat/channels", params={"workspace_id": workspace_id}, headers=headers)
+    assert channels.status_code == 200
+    # Only the channel query itself; the role comes from the token.
+    assert channels.headers["x-db-queries"] == "1"
+
+    assert client.get("/chat/channels", params={"workspace_id": workspace_id + 1}, headers=headers).status_code == 401
+    forged = {"Authorization": headers["Authorization"][:-2] + "00"}
+    assert client.get("/chat/channels", params={"workspace_id": workspace_id}, headers=forged).status_code == 401
+
+    removed = client.delete(
+        f"/workspaces/{workspace_id}/members/member@example.com", params={"actor_email": "owner@example.com"}
+    )
+    assert removed.status_code == 200
+    # The membership version moved on, so the token falls back to a lookup that now denies access.
+    revoked = client.get(
+        "/chat/channels", params={"workspace_id": workspace_id, "actor_email": "member@example.com"}, headers=headers
+    )
+    assert revoked.status_code == 403
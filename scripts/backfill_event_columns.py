@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "apps" / "api"))
+
+from app.db.compression import decode_json  # noqa: E402
+from app.db.database import AppDatabase, db  # noqa: E402
+from app.services.github_service import event_columns  # noqa: E402
+
+
+def _backfill(database: AppDatabase, batch_size: int) -> int:
+    last_id = 0
+    updated = 0
+    while True:
+        rows = database.fetchall(
+            "SELECT id, event_type, payload_json FROM github_events WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, batch_size),
+        )
+        if not rows:
+            return updated
+
+        updates = [(*event_columns(row["event_type"], decode_json(row["payload_json"])), row["id"]) for row in rows]
+        database.executemany(
+            "UPDATE github_events SET action=?, branch=?, commit_count=?, pr_number=?, merged=? WHERE id=?",
+            updates,
+        )
+        updated += len(updates)
+        last_id = rows[-1]["id"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="기존 github_events의 action/branch/commit_count/pr_number/merged 컬럼 채우기")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    targets: list[tuple[str, AppDatabase]] = [("catalog", db)]
+    if db.shards is not None:
+        for path in sorted(db.shards.shard_dir.glob("workspace_*.db")):
+            workspace_id = int(path.stem.split("_", 1)[1])
+            targets.append((path.name, db.for_workspace(workspace_id)))
+
+    for name, database in targets:
+        print(f"{name}: updated={_backfill(database, args.batch_size)}")
+
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
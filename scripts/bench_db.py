@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Any, Iterable, Optional
+
+BENCH_DIR = tempfile.mkdtemp(prefix="gws-bench-")
+os.environ.setdefault("DB_PATH", str(Path(BENCH_DIR) / "bootstrap.db"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "apps" / "api"))
+
+from app.db.database import AppDatabase  # noqa: E402
+
+
+class LegacyDatabase:
+    """Connection-per-call + process-wide lock (pre-pool behaviour), kept for comparison."""
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self._lock = Lock()
+
+    @contextmanager
+    def _connect(self) -> Iterable[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def execute(self, query: str, params: tuple[Any, ...] = ()) -> None:
+        with self._lock:
+            with self._connect() as conn:
+                conn.execute(query, params)
+
+    def fetchone(self, query: str, params: tuple[Any, ...] = ()) -> Optional[dict[str, Any]]:
+        with self._lock:
+            with self._connect() as conn:
+                row = conn.execute(query, params).fetchone()
+        return dict(row) if row else None
+
+    def fetchall(self, query: str, params: tuple[Any, ...] = ()) -> list[dict[str, Any]]:
+        with self._lock:
+            with self._connect() as conn:
+                rows = conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+
+def _seed(db: AppDatabase, workspaces: int, events: int) -> None:
+    now = db.now_iso()
+    db.executemany(
+        "INSERT INTO github_events(workspace_id, event_type, repo, actor, payload_json, created_at, created_ts) VALUES(?, ?, ?, ?, ?, ?, ?)",
+        [(i % workspaces + 1, "push", f"org/repo-{i % 7}", "bench", "{}", now, db.epoch_ms(now) + i) for i in range(events)],
+    )
+
+
+def _run(db: Any, *, threads: int, ops: int, write_ratio: float, workspaces: int) -> float:
+    write_every = max(1, round(1 / write_ratio)) if write_ratio > 0 else 0
+
+    def worker(worker_id: int) -> None:
+        for i in range(ops):
+            workspace_id = (worker_id + i) % workspaces + 1
+            if write_every and i % write_every == 0:
+                db.execute(
+                    "INSERT INTO github_events(workspace_id, event_type, repo, actor, payload_json, created_at, created_ts) VALUES(?, ?, ?, ?, ?, ?, ?)",
+                    (workspace_id, "push", "org/bench", "bench", "{}", "2026-01-01T00:00:00+00:00", 1767225600000),
+                )
+            else:
+                db.fetchall(
+                    "SELECT id, event_type, repo FROM github_events WHERE workspace_id=? ORDER BY created_ts DESC, id DESC LIMIT 20",
+                    (workspace_id,),
+                )
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    elapsed = time.perf_counter() - started
+    return threads * ops / elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="AppDatabase 연결 풀/WAL 처리량 벤치마크")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=500, help="스레드당 작업 수")
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--workspaces", type=int, default=20)
+    parser.add_argument("--seed-events", type=int, default=20000)
+    args = parser.parse_args()
+
+    legacy_path = str(Path(BENCH_DIR) / "legacy.db")
+    pooled_path = str(Path(BENCH_DIR) / "pooled.db")
+    queued_path = str(Path(BENCH_DIR) / "queued.db")
+
+    # Legacy: rollback journal, connection per call, global lock for reads and writes.
+    legacy_seed = AppDatabase(legacy_path, pool_size=1, journal_mode="DELETE", synchronous="FULL")
+    _seed(legacy_seed, args.workspaces, args.seed_events)
+    legacy_seed.close()
+    legacy = LegacyDatabase(legacy_path)
+
+    pooled = AppDatabase(pooled_path, pool_size=args.threads, write_mode="lock")
+    _seed(pooled, args.workspaces, args.seed_events)
+
+    queued = AppDatabase(queued_path, pool_size=args.threads, write_mode="queue")
+    _seed(queued, args.workspaces, args.seed_events)
+
+    kwargs = {"threads": args.threads, "ops": args.ops, "write_ratio": args.write_ratio, "workspaces": args.workspaces}
+    legacy_ops = _run(legacy, **kwargs)
+    pooled_ops = _run(pooled, **kwargs)
+    queued_ops = _run(queued, **kwargs)
+    pooled.close()
+    queued.close()
+
+    print(f"threads={args.threads} ops/thread={args.ops} write_ratio={args.write_ratio}")
+    print(f"legacy (connect-per-call, global lock): {legacy_ops:,.0f} ops/s")
+    print(f"pooled (WAL, writer lock):              {pooled_ops:,.0f} ops/s  x{pooled_ops / legacy_ops:.2f}")
+    print(f"queued (WAL, writer queue + group commit): {queued_ops:,.0f} ops/s  x{queued_ops / legacy_ops:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
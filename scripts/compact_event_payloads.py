@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "apps" / "api"))
+
+from app.db.compression import decode_json, encode_json  # noqa: E402
+from app.db.database import AppDatabase, db  # noqa: E402
+
+
+def _compact(database: AppDatabase, batch_size: int) -> tuple[int, int]:
+    last_id = 0
+    scanned = 0
+    rewritten = 0
+    while True:
+        rows = database.fetchall(
+            "SELECT id, payload_json FROM github_events WHERE id > ? AND typeof(payload_json)='text' ORDER BY id LIMIT ?",
+            (last_id, batch_size),
+        )
+        if not rows:
+            return scanned, rewritten
+
+        updates = []
+        for row in rows:
+            packed = encode_json(decode_json(row["payload_json"]))
+            if isinstance(packed, bytes):
+                updates.append((packed, row["id"]))
+        if updates:
+            database.executemany("UPDATE github_events SET payload_json=? WHERE id=?", updates)
+
+        scanned += len(rows)
+        rewritten += len(updates)
+        last_id = rows[-1]["id"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="기존 github_events payload를 압축 포맷으로 재기록")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--vacuum", action="store_true", help="완료 후 VACUUM으로 파일 크기 회수")
+    args = parser.parse_args()
+
+    targets: list[tuple[str, AppDatabase]] = [("catalog", db)]
+    if db.shards is not None:
+        for path in sorted(db.shards.shard_dir.glob("workspace_*.db")):
+            workspace_id = int(path.stem.split("_", 1)[1])
+            targets.append((path.name, db.for_workspace(workspace_id)))
+
+    for name, database in targets:
+        scanned, rewritten = _compact(database, args.batch_size)
+        if args.vacuum and rewritten:
+            database.vacuum()
+        print(f"{name}: scanned={scanned} compressed={rewritten}")
+
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
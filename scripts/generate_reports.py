@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "apps" / "api"))
+
+from app.db.database import db  # noqa: E402
+from app.services.report_scheduler import REPORT_TYPES, ReportJob, ReportScheduler, report_period  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="전체 workspace 정기 리포트 생성 (중단 후 재실행 시 완료된 workspace는 건너뜀)")
+    parser.add_argument("--type", choices=REPORT_TYPES, action="append", dest="types", help="기본값: daily, weekly 모두")
+    parser.add_argument("--today", type=date.fromisoformat, default=None, help="기준일 (YYYY-MM-DD, 기본값: 오늘 UTC)")
+    parser.add_argument("--workspace-id", type=int, action="append", dest="workspace_ids", help="지정한 workspace만 생성")
+    parser.add_argument("--workers", type=int, default=None, help="동시 생성 수 (기본값: REPORT_SCHEDULER_WORKERS)")
+    args = parser.parse_args()
+
+    scheduler = ReportScheduler(workers=args.workers) if args.workers else ReportScheduler()
+    today = args.today or datetime.now(timezone.utc).date()
+
+    def report(job: ReportJob) -> None:
+        print(
+            f"{job.report_type} workspace={job.workspace_id} status={job.status} "
+            f"duration_ms={job.duration_ms}{f' error={job.error}' if job.error else ''}",
+            file=sys.stderr,
+        )
+
+    failed = 0
+    for report_type in args.types or REPORT_TYPES:
+        period_start, period_end = report_period(report_type, today)
+        summary = scheduler.run(report_type, period_start, period_end, workspace_ids=args.workspace_ids, on_job=report)
+        summary.pop("jobs")
+        failed += summary["failed"]
+        print(json.dumps(summary, ensure_ascii=False))
+
+    db.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "apps" / "api"))
+
+from app.db.database import db  # noqa: E402
+from app.services.github_import_service import GithubImportService, ImportProgress  # noqa: E402
+
+CHUNK_SIZE = 1 << 20
+
+
+def _chunks(path: str) -> Iterator[bytes]:
+    stream: BinaryIO = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        while chunk := stream.read(CHUNK_SIZE):
+            yield chunk
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="GitHub webhook delivery 아카이브(NDJSON, .gz 가능) 일괄 적재")
+    parser.add_argument("paths", nargs="+", help="NDJSON 파일 경로 (- 는 stdin)")
+    parser.add_argument("--workspace-id", type=int, default=None, help="모든 이벤트를 이 workspace로 적재 (다른 workspace 설치 이벤트는 제외)")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--progress-every", type=int, default=10, help="N 배치마다 진행 상황 출력")
+    args = parser.parse_args()
+
+    importer = GithubImportService(batch_size=args.batch_size) if args.batch_size else GithubImportService()
+
+    def report(progress: ImportProgress) -> None:
+        if progress.batches % max(1, args.progress_every) == 0:
+            stats = progress.as_dict()
+            print(
+                f"lines={stats['lines']} stored={stats['stored']} duplicates={stats['duplicates']} "
+                f"invalid={stats['invalid']} rate={stats['events_per_sec']}/s",
+                file=sys.stderr,
+            )
+
+    # Each file is streamed separately so a gzip header is detected per archive.
+    for path in args.paths:
+        summary = importer.import_chunks(_chunks(path), workspace_id=args.workspace_id, on_batch=report)
+        print(json.dumps({"path": path, **summary}, ensure_ascii=False))
+
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
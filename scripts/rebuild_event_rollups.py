@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "apps" / "api"))
+
+from app.db.database import AppDatabase, db  # noqa: E402
+from app.services.github_service import github_service  # noqa: E402
+
+
+def main() -> int:
+    argparse.ArgumentParser(description="github_events로부터 github_event_rollups(일별 활동 집계) 재계산").parse_args()
+
+    targets: list[tuple[str, AppDatabase]] = [("catalog", db)]
+    if db.shards is not None:
+        for path in sorted(db.shards.shard_dir.glob("workspace_*.db")):
+            workspace_id = int(path.stem.split("_", 1)[1])
+            targets.append((path.name, db.for_workspace(workspace_id)))
+
+    for name, database in targets:
+        print(f"{name}: rollup_rows={github_service.rebuild_rollups(database)}")
+
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())